@@ -1,11 +1,12 @@
 import json
 import logging
+from collections.abc import Callable, Iterator
 
-import jwt
 from requests import Response
 
 from . import urls
 from .core import Api, format_response_error, interactapi, mock_validate_kid
+from .custom_data import CustomDataCodec
 from .exceptions import (
     InteractaError,
     InteractaLoginError,
@@ -14,9 +15,15 @@ from .exceptions import (
     ObjectDoesNotFound,
     PostDoesNotFound,
 )
+from .indexes import PostTitleIndex, normalize_title
+from .schemas.core import PaginatedIn
 from .schemas.models import (
     BaseListPostsElement,
+    Catalog,
+    CatalogEntry,
     Group,
+    PostComment,
+    PostDefinition,
 )
 from .schemas.requests import (
     CommunityPostFilters,
@@ -65,9 +72,17 @@ from .schemas.responses import (
     PostsOut,
 )
 from .settings import InteractaSettings
+from .transport import Transport
 
 logger = logging.getLogger(__name__)
-jwt.api_jws.PyJWS._validate_kid = mock_validate_kid  # type: ignore
+
+
+def import_jwt():
+    # pyjwt (e cryptography) sono importati solo quando serve un login via service account
+    import jwt
+
+    jwt.api_jws.PyJWS._validate_kid = mock_validate_kid  # type: ignore
+    return jwt
 
 
 class InteractaApi(Api):
@@ -76,10 +91,12 @@ class InteractaApi(Api):
         settings: InteractaSettings,
         log_calls: bool = False,
         log_call_responses: bool = False,
+        transport: Transport | None = None,
     ) -> None:
-        self.settings = settings
+        super().__init__(settings=settings, transport=transport)
         self._log_calls = log_calls
         self._log_call_responses = log_call_responses
+        self.title_indexes: dict[int, PostTitleIndex] = {}
 
     @property
     def authorized_header(self):
@@ -102,6 +119,7 @@ class InteractaApi(Api):
         if not self.settings.auth_service_account:
             raise InteractaError("Problemi con service account")
 
+        jwt = import_jwt()
         login_path = urls.LOGIN_SERVICE
         payload = self.settings.auth_service_account.jwt_token_payload
         headers = self.settings.auth_service_account.jwt_token_headers
@@ -340,11 +358,42 @@ class InteractaApi(Api):
 
     @interactapi(schema_out=ListPostDefinitionCatalogEntriesOut)
     def list_catalog_entries(
-        self, catalog_id: int | str, data: dict = None, **kwargs
+        self, catalog_id: int | str, data: PaginatedIn | dict = None, **kwargs
     ) -> ListPostDefinitionCatalogEntriesOut | Response:
         path = f"/communication/settings/post-definition/catalogs/{catalog_id}/entries"
         return self.call_post(path=path, data=data, **kwargs)
 
+    def list_definition_catalogs(
+        self, definition: PostDefinition, screens: bool = False, **kwargs
+    ) -> list[Catalog]:
+        """Cataloghi usati dai campi della definizione (e, con ``screens``, dai campi delle
+        schermate del workflow), con tutte le entry."""
+        catalog_ids = set(definition.catalog_ids) if definition.field_definitions else set()
+        if screens and definition.workflow_definition is not None:
+            catalog_ids.update(definition.workflow_definition.catalog_ids)
+        if not catalog_ids:
+            return []
+        catalogs = self.list_catalogs(catalog_ids, load_entries=True, **kwargs).catalogs or []
+        for catalog in catalogs:
+            # le entry dei cataloghi paginati sono restituite solo in parte
+            if catalog.paged:
+                catalog.entries = list(self.iter_catalog_entries(catalog.id, **kwargs))
+        return catalogs
+
+    def get_custom_data_codec(self, community_id: int | str, **kwargs) -> CustomDataCodec:
+        """Codec dei custom_data dei post della community, con le entry dei cataloghi."""
+        definition = self.get_post_definition_detail(community_id, **kwargs)
+        catalogs = self.list_definition_catalogs(definition, **kwargs)
+        return CustomDataCodec.from_post_definition(definition, catalogs)
+
+    def get_screen_data_codec(self, community_id: int | str, **kwargs) -> CustomDataCodec:
+        """Codec degli screen_data delle schermate del workflow della community."""
+        definition = self.get_post_definition_detail(community_id, **kwargs)
+        if definition.workflow_definition is None:
+            raise ObjectDoesNotFound(f"Community {community_id} has no workflow definition")
+        catalogs = self.list_definition_catalogs(definition, screens=True, **kwargs)
+        return CustomDataCodec.from_workflow_definition(definition.workflow_definition, catalogs)
+
     ### end catalog operations
 
     ### worflow operations
@@ -390,11 +439,13 @@ class InteractaApi(Api):
     ### end worflow operations
 
     def get_post_by_title(self, community_id: int, title: str, **kwargs) -> BaseListPostsElement:
-        search = ListCommunityPostsFilteredIn(
-            community_post_filters=CommunityPostFilters(title=title)
-        )
-        result = self.list_posts_filtered(community_id, data=search, **kwargs)
-        posts = [post for post in result.items if title.lower() in post.title.strip().lower()]
+        if index := self.title_indexes.get(int(community_id)):
+            return index.get_by_title(title)
+        posts = [
+            post
+            for post in self.search_posts_by_title(community_id, title, **kwargs)
+            if title.lower() in post.title.strip().lower()
+        ]
         if len(posts) == 0:
             raise PostDoesNotFound(f"Post with '{title}' in title non found in interacta")
         elif len(posts) > 1:
@@ -406,11 +457,15 @@ class InteractaApi(Api):
     def get_post_by_exact_title(
         self, community_id: int, title: str, **kwargs
     ) -> BaseListPostsElement | None:
-        search = ListCommunityPostsFilteredIn(
-            community_post_filters=CommunityPostFilters(title=title)
-        )
-        result = self.list_posts_filtered(community_id, data=search, **kwargs)
-        posts = [post for post in result.items if title.lower() == post.title.strip().lower()]
+        if index := self.title_indexes.get(int(community_id)):
+            return index.get_by_exact_title(title)
+        # stessa normalizzazione dell'indice dei titoli (spazi esterni e maiuscole ignorati)
+        key = normalize_title(title)
+        posts = [
+            post
+            for post in self.search_posts_by_title(community_id, title.strip(), **kwargs)
+            if normalize_title(post.title) == key
+        ]
         if len(posts) == 0:
             raise PostDoesNotFound(f"Post with title '{title}' non found in interacta")
         elif len(posts) > 1:
@@ -419,20 +474,64 @@ class InteractaApi(Api):
             )
         return posts[0]
 
-    def list_all_posts(
-        self, community_id: str | int, data: ListCommunityPostsIn | None = None, **kwargs
-    ) -> list[BaseListPostsElement]:
-        all_posts = []
+    def search_posts_by_title(
+        self, community_id: int, title: str, **kwargs
+    ) -> Iterator[BaseListPostsElement]:
+        search = ListCommunityPostsFilteredIn(
+            community_post_filters=CommunityPostFilters(title=title), page_size=100
+        )
+        return self.iter_posts_filtered(community_id, data=search, **kwargs)
+
+    def build_post_title_index(self, community_id: int, **kwargs) -> PostTitleIndex:
+        """Indicizza i titoli dei post della community: le successive ricerche per titolo
+        (get_post_by_title e get_post_by_exact_title) sono eseguite sull'indice locale, che
+        viene aggiornato con i post creati, modificati o eliminati tramite questo client."""
+        community_id = int(community_id)
+        if previous := self.title_indexes.pop(community_id, None):
+            self.hooks.remove(previous)
+        index = PostTitleIndex.build(self, community_id, **kwargs)
+        self.title_indexes[community_id] = self.add_hook(index)
+        return index
+
+    def iter_pages(self, fetch: Callable, data: PaginatedIn, **kwargs) -> Iterator:
+        # scorre tutte le pagine di un elenco senza tenerle in memoria
         page_token = None
-        data = data if data else ListCommunityPostsIn()
         while True:
             data.page_token = page_token
-            posts = self.list_posts(community_id=community_id, data=data, **kwargs)
-            all_posts += posts.items
-            if not posts.next_page_token:
+            page = fetch(data=data, **kwargs)
+            yield from page.items
+            if not page.next_page_token:
                 break
-            page_token = posts.next_page_token
-        return all_posts
+            page_token = page.next_page_token
+
+    def iter_posts(
+        self, community_id: str | int, data: ListCommunityPostsIn | None = None, **kwargs
+    ) -> Iterator[BaseListPostsElement]:
+        data = data if data else ListCommunityPostsIn()
+        return self.iter_pages(self.list_posts, data, community_id=community_id, **kwargs)
+
+    def iter_posts_filtered(
+        self, community_id: str | int, data: ListCommunityPostsFilteredIn | None = None, **kwargs
+    ) -> Iterator[BaseListPostsElement]:
+        data = data if data else ListCommunityPostsFilteredIn()
+        return self.iter_pages(self.list_posts_filtered, data, community_id=community_id, **kwargs)
+
+    def iter_comments(
+        self, post_id: int | str, data: ListPostCommentsIn | None = None, **kwargs
+    ) -> Iterator[PostComment]:
+        data = data if data else ListPostCommentsIn(page_size=100)
+        return self.iter_pages(self.list_comment_post, data, post_id=post_id, **kwargs)
+
+    def iter_catalog_entries(
+        self, catalog_id: int | str, data: PaginatedIn | None = None, **kwargs
+    ) -> Iterator[CatalogEntry]:
+        data = data if data else PaginatedIn(page_size=100)
+        return self.iter_pages(self.list_catalog_entries, data, catalog_id=catalog_id, **kwargs)
+
+    def list_all_posts(
+        self, community_id: str | int, data: ListCommunityPostsIn | None = None, **kwargs
+    ) -> list[BaseListPostsElement]:
+        return list(self.iter_posts(community_id, data=data, **kwargs))
 
     def all_users(
         self, data: ListSystemUsersIn | None = None, **kwargs
@@ -0,0 +1,147 @@
+import threading
+from collections import deque
+from enum import StrEnum
+from time import monotonic
+
+from .exceptions import CircuitOpenError
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def is_failure_status(status_code: int | None) -> bool:
+    # gli errori del client (4xx) non indicano un degrado del portale, tranne il rate limit
+    return status_code is not None and (status_code >= 500 or status_code == 429)
+
+
+class CircuitBreaker:
+    """Stato di un circuit breaker per un endpoint.
+
+    Chiuso, lascia passare le richieste registrandone l'esito nelle ultime ``window``; se
+    almeno ``min_requests`` esiti hanno una frazione di errori pari o superiore a
+    ``error_rate`` si apre e per ``open_seconds`` le richieste falliscono subito con
+    CircuitOpenError. Trascorso il tempo passa a semiaperto e lascia passare al più
+    ``half_open_requests`` richieste di prova: se riescono si richiude, altrimenti si riapre.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        error_rate: float = 0.5,
+        min_requests: int = 20,
+        window: int = 50,
+        open_seconds: float = 30.0,
+        half_open_requests: int = 1,
+    ) -> None:
+        self.endpoint = endpoint
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_requests = half_open_requests
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.state = CircuitState.CLOSED
+        self.opened_at: float | None = None
+        self.trials = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def failures(self) -> int:
+        return self.outcomes.count(False)
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_seconds - monotonic())
+
+    def acquire(self) -> None:
+        """Verifica che la richiesta possa essere inviata, altrimenti solleva CircuitOpenError."""
+        with self._lock:
+            if self.state == CircuitState.OPEN and self.retry_after() <= 0:
+                self.state = CircuitState.HALF_OPEN
+                self.trials = 0
+            if self.state == CircuitState.CLOSED:
+                return
+            if self.state == CircuitState.HALF_OPEN and self.trials < self.half_open_requests:
+                self.trials += 1
+                return
+            self.rejected += 1
+            retry_after = self.retry_after()
+        raise CircuitOpenError(
+            f"Circuit open for {self.endpoint}, retry after {retry_after:.1f}s",
+            endpoint=self.endpoint,
+            retry_after=retry_after,
+        )
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                if success:
+                    self.state = CircuitState.CLOSED
+                    self.opened_at = None
+                    self.outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self.state == CircuitState.OPEN:
+                # risposte di richieste partite prima dell'apertura
+                return
+            self.outcomes.append(success)
+            count = len(self.outcomes)
+            if count >= self.min_requests and self.failures >= self.error_rate * count:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = monotonic()
+        self.times_opened += 1
+        self.outcomes.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.opened_at = None
+            self.outcomes.clear()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "state": str(self.state),
+                "requests": len(self.outcomes),
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "retry_after": self.retry_after() if self.state == CircuitState.OPEN else None,
+            }
+
+
+class CircuitBreakers:
+    """Circuit breaker per template dell'endpoint (es. ``GET /admin/data/users/{user_id}``)."""
+
+    def __init__(self, **options) -> None:
+        self.options = options
+        self._lock = threading.Lock()
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.get(endpoint)
+                if breaker is None:
+                    breaker = self.breakers[endpoint] = CircuitBreaker(endpoint, **self.options)
+        return breaker
+
+    def states(self) -> dict[str, CircuitState]:
+        return {endpoint: breaker.state for endpoint, breaker in self.breakers.items()}
+
+    def reset(self) -> None:
+        for breaker in list(self.breakers.values()):
+            breaker.reset()
+
+    def as_dict(self) -> dict[str, dict]:
+        return {endpoint: breaker.as_dict() for endpoint, breaker in list(self.breakers.items())}
@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+from requests import Response
+
+from .instrumentation import CallInfo, authorization_header
+
+# Operazioni di sola lettura le cui risposte possono essere messe in cache, con l'entità (tipo e
+# argomento che ne contiene l'id) a cui si riferiscono, usata per l'invalidazione
+CACHEABLE_OPERATIONS: dict[str, tuple[str, str] | None] = {
+    "get_post_detail": ("post", "post_id"),
+    "get_post_data_for_edit": ("post", "post_id"),
+    "get_post_workflow_screen_data_for_edit": ("post", "post_id"),
+    "list_comment_post": ("post", "post_id"),
+    "get_user_data_for_edit": ("user", "user_id"),
+    "get_group_data_for_edit": ("group", "group_id"),
+    "list_group_members": ("group", "group_id"),
+    "get_post_definition_detail": ("community", "community_id"),
+    "get_community_detail": ("community", "community_id"),
+    "list_hashtags": ("community", "community_id"),
+    "list_catalog_entries": ("catalog", "catalog_id"),
+    "list_business_units": None,
+}
+
+# Operazioni di scrittura e entità di cui invalidano le risposte in cache
+INVALIDATING_OPERATIONS: dict[str, tuple[str, str]] = {
+    "edit_post": ("post", "post_id"),
+    "delete_post": ("post", "post_id"),
+    "create_comment_post": ("post", "post_id"),
+    "execute_post_workflow_operation": ("post", "post_id"),
+    "edit_post_workflow_screen_data": ("post", "post_id"),
+    "edit_user": ("user", "user_id"),
+    "delete_user": ("user", "user_id"),
+    "edit_group": ("group", "group_id"),
+    "delete_group": ("group", "group_id"),
+}
+
+# Operazioni di scrittura che non indicano l'entità a cui si riferiscono (es. l'eliminazione di
+# un commento conosce solo l'id del commento) e operazioni di cui invalidano tutte le risposte
+INVALIDATING_ALL_OPERATIONS: dict[str, frozenset[str]] = {
+    "delete_comment_post": frozenset({"list_comment_post", "get_post_detail"}),
+}
+
+# Stima dell'occupazione di una voce oltre al body della risposta (header, chiave, strutture)
+ENTRY_OVERHEAD = 512
+
+
+def entity_tag(entity: tuple[str, str] | None, arguments: dict[str, Any]) -> Hashable | None:
+    if entity is None:
+        return None
+    kind, argument = entity
+    if arguments.get(argument) is None:
+        return None
+    return kind, str(arguments[argument])
+
+
+def cache_key(
+    call: CallInfo, params: dict | None, data: bytes | str | None, headers: dict | None = None
+) -> Hashable:
+    # l'header di autenticazione separa le risposte di utenti diversi che condividono la cache
+    return (
+        call.operation,
+        call.method,
+        call.path,
+        repr(sorted((params or {}).items())),
+        data,
+        authorization_header(headers),
+    )
+
+
+@dataclass
+class CacheEntry:
+    response: Response
+    expires: float
+    size: int
+    tag: Hashable | None
+
+
+class ResponseCache:
+    """Cache LRU in memoria delle risposte delle api, limitata in byte e con scadenza per voce."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._tags: dict[Hashable, set[Hashable]] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Response | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.response
+
+    def set(self, key: Hashable, response: Response, ttl: float, tag: Hashable = None) -> None:
+        size = len(response.content) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(response, monotonic() + ttl, size, tag)
+            self.size += size
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tag: Hashable) -> int:
+        """Rimuove le risposte relative a un'entità, restituisce il numero di voci rimosse."""
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_operations(self, operations: frozenset[str]) -> int:
+        """Rimuove tutte le risposte delle operazioni indicate (primo elemento della chiave)."""
+        with self._lock:
+            keys = [key for key in self._entries if isinstance(key, tuple) and key[0] in operations]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        if entry.tag is not None:
+            keys = self._tags[entry.tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[entry.tag]
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,238 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+from .delta import normalize_ops, parse_delta, text_to_delta
+from .schemas.requests import EditCustomPostIn, EditGroupIn, EditUserIn
+from .schemas.responses import GetCustomPostForEditOut, GetGroupForEditOut, GetUserForEditOut
+
+if TYPE_CHECKING:
+    from .api import InteractaApi
+
+# Campi delle richieste di modifica che non descrivono il contenuto
+EDIT_METADATA_FIELDS = {"occ_token", "description_format", "delta_area_format"}
+
+# Operazioni sugli allegati di un post: se presenti la modifica viene sempre inviata
+ATTACHMENT_FIELDS = ("add_attachments", "update_attachments", "remove_attachment_ids")
+
+
+def matches(desired: Any, current: Any) -> bool:
+    """Confronta un valore da inviare con quello attuale: dei dizionari (modelli annidati) si
+    confrontano solo le chiavi presenti nel valore da inviare, così ad esempio ``{"id": 3}``
+    corrisponde all'utente completo con id 3."""
+    if isinstance(desired, dict):
+        current = {} if current is None else current
+        return isinstance(current, dict) and all(
+            matches(value, current.get(key)) for key, value in desired.items()
+        )
+    if isinstance(desired, list):
+        return (
+            isinstance(current, list)
+            and len(desired) == len(current)
+            and all(map(matches, desired, current))
+        )
+    return desired == current
+
+
+def canonical_custom_data(custom_data: dict | None) -> dict[str, Any]:
+    """Dati custom con chiavi stringa, senza i campi vuoti e con gli id delle scelte multiple
+    ordinati (l'ordine non è significativo)."""
+    canonical = {}
+    for key, value in (custom_data or {}).items():
+        if value is None or value == []:
+            continue
+        if isinstance(value, list) and all(isinstance(item, int) for item in value):
+            value = sorted(value)
+        canonical[str(key)] = value
+    return canonical
+
+
+def _description_ops(description: str | None, delta: str | None = None) -> list[dict]:
+    ops = normalize_ops(parse_delta(delta or text_to_delta(description)))
+    # un delta termina sempre con un a capo, che può mancare nel delta inviato
+    if ops and isinstance(ops[-1]["insert"], str) and not ops[-1]["insert"].endswith("\n"):
+        ops[-1] = {**ops[-1], "insert": ops[-1]["insert"] + "\n"}
+    return ops
+
+
+def post_changes(data: EditCustomPostIn, current: GetCustomPostForEditOut) -> list[str]:
+    """Campi di ``data`` che modificano il post. Sono confrontati solo i campi valorizzati
+    esplicitamente; le operazioni sugli allegati contano sempre come modifica."""
+    content = current.content_data
+    if content is None:
+        return ["content_data"]
+    desired = data.model_dump(exclude_unset=True, exclude=EDIT_METADATA_FIELDS)
+    watchers = {user.id for user in content.watchers_users or content.watchers or []}
+    changed = []
+    for name, value in desired.items():
+        if name == "description":
+            if value is None or data.description_format != 1:
+                same = value == content.description
+            else:
+                same = _description_ops(None, value) == _description_ops(
+                    content.description, content.description_delta
+                )
+        elif name == "custom_data":
+            same = canonical_custom_data(value) == canonical_custom_data(content.custom_data)
+        elif name in ATTACHMENT_FIELDS:
+            same = not value
+        elif name == "add_watcher_user_ids":
+            same = watchers.issuperset(value)
+        elif name == "remove_watcher_user_ids":
+            same = watchers.isdisjoint(value)
+        elif name == "workflow_init_state_id":
+            # usato solo alla creazione del post
+            same = True
+        elif name == "draft":
+            same = value == bool(content.draft)
+        elif name == "scheduled_publication":
+            same = value is None and content.scheduled_publication is None
+        else:
+            same = matches(value, getattr(content, name, None))
+        if not same:
+            changed.append(name)
+    return changed
+
+
+def user_changes(data: EditUserIn, current: GetUserForEditOut) -> list[str]:
+    """Campi di ``data``, tra quelli valorizzati esplicitamente, che modificano l'utente."""
+    desired = data.model_dump(exclude_unset=True, exclude=EDIT_METADATA_FIELDS)
+    state = current.model_dump()
+    return [name for name, value in desired.items() if not matches(value, state.get(name))]
+
+
+def group_changes(data: EditGroupIn, current: GetGroupForEditOut) -> list[str]:
+    """Campi di ``data``, tra quelli valorizzati esplicitamente, che modificano il gruppo; i
+    membri sono confrontati come insieme."""
+    desired = data.model_dump(exclude_unset=True, exclude=EDIT_METADATA_FIELDS)
+    state = current.model_dump(exclude={"members"})
+    changed = []
+    for name, value in desired.items():
+        if name == "member_ids":
+            same = set(value or []) == {member.id for member in current.members or []}
+        else:
+            same = matches(value, state.get(name))
+        if not same:
+            changed.append(name)
+    return changed
+
+
+def content_hash(data: BaseModel) -> str:
+    """Hash stabile dei campi valorizzati di una richiesta di modifica (senza occ token)."""
+    payload = data.model_dump(mode="json", exclude_unset=True, exclude={"occ_token"})
+    if "custom_data" in payload:
+        payload["custom_data"] = canonical_custom_data(payload["custom_data"])
+    if "member_ids" in payload and payload["member_ids"] is not None:
+        payload["member_ids"] = sorted(payload["member_ids"])
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass
+class EditStats:
+    checked: int = 0
+    written: int = 0
+    # modifiche equivalenti ai dati attuali letti dal portale
+    skipped: int = 0
+    # modifiche saltate senza lettura perché uguali all'ultima applicata
+    skipped_by_hash: int = 0
+
+    @property
+    def avoided(self) -> int:
+        return self.skipped + self.skipped_by_hash
+
+
+@dataclass
+class EditState:
+    """Hash delle ultime modifiche applicate (o verificate) per entità, ad esempio
+    ``"post:123"``. Può essere salvato e ricaricato in formato json tra un'esecuzione e
+    l'altra."""
+
+    hashes: dict[str, str] = field(default_factory=dict)
+
+    def unchanged(self, key: str, digest: str) -> bool:
+        return self.hashes.get(key) == digest
+
+    def update(self, key: str, digest: str) -> None:
+        self.hashes[key] = digest
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EditState":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        return cls(json.loads(path.read_text())["hashes"])
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps({"hashes": self.hashes}))
+
+
+class ChangeDetector:
+    """Applica modifiche a post, utenti e gruppi solo se cambiano i dati attuali.
+
+    Per ogni modifica legge i dati modificabili dell'entità e invia la scrittura solo se almeno
+    uno dei campi valorizzati esplicitamente differisce, evitando l'incremento dell'occ token e
+    le notifiche lato server. Se è indicato uno ``state``, le modifiche identiche all'ultima
+    applicata alla stessa entità sono saltate anche senza la lettura: va usato solo se le
+    entità non sono modificate da altri tra un'esecuzione e l'altra.
+    """
+
+    def __init__(self, api: "InteractaApi", state: EditState | None = None) -> None:
+        self.api = api
+        self.state = state
+        self.stats = EditStats()
+
+    def _skip_by_hash(self, key: str, digest: str) -> bool:
+        self.stats.checked += 1
+        if self.state is not None and self.state.unchanged(key, digest):
+            self.stats.skipped_by_hash += 1
+            return True
+        return False
+
+    def _record(self, key: str, digest: str, changed: list[str]) -> bool:
+        if changed:
+            self.stats.written += 1
+        else:
+            self.stats.skipped += 1
+        if self.state is not None:
+            self.state.update(key, digest)
+        return bool(changed)
+
+    def edit_post(self, post_id: int, data: EditCustomPostIn) -> bool:
+        """Modifica il post se necessario; restituisce True se la scrittura è stata inviata."""
+        key, digest = f"post:{post_id}", content_hash(data)
+        if self._skip_by_hash(key, digest):
+            return False
+        current = self.api.get_post_data_for_edit(post_id)
+        changed = post_changes(data, current)
+        if changed:
+            self.api.edit_post(post_id, current.occ_token, data)
+        return self._record(key, digest, changed)
+
+    def edit_user(self, user_id: int, data: EditUserIn) -> bool:
+        key, digest = f"user:{user_id}", content_hash(data)
+        if self._skip_by_hash(key, digest):
+            return False
+        current = self.api.get_user_data_for_edit(user_id)
+        changed = user_changes(data, current)
+        if changed:
+            if data.occ_token is None:
+                data = data.model_copy(update={"occ_token": current.occ_token})
+            self.api.edit_user(user_id, data)
+        return self._record(key, digest, changed)
+
+    def edit_group(self, group_id: int, data: EditGroupIn) -> bool:
+        key, digest = f"group:{group_id}", content_hash(data)
+        if self._skip_by_hash(key, digest):
+            return False
+        current = self.api.get_group_data_for_edit(group_id)
+        changed = group_changes(data, current)
+        if changed:
+            if data.occ_token is None:
+                data = data.model_copy(update={"occ_token": current.occ_token})
+            self.api.edit_group(group_id, data)
+        return self._record(key, digest, changed)
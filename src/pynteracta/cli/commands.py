@@ -1,14 +1,11 @@
 from pathlib import Path
 
-import rich
 import typer
-from devtools import debug
-from rich.table import Table
-from rich.text import Text
 
-from ..api import InteractaApi
 from .users import app as users_app
-from .utils import cli_init_setting, table_list_posts
+
+# Le dipendenze pesanti (rich, devtools, jwt, schemas, settings toml) sono importate all'interno
+# dei singoli comandi, in modo che l'avvio della cli (--help, completion) resti veloce.
 
 app = typer.Typer(help="")
 app.add_typer(users_app, name="users")
@@ -37,6 +34,13 @@ def get_community_definition(
     Mostra la definizione del post di una community e le relative impostazioni, dati workflow,
     campi custom ecc
     """
+    import rich
+    from rich.table import Table
+    from rich.text import Text
+
+    from ..api import InteractaApi
+    from .utils import cli_init_setting
+
     if not community_id and not community_name:
         rich.print(
             "[bold red]Errore: inserisci almeno uno tra i due argomenti 'community_id' e"
@@ -150,6 +154,11 @@ def list_posts(
     """
     Lista dei post presenti in una community.
     """
+    import rich
+
+    from ..api import InteractaApi
+    from .utils import cli_init_setting, table_list_posts
+
     settings = cli_init_setting(env_file=state["env_file"]).interacta
     api = InteractaApi(settings=settings)
     api.login()
@@ -163,4 +172,8 @@ def echo_settings():
     """
     Mostra gli environment
     """
+    from devtools import debug
+
+    from .utils import cli_init_setting
+
     debug(cli_init_setting(env_file=state["env_file"]).model_dump())
@@ -1,18 +1,9 @@
 from enum import StrEnum
 from pathlib import Path
 
-import rich
 import typer
-from rich.progress import Progress
-from rich.table import Table
-
-from pydantic import RootModel
 
 from ..enums import LoginProviderEnum
-from ..schemas.models import ListSystemUsersElement
-from ..schemas.requests import ListSystemUsersIn
-from ..utils.models import UsersStats
-from .utils import cli_init_api, user_login_info
 
 app = typer.Typer()
 
@@ -57,6 +48,17 @@ def list_users(
         OutputFormat.TABLE, "--out-format", "-of", help="Tipo di formato dell'output"
     ),
 ):
+    import rich
+    from rich.progress import Progress
+    from rich.table import Table
+
+    from pydantic import RootModel
+
+    from ..schemas.models import ListSystemUsersElement
+    from ..schemas.requests import ListSystemUsersIn
+    from ..utils.models import UsersStats
+    from .utils import cli_init_api, user_login_info
+
     filter_data = ListSystemUsersIn()
     if not show_not_active:
         filter_data.status_filter = [0]
@@ -1,15 +1,18 @@
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import rich
 import typer
 from rich.table import Table
 
-from ..api import InteractaApi
 from ..enums import LoginProviderEnum
 from ..exceptions import InteractaError
-from ..schemas.models import BaseListPostsElement, ListSystemUsersElement
 from ..settings import AppSettings, InteractaSettings, init_app_settings
 
+if TYPE_CHECKING:
+    from ..api import InteractaApi
+    from ..schemas.models import BaseListPostsElement, ListSystemUsersElement
+
 
 def cli_init_setting(env_file: Path | None = None) -> AppSettings:
     try:
@@ -19,7 +22,9 @@ def cli_init_setting(env_file: Path | None = None) -> AppSettings:
         raise typer.Exit(code=10) from ie
 
 
-def cli_init_api(env_file: Path | None = None) -> tuple[InteractaApi, AppSettings]:
+def cli_init_api(env_file: Path | None = None) -> tuple["InteractaApi", AppSettings]:
+    from ..api import InteractaApi
+
     settings = cli_init_setting(env_file=env_file)
     try:
         api = InteractaApi(settings=settings.interacta)
@@ -30,7 +35,7 @@ def cli_init_api(env_file: Path | None = None) -> tuple[InteractaApi, AppSetting
         raise typer.Exit(code=10) from ie
 
 
-def table_list_posts(posts: list[BaseListPostsElement], settings: InteractaSettings) -> Table:
+def table_list_posts(posts: list["BaseListPostsElement"], settings: InteractaSettings) -> Table:
     table = Table("Id", "Titolo", "Descrizione", show_lines=True)
     for post in posts:
         table.add_row(
@@ -41,7 +46,7 @@ def table_list_posts(posts: list[BaseListPostsElement], settings: InteractaSetti
     return table
 
 
-def user_login_info(user: ListSystemUsersElement) -> str:
+def user_login_info(user: "ListSystemUsersElement") -> str:
     results = (
         [LoginProviderEnum.CUSTOM.value] if LoginProviderEnum.CUSTOM in user.login_providers else []
     )
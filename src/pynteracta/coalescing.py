@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from .deadlines import current_deadline
+from .exceptions import DeadlineExceeded
+from .instrumentation import authorization_header
+
+# Metodi http le cui richieste identiche e contemporanee possono essere unite
+COALESCED_METHODS = frozenset({"GET"})
+
+
+def request_flight_key(
+    method: str, url: str, params: dict | None, headers: dict | None
+) -> Hashable:
+    """Chiave di una richiesta di lettura: metodo, url, parametri e identità di autenticazione."""
+    return (
+        method.upper(),
+        str(url),
+        repr(sorted((params or {}).items())),
+        authorization_header(headers),
+    )
+
+
+class Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Unisce le chiamate contemporanee con la stessa chiave in un'unica esecuzione.
+
+    Il primo thread esegue la funzione, gli altri che arrivano con la stessa chiave mentre è in
+    corso ne attendono il risultato (o l'eccezione). Terminata l'esecuzione la chiave viene
+    rimossa: le chiamate successive vengono eseguite di nuovo. Chi attende lo fa al più fino
+    alla propria deadline, poi solleva DeadlineExceeded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, Flight] = {}
+        self.calls = 0
+        self.saved = 0
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> tuple[Any, bool]:
+        """Restituisce il risultato di ``func`` e se è stato condiviso con un'altra chiamata."""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+            else:
+                self.saved += 1
+        if not leader:
+            deadline = current_deadline.get()
+            if not flight.done.wait(deadline.remaining() if deadline is not None else None):
+                raise DeadlineExceeded(f"Deadline of {deadline.seconds}s exceeded")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+        try:
+            flight.result = func(*args, **kwargs)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls, "saved": self.saved}
+
+
+class AsyncSingleFlight:
+    """Variante di SingleFlight per le coroutine eseguite in uno stesso event loop.
+
+    La cancellazione di una delle chiamate in attesa non interrompe l'esecuzione condivisa.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.saved = 0
+
+    async def do(
+        self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs
+    ) -> tuple[Any, bool]:
+        self.calls += 1
+        task = self._flights.get(key)
+        shared = task is not None
+        if shared:
+            self.saved += 1
+        else:
+            task = self._flights[key] = asyncio.ensure_future(func(*args, **kwargs))
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(task), shared
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls, "saved": self.saved}
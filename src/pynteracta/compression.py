@@ -0,0 +1,109 @@
+import gzip
+import threading
+from dataclasses import asdict, dataclass
+
+from requests import Response
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Codifiche che il client è in grado di decodificare: gzip e deflate sempre, br e zstd solo se
+# sono installati i pacchetti opzionali brotli/brotlicffi e zstandard (vedi urllib3).
+ACCEPT_ENCODING_HEADER = ACCEPT_ENCODING.replace(",", ", ")
+
+REQUEST_COMPRESSION_LEVEL = 6
+
+
+def compress_body(data: bytes) -> bytes:
+    # mtime=0 rende il risultato deterministico (utile per cache e registrazioni)
+    return gzip.compress(data, compresslevel=REQUEST_COMPRESSION_LEVEL, mtime=0)
+
+
+def response_wire_size(response: Response) -> int:
+    """Byte della risposta ricevuti in rete, prima della decompressione."""
+    raw = getattr(response, "raw", None)
+    try:
+        size = raw.tell() if raw is not None else 0
+    except (AttributeError, OSError, ValueError):
+        size = 0
+    if size:
+        return size
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        return int(content_length)
+    return len(response.content)
+
+
+@dataclass
+class EndpointTransfer:
+    calls: int = 0
+    # byte del body delle richieste prima e dopo l'eventuale compressione
+    request_bytes: int = 0
+    request_wire_bytes: int = 0
+    compressed_requests: int = 0
+    # byte delle risposte ricevuti in rete e dopo la decompressione
+    response_bytes: int = 0
+    response_wire_bytes: int = 0
+    compressed_responses: int = 0
+
+    @property
+    def response_ratio(self) -> float | None:
+        if not self.response_bytes:
+            return None
+        return self.response_wire_bytes / self.response_bytes
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "response_ratio": self.response_ratio}
+
+
+class TransferStats:
+    """Contatori dei byte trasferiti, aggregati per metodo e template del path."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: dict[tuple[str, str], EndpointTransfer] = {}
+
+    def record(
+        self,
+        method: str,
+        path_template: str,
+        request_bytes: int = 0,
+        request_wire_bytes: int = 0,
+        response: Response | None = None,
+    ) -> EndpointTransfer:
+        response_bytes = response_wire_bytes = 0
+        content_encoding = ""
+        if response is not None:
+            response_bytes = len(response.content)
+            response_wire_bytes = response_wire_size(response)
+            content_encoding = response.headers.get("content-encoding", "")
+        with self._lock:
+            transfer = self.endpoints.setdefault(
+                (method.upper(), path_template), EndpointTransfer()
+            )
+            transfer.calls += 1
+            transfer.request_bytes += request_bytes
+            transfer.request_wire_bytes += request_wire_bytes
+            transfer.compressed_requests += int(request_wire_bytes < request_bytes)
+            transfer.response_bytes += response_bytes
+            transfer.response_wire_bytes += response_wire_bytes
+            transfer.compressed_responses += int(content_encoding not in ("", "identity"))
+        return transfer
+
+    @property
+    def totals(self) -> EndpointTransfer:
+        total = EndpointTransfer()
+        with self._lock:
+            for transfer in self.endpoints.values():
+                for field, value in asdict(transfer).items():
+                    setattr(total, field, getattr(total, field) + value)
+        return total
+
+    def as_dict(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                f"{method} {template}": transfer.as_dict()
+                for (method, template), transfer in self.endpoints.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
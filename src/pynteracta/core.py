@@ -1,25 +1,82 @@
 import functools
-import json
+import inspect
 import logging
+from collections.abc import Callable
+from time import perf_counter
+from typing import Self
 
 import requests
-from jwt.exceptions import InvalidTokenError
+from pydantic_core import to_json
 from requests import Response
 
 from pydantic import BaseModel
 
-from .exceptions import InteractaResponseError
+from .breakers import CircuitBreaker, CircuitBreakers, is_failure_status
+from .cache import (
+    CACHEABLE_OPERATIONS,
+    INVALIDATING_ALL_OPERATIONS,
+    INVALIDATING_OPERATIONS,
+    ResponseCache,
+    cache_key,
+    entity_tag,
+)
+from .coalescing import COALESCED_METHODS, SingleFlight, request_flight_key
+from .compression import ACCEPT_ENCODING_HEADER, TransferStats, compress_body
+from .deadlines import bounded_timeout, current_deadline
+from .exceptions import DeadlineExceeded, InteractaResponseError
+from .hedging import HEDGED_OPERATIONS, Hedger
+from .instrumentation import (
+    CallInfo,
+    InstrumentationHook,
+    current_call,
+    notify_hooks,
+    redact_headers,
+    template_path,
+)
 from .schemas.models import InteractaModel
 from .settings import ApiSettings
+from .transport import RequestsTransport, Transport
 
 logger = logging.getLogger(__name__)
 
 
 class Api:
-    def __init__(self, settings: ApiSettings):
+    def __init__(self, settings: ApiSettings, transport: Transport | None = None):
         self.access_token = None
         self._log_calls = False
         self.settings = settings
+        # il transport creato dall'Api viene chiuso da close, quello ricevuto no
+        self._owns_transport = transport is None
+        self.transport = transport or RequestsTransport()
+        self.single_flight = SingleFlight()
+        self.hedger = Hedger(
+            percentile=settings.hedge_percentile,
+            budget=settings.hedge_budget,
+            min_delay=settings.hedge_min_delay,
+            max_workers=settings.hedge_max_workers,
+        )
+        self.cache = ResponseCache(settings.cache_max_bytes)
+        self.transfer_stats = TransferStats()
+        self.hooks: list[InstrumentationHook] = []
+        self.circuit_breakers = CircuitBreakers(
+            error_rate=settings.breaker_error_rate,
+            min_requests=settings.breaker_min_requests,
+            window=settings.breaker_window,
+            open_seconds=settings.breaker_open_seconds,
+            half_open_requests=settings.breaker_half_open_requests,
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Arresta i thread delle richieste duplicate e chiude il transport creato dall'Api."""
+        self.hedger.close()
+        if self._owns_transport:
+            self.transport.close()
 
     def call_post(
         self, path: str, params: dict = None, headers: dict = None, data: dict | str = None
@@ -41,6 +98,10 @@ class Api:
     def call_delete(self, path: str, headers: dict = None, **kwargs):
         return self.call_api("delete", path=path, headers=headers, **kwargs)
 
+    def add_hook(self, hook: InstrumentationHook) -> InstrumentationHook:
+        self.hooks.append(hook)
+        return hook
+
     def call_api(
         self,
         method: str,
@@ -50,55 +111,235 @@ class Api:
         data: dict | str | None = None,
         **kwargs,
     ):
+        # le chiamate fatte tramite i metodi decorati con interactapi hanno già un CallInfo nel
+        # contesto, che viene chiuso dal decoratore dopo la validazione della risposta
+        call = current_call.get()
+        owner = call is None
+        if owner:
+            call = CallInfo()
+        call.method = method.upper()
+        call.path = path
+        call.path_template = template_path(path, call.arguments)
+        cache_ttl = self.get_cache_ttl(call)
+        try:
+            if cache_ttl:
+                key = cache_key(call, params, data, headers)
+                response = self.cache.get(key)
+                if response is not None:
+                    call.cached = True
+                    call.status_code = response.status_code
+                    return response
+            try:
+                response = self.send_request(
+                    call, method, path, params=params, headers=headers, data=data, **kwargs
+                )
+            finally:
+                self.invalidate_cache(call)
+            if response.status_code != 200:
+                raise InteractaResponseError(format_response_error(response), response=response)
+            if cache_ttl:
+                self.cache.set(
+                    key,
+                    response,
+                    cache_ttl,
+                    entity_tag(CACHEABLE_OPERATIONS[call.operation], call.arguments),
+                )
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            if owner:
+                self.finish_call(call)
+        return response
+
+    def get_cache_ttl(self, call: CallInfo) -> float | None:
+        if call.operation not in CACHEABLE_OPERATIONS:
+            return None
+        return self.settings.cache_ttl.get(call.operation)
+
+    def invalidate_cache(self, call: CallInfo) -> None:
+        # anche le scritture fallite (errori, timeout, deadline, circuit breaker aperto)
+        # invalidano: la modifica potrebbe essere stata applicata
+        tag = entity_tag(INVALIDATING_OPERATIONS.get(call.operation), call.arguments)
+        if tag is not None:
+            self.cache.invalidate(tag)
+        if call.operation in INVALIDATING_ALL_OPERATIONS:
+            self.cache.invalidate_operations(INVALIDATING_ALL_OPERATIONS[call.operation])
+
+    def send_request(
+        self,
+        call: CallInfo,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        data: dict | str | None = None,
+        **kwargs,
+    ) -> Response:
         url = f"{self.settings.api_url}{path}"
-        request_method = getattr(requests, method)
         if self._log_calls:
-            log_msg = f"API CALL: URL [{url}] HEADERS [{headers}] DATA [{data}]"
+            log_msg = f"API CALL: URL [{url}] HEADERS [{redact_headers(headers)}] DATA [{data}]"
             logger.info(log_msg)
-        response = request_method(url, headers=headers, data=data, params=params, **kwargs)
-        if response.status_code != 200:
-            raise InteractaResponseError(format_response_error(response), response=response)
+        headers = {"accept-encoding": ACCEPT_ENCODING_HEADER, **(headers or {})}
+        call.request_bytes = len(data) if isinstance(data, bytes | str) else 0
+        compression_min_size = self.settings.request_compression_min_size
+        if (
+            compression_min_size is not None
+            and isinstance(data, bytes)
+            and len(data) >= compression_min_size
+        ):
+            data = compress_body(data)
+            headers["content-encoding"] = "gzip"
+        # il timeout dell'endpoint è ridotto al tempo rimasto della deadline del contesto
+        deadline = current_deadline.get()
+        remaining = deadline.check() if deadline is not None else None
+        timeout = kwargs.pop("timeout", self.settings.get_timeout(path))
+        kwargs["timeout"] = bounded_timeout(timeout, remaining)
+        breaker = (
+            self.circuit_breakers.get(call.endpoint) if self.settings.circuit_breaker else None
+        )
+        if breaker is not None:
+            breaker.acquire()
+        notify_hooks(self.hooks, "before_request", call)
+        started = perf_counter()
+        send = self.transport.send
+        if self.settings.hedge_requests and call.operation in HEDGED_OPERATIONS:
+            send = functools.partial(self.hedged_send, call)
+        if breaker is not None:
+            # l'esito è registrato da chi invia la richiesta, non da chi ne condivide la risposta
+            send = functools.partial(self.breaker_send, breaker, send)
+        try:
+            if self.settings.coalesce_requests and call.method in COALESCED_METHODS:
+                response, call.coalesced = self.single_flight.do(
+                    request_flight_key(method, url, params, headers),
+                    send,
+                    method,
+                    url,
+                    headers=headers,
+                    data=data,
+                    params=params,
+                    **kwargs,
+                )
+            else:
+                response = send(method, url, headers=headers, data=data, params=params, **kwargs)
+        except requests.Timeout as exc:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded(f"Deadline of {deadline.seconds}s exceeded") from exc
+            raise
+        elapsed = perf_counter() - started
+        call.status_code = response.status_code
+        call.response_bytes = len(response.content)
+        call.server_time = min(response.elapsed.total_seconds(), elapsed)
+        call.download_time = elapsed - call.server_time
+        if call.coalesced:
+            # la risposta è stata scaricata una sola volta, dalla richiesta che l'ha eseguita
+            return response
+        self.transfer_stats.record(
+            method,
+            call.path_template,
+            request_bytes=call.request_bytes,
+            request_wire_bytes=len(data) if isinstance(data, bytes | str) else 0,
+            response=response,
+        )
         return response
 
+    def breaker_send(self, breaker: CircuitBreaker, send: Callable, *args, **kwargs) -> Response:
+        try:
+            response = send(*args, **kwargs)
+        except Exception:
+            breaker.record(success=False)
+            raise
+        breaker.record(success=not is_failure_status(response.status_code))
+        return response
+
+    def hedged_send(self, call: CallInfo, *args, **kwargs) -> Response:
+        response, call.hedged, call.hedge_won = self.hedger.do(
+            call.endpoint, self.transport.send, *args, **kwargs
+        )
+        return response
+
+    def finish_call(self, call: CallInfo) -> None:
+        call.total_time = perf_counter() - call.started
+        notify_hooks(self.hooks, "after_request", call)
+
 
 def mock_validate_kid(self, kid) -> None:
+    from jwt.exceptions import InvalidTokenError
+
     if not isinstance(kid, str) and not isinstance(kid, int):
         raise InvalidTokenError("Key ID header parameter must be a string or an int")
 
 
-def prepare_data(data=None):
-    if not data:
-        return json.dumps({})
+EMPTY_BODY = b"{}"
+
+
+@functools.cache
+def get_model_serializer(model_class: type[BaseModel]) -> Callable[[BaseModel], bytes]:
+    # opzioni di serializzazione risolte una sola volta per classe, to_json restituisce
+    # direttamente bytes senza passare da str
+    return functools.partial(
+        model_class.__pydantic_serializer__.to_json,
+        by_alias=issubclass(model_class, InteractaModel),
+        exclude_none=getattr(model_class, "serialize_exclude_none", False),
+    )
+
+
+def prepare_data(data=None) -> bytes:
     if isinstance(data, BaseModel):
-        if isinstance(data, InteractaModel):
-            data = data.model_dump_json(by_alias=True)
-        else:
-            data = data.model_dump_json()
-    else:
-        data = json.dumps(data)
-    return data.encode("utf-8")
+        return get_model_serializer(type(data))(data)
+    if not data:
+        return EMPTY_BODY
+    return to_json(data)
 
 
 def interactapi(func=None, *, schema_out=None):
     if func is None:
         return functools.partial(interactapi, schema_out=schema_out)
 
+    signature = inspect.signature(func)
+
     @functools.wraps(func)
-    def wrapper(self, *args, **kwargs):
+    def wrapper(self, *args, validate: bool = True, **kwargs):
+        # con validate=False viene restituita la risposta senza validarla (es. per validarla
+        # in un altro processo)
         if "headers" not in kwargs:
             kwargs["headers"] = self.authorized_header
         else:
             kwargs["headers"].update(self.authorized_header)
-        response = func(self, *args, **kwargs)
-        if not schema_out:
-            return response
-        result = schema_out.model_validate(response.json())
-        result._response = response
-        return result
+        call = CallInfo(
+            operation=func.__name__, arguments=bind_arguments(signature, self, args, kwargs)
+        )
+        token = current_call.set(call)
+        try:
+            response = func(self, *args, **kwargs)
+            if not schema_out or not validate:
+                call.result = response
+                return response
+            started = perf_counter()
+            result = schema_out.model_validate(response.json())
+            call.validation_time = perf_counter() - started
+            result._response = response
+            call.result = result
+            return result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            current_call.reset(token)
+            self.finish_call(call)
 
+    wrapper.schema_out = schema_out
     return wrapper
 
 
+def bind_arguments(signature: inspect.Signature, instance, args: tuple, kwargs: dict) -> dict:
+    try:
+        arguments = signature.bind_partial(instance, *args, **kwargs).arguments
+    except TypeError:
+        return {}
+    return {**arguments.pop("kwargs", {}), **arguments}
+
+
 def format_response_error(response: Response) -> str:
     return (
         f"url: {response.url} - response {response.status_code}"
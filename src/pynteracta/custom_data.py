@@ -0,0 +1,258 @@
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from .enums import FieldTypeEnum
+from .exceptions import ObjectDoesNotFound
+from .schemas.models import (
+    Catalog,
+    CatalogEntry,
+    EnumValue,
+    FieldBase,
+    Link,
+    Post,
+    PostDefinition,
+    PostWorkflowDefinition,
+    PostWorkflowDefinitionScreenField,
+)
+
+Converter = Callable[[Any], Any]
+Choice = EnumValue | CatalogEntry
+
+
+def decode_decimal(value: Any) -> Decimal:
+    # passando dalla stringa si evitano le cifre spurie della rappresentazione binaria del float
+    return Decimal(str(value))
+
+
+def decode_date(value: Any) -> date:
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return datetime.fromtimestamp(value / 1000, tz=UTC).date()
+
+
+def encode_date(value: Any) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    return int(datetime.combine(value, time(), tzinfo=UTC).timestamp() * 1000)
+
+
+def decode_datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value / 1000, tz=UTC)
+
+
+def encode_datetime(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp() * 1000)
+
+
+def decode_link(value: Any) -> Any:
+    return Link(**value) if isinstance(value, dict) else value
+
+
+def encode_link(value: Any) -> Any:
+    return value.model_dump() if isinstance(value, Link) else value
+
+
+def identity(value: Any) -> Any:
+    return value
+
+
+# Conversioni dei tipi con valori scalari, indicizzate per FieldTypeEnum: (decodifica, codifica)
+SCALAR_CONVERTERS: dict[FieldTypeEnum, tuple[Converter, Converter]] = {
+    FieldTypeEnum.INT: (int, int),
+    FieldTypeEnum.BIGINT: (int, int),
+    FieldTypeEnum.DECIMAL: (decode_decimal, float),
+    FieldTypeEnum.DATE: (decode_date, encode_date),
+    FieldTypeEnum.DATETIME: (decode_datetime, encode_datetime),
+    FieldTypeEnum.FLAG: (bool, bool),
+    FieldTypeEnum.LINK: (decode_link, encode_link),
+}
+
+# Tipi i cui valori sono id di valori enum o di entry di un catalogo
+CHOICE_TYPES = {
+    FieldTypeEnum.ENUM,
+    FieldTypeEnum.ENUM_LIST,
+    FieldTypeEnum.HIERARCHICAL_ENUM,
+    FieldTypeEnum.GENERIC_ENTITY_LIST,
+}
+
+
+def nullable(converter: Converter) -> Converter:
+    if converter is identity:
+        return converter
+
+    def convert(value: Any) -> Any:
+        return None if value is None else converter(value)
+
+    return convert
+
+
+@dataclass
+class FieldCodec:
+    """Conversioni precalcolate per un campo custom (o di una schermata di workflow)."""
+
+    id: int
+    label: str | None
+    type: FieldTypeEnum | None
+    decode: Converter = identity
+    encode: Converter = identity
+    choices: dict[int, Choice] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return str(self.id)
+
+    def path(self, choice_id: int) -> list[Choice]:
+        """Valori dalla radice al valore indicato, per gli enum gerarchici."""
+        path = []
+        choice = self.choices.get(choice_id)
+        while choice is not None and choice not in path:
+            path.insert(0, choice)
+            choice = self.choices.get(choice.parent_ids[0]) if choice.parent_ids else None
+        return path
+
+    @classmethod
+    def compile(
+        cls,
+        field: FieldBase | PostWorkflowDefinitionScreenField,
+        catalogs: dict[int, Catalog] | None = None,
+    ) -> "FieldCodec":
+        codec = cls(id=int(field.id), label=field.label, type=field.type)
+        if field.type in SCALAR_CONVERTERS:
+            decode, encode = SCALAR_CONVERTERS[field.type]
+            codec.decode, codec.encode = nullable(decode), nullable(encode)
+        elif field.type in CHOICE_TYPES:
+            if field.type == FieldTypeEnum.GENERIC_ENTITY_LIST:
+                catalog_id = field.metadata.catalog_id if field.metadata else None
+                catalog = (catalogs or {}).get(catalog_id)
+                choices = catalog.entries if catalog and catalog.entries else []
+            else:
+                choices = field.enum_values or []
+            codec.choices = {choice.id: choice for choice in choices}
+            codec.decode, codec.encode = codec._choice_converters()
+        return codec
+
+    def _choice_converters(self) -> tuple[Converter, Converter]:
+        choices = self.choices
+        labels = {choice.label: choice.id for choice in choices.values() if not choice.deleted}
+
+        def decode_one(value: Any) -> Any:
+            # gli id senza corrispondenza (es. entry di cataloghi non caricati) restano invariati
+            return choices.get(value, value)
+
+        def encode_one(value: Any) -> Any:
+            if isinstance(value, EnumValue | CatalogEntry):
+                return value.id
+            if isinstance(value, str):
+                if value not in labels:
+                    raise ValueError(f"No value with label {value} for field {self.id}")
+                return labels[value]
+            return value
+
+        def decode(value: Any) -> Any:
+            if isinstance(value, list):
+                return [decode_one(item) for item in value]
+            return None if value is None else decode_one(value)
+
+        def encode(value: Any) -> Any:
+            if isinstance(value, list | tuple | set):
+                return [encode_one(item) for item in value]
+            return None if value is None else encode_one(value)
+
+        return decode, encode
+
+
+class CustomDataCodec:
+    """Decodifica e codifica i ``custom_data`` dei post o gli ``screen_data`` del workflow.
+
+    Le conversioni sono calcolate una sola volta dalla definizione, per id del campo e
+    FieldTypeEnum: interi, decimali (``Decimal``), date e date/ore (``date`` e ``datetime`` in
+    UTC), flag, link, valori enum (``EnumValue``) ed entry dei cataloghi (``CatalogEntry``, se i
+    cataloghi sono indicati). I campi non presenti nella definizione sono lasciati invariati.
+    In codifica i valori enum possono essere indicati con l'oggetto, con l'id o con la label.
+    """
+
+    def __init__(self, fields: Iterable[FieldCodec]) -> None:
+        self.fields: dict[str, FieldCodec] = {codec.key: codec for codec in fields}
+        # il campo si può indicare con l'id (intero o stringa) o con la label
+        self._lookup: dict[Any, FieldCodec] = {}
+        for codec in self.fields.values():
+            if codec.label:
+                self._lookup.setdefault(codec.label, codec)
+        for codec in self.fields.values():
+            self._lookup[codec.id] = self._lookup[codec.key] = codec
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __contains__(self, field: int | str) -> bool:
+        return field in self._lookup
+
+    @classmethod
+    def from_post_definition(
+        cls, definition: PostDefinition, catalogs: Iterable[Catalog] = ()
+    ) -> "CustomDataCodec":
+        catalogs = {catalog.id: catalog for catalog in catalogs}
+        return cls(
+            FieldCodec.compile(field, catalogs) for field in definition.field_definitions or []
+        )
+
+    @classmethod
+    def from_workflow_definition(
+        cls, definition: PostWorkflowDefinition, catalogs: Iterable[Catalog] = ()
+    ) -> "CustomDataCodec":
+        catalogs = {catalog.id: catalog for catalog in catalogs}
+        fields = {field.id: field for field in definition.screen_field_metadatas or []}
+        for transition in definition.transitions or []:
+            if transition.screen:
+                for field in transition.screen.field_metadatas or []:
+                    fields.setdefault(field.id, field)
+        return cls(FieldCodec.compile(field, catalogs) for field in fields.values())
+
+    def field(self, field: int | str) -> FieldCodec:
+        try:
+            return self._lookup[field]
+        except KeyError:
+            raise ObjectDoesNotFound(f"Field '{field}' not found in definition") from None
+
+    def decode(self, data: dict | None, by_label: bool = False) -> dict:
+        """Valori convertiti indicizzati per id del campo (o per label con ``by_label``)."""
+        if not data:
+            return {}
+        fields = self.fields
+        decoded = {}
+        for key, value in data.items():
+            codec = fields.get(key)
+            if codec is None:
+                decoded[key] = value
+            else:
+                decoded[codec.label if by_label else codec.id] = codec.decode(value)
+        return decoded
+
+    def encode(self, values: dict) -> dict[str, Any]:
+        """Valori pronti per ``custom_data`` o ``screen_data``, indicizzati per id stringa."""
+        lookup = self._lookup
+        encoded = {}
+        for key, value in values.items():
+            codec = lookup.get(key)
+            if codec is None:
+                encoded[str(key)] = value
+            else:
+                encoded[codec.key] = codec.encode(value)
+        return encoded
+
+    def decode_many(self, rows: Iterable[dict | None], by_label: bool = False) -> list[dict]:
+        return [self.decode(data, by_label=by_label) for data in rows]
+
+    def encode_many(self, rows: Iterable[dict]) -> list[dict[str, Any]]:
+        return [self.encode(values) for values in rows]
+
+    def decode_posts(self, posts: Iterable[Post], by_label: bool = False) -> dict[int, dict]:
+        """``custom_data`` decodificati di una pagina (o di un elenco) di post, per id del post."""
+        return {post.id: self.decode(post.custom_data, by_label=by_label) for post in posts}
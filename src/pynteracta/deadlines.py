@@ -0,0 +1,67 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+from .exceptions import DeadlineExceeded
+
+Timeout = float | tuple[float, float]
+
+
+class Deadline:
+    """Istante entro cui devono concludersi tutte le chiamate fatte in un contesto."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires = monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires - monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> float:
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.seconds}s exceeded")
+        return remaining
+
+
+current_deadline: ContextVar[Deadline | None] = ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[Deadline]:
+    """Limita a ``seconds`` secondi la durata complessiva delle chiamate fatte nel blocco (anche
+    dai thread avviati con una copia del contesto). Le chiamate restano limitate anche dalle
+    scadenze più vicine dei blocchi esterni; esaurito il tempo, le richieste successive
+    sollevano DeadlineExceeded senza essere inviate."""
+    current = Deadline(seconds)
+    outer = current_deadline.get()
+    if outer is not None and outer.expires < current.expires:
+        current = outer
+    token = current_deadline.set(current)
+    try:
+        yield current
+    finally:
+        current_deadline.reset(token)
+
+
+def endpoint_class(path: str) -> str:
+    """Classe dell'endpoint a cui si applicano i timeout: auth, admin, communication, ..."""
+    if "/auth/" in path:
+        return "auth"
+    return path.lstrip("/").split("/", 1)[0]
+
+
+def bounded_timeout(timeout: Timeout | None, remaining: float | None) -> Timeout | None:
+    # i timeout di connessione e di lettura non possono superare il tempo rimasto
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(min(value, remaining) for value in timeout)
+    return min(timeout, remaining)
@@ -0,0 +1,268 @@
+import json
+from functools import lru_cache
+from html import escape
+from html.parser import HTMLParser
+from typing import Any
+
+# Numero di documenti (descrizioni, commenti, frammenti) di cui si memorizza la conversione
+DELTA_CACHE_SIZE = 4096
+
+Delta = str | list | dict | None
+
+# Attributi di riga (applicati al "\n" che chiude la riga) e relativi tag html
+HEADER_TAGS = {f"h{level}": level for level in range(1, 7)}
+LIST_TAGS = {"bullet": "ul", "ordered": "ol"}
+BLOCK_TAGS = {"blockquote": "blockquote", "code-block": "pre"}
+
+# Attributi di testo e relativi tag html, dal più esterno al più interno
+INLINE_TAGS = {"bold": "strong", "italic": "em", "underline": "u", "strike": "s", "code": "code"}
+HTML_INLINE = {
+    "strong": "bold",
+    "b": "bold",
+    "em": "italic",
+    "i": "italic",
+    "u": "underline",
+    "s": "strike",
+    "strike": "strike",
+    "del": "strike",
+    "code": "code",
+}
+HTML_BLOCKS = {"p", "div", "li", "blockquote", "pre", *HEADER_TAGS}
+
+
+def parse_delta(delta: Delta) -> tuple[dict, ...]:
+    """Operazioni di un delta (Quill), indicato come json, come lista di operazioni o come
+    documento ``{"ops": [...]}``. Le operazioni restituite non vanno modificate."""
+    if delta is None or delta == "":
+        return ()
+    if isinstance(delta, str):
+        return _parse_delta(delta)
+    ops = delta.get("ops", []) if isinstance(delta, dict) else delta
+    return tuple(ops)
+
+
+@lru_cache(maxsize=DELTA_CACHE_SIZE)
+def _parse_delta(delta: str) -> tuple[dict, ...]:
+    return parse_delta(json.loads(delta))
+
+
+def dump_delta(ops: list[dict] | tuple[dict, ...]) -> str:
+    return json.dumps(list(ops), ensure_ascii=False, separators=(",", ":"))
+
+
+def normalize_ops(ops: list[dict] | tuple[dict, ...]) -> list[dict]:
+    """Unisce gli inserimenti di testo consecutivi con gli stessi attributi."""
+    normalized: list[dict] = []
+    for op in ops:
+        insert = op.get("insert")
+        if insert == "":
+            continue
+        previous = normalized[-1] if normalized else None
+        if (
+            previous is not None
+            and isinstance(insert, str)
+            and isinstance(previous["insert"], str)
+            and previous.get("attributes") == op.get("attributes")
+        ):
+            normalized[-1] = {**previous, "insert": previous["insert"] + insert}
+        else:
+            normalized.append(op)
+    return normalized
+
+
+def concat_deltas(*deltas: Delta) -> str:
+    """Delta formato dai documenti indicati, uno dopo l'altro (es. intestazione fissa di un
+    template più parte variabile): i frammenti ripetuti sono letti una sola volta."""
+    return dump_delta(normalize_ops([op for delta in deltas for op in parse_delta(delta)]))
+
+
+# testo semplice
+
+
+def text_to_delta(text: str | None) -> str:
+    if not text:
+        return dump_delta([{"insert": "\n"}])
+    return _text_to_delta(text)
+
+
+@lru_cache(maxsize=DELTA_CACHE_SIZE)
+def _text_to_delta(text: str) -> str:
+    return dump_delta([{"insert": text if text.endswith("\n") else text + "\n"}])
+
+
+def delta_to_text(delta: Delta) -> str:
+    """Testo del delta senza formattazione; gli embed (immagini, menzioni, ...) sono omessi."""
+    if isinstance(delta, str):
+        return _delta_to_text(delta)
+    return _ops_to_text(parse_delta(delta))
+
+
+@lru_cache(maxsize=DELTA_CACHE_SIZE)
+def _delta_to_text(delta: str) -> str:
+    return _ops_to_text(parse_delta(delta))
+
+
+def _ops_to_text(ops: tuple[dict, ...]) -> str:
+    text = "".join(op["insert"] for op in ops if isinstance(op.get("insert"), str))
+    return text.removesuffix("\n")
+
+
+# html
+
+
+def delta_to_html(delta: Delta) -> str:
+    if isinstance(delta, str):
+        return _delta_to_html(delta)
+    return _ops_to_html(parse_delta(delta))
+
+
+@lru_cache(maxsize=DELTA_CACHE_SIZE)
+def _delta_to_html(delta: str) -> str:
+    return _ops_to_html(parse_delta(delta))
+
+
+def _inline_html(text: str, attributes: dict) -> str:
+    html = escape(text, quote=False)
+    for name, tag in reversed(INLINE_TAGS.items()):
+        if attributes.get(name):
+            html = f"<{tag}>{html}</{tag}>"
+    if link := attributes.get("link"):
+        html = f'<a href="{escape(link)}">{html}</a>'
+    return html
+
+
+def _ops_to_html(ops: tuple[dict, ...]) -> str:
+    parts: list[str] = []
+    line: list[str] = []
+    open_list: str | None = None
+    for op in ops:
+        insert = op.get("insert")
+        if not isinstance(insert, str):
+            continue
+        attributes = op.get("attributes") or {}
+        segments = insert.split("\n")
+        for index, segment in enumerate(segments):
+            if segment:
+                line.append(_inline_html(segment, attributes))
+            if index == len(segments) - 1:
+                break
+            # fine riga: gli attributi dell'operazione sono quelli della riga
+            content = "".join(line) or "<br>"
+            line = []
+            list_tag = LIST_TAGS.get(attributes.get("list"))
+            if list_tag != open_list:
+                if open_list:
+                    parts.append(f"</{open_list}>")
+                if list_tag:
+                    parts.append(f"<{list_tag}>")
+                open_list = list_tag
+            if list_tag:
+                tag = "li"
+            elif attributes.get("header"):
+                tag = f"h{attributes['header']}"
+            else:
+                tag = next((tag for name, tag in BLOCK_TAGS.items() if attributes.get(name)), "p")
+            parts.append(f"<{tag}>{content}</{tag}>")
+    if line:
+        if open_list:
+            parts.append(f"</{open_list}>")
+            open_list = None
+        parts.append(f"<p>{''.join(line)}</p>")
+    if open_list:
+        parts.append(f"</{open_list}>")
+    return "".join(parts)
+
+
+def html_to_delta(html: str | None) -> str:
+    """Delta di un frammento html con i tag prodotti da ``delta_to_html`` (paragrafi, titoli,
+    elenchi, citazioni, codice, grassetto, corsivo, sottolineato, barrato e link)."""
+    if not html:
+        return text_to_delta(None)
+    return _html_to_delta(html)
+
+
+@lru_cache(maxsize=DELTA_CACHE_SIZE)
+def _html_to_delta(html: str) -> str:
+    parser = DeltaHTMLParser()
+    parser.feed(html)
+    parser.close()
+    return dump_delta(parser.finish())
+
+
+class DeltaHTMLParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.ops: list[dict] = []
+        self.inline: list[tuple[str, Any]] = []
+        self.lists: list[str] = []
+        self.block: dict = {}
+        self.in_block = False
+
+    def _attributes(self) -> dict:
+        return dict(self.inline)
+
+    def _insert(self, text: str, attributes: dict | None = None) -> None:
+        op: dict[str, Any] = {"insert": text}
+        if attributes:
+            op["attributes"] = attributes
+        self.ops.append(op)
+
+    def _newline(self) -> None:
+        self._insert("\n", dict(self.block))
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in HTML_INLINE:
+            self.inline.append((HTML_INLINE[tag], True))
+        elif tag == "a":
+            self.inline.append(("link", dict(attrs).get("href")))
+        elif tag == "br":
+            if self.in_block and self.ops and not self.ops[-1]["insert"].endswith("\n"):
+                # <br> all'interno di un paragrafo
+                self._newline()
+        elif tag in ("ul", "ol"):
+            self.lists.append("bullet" if tag == "ul" else "ordered")
+        elif tag in HTML_BLOCKS:
+            self.in_block = True
+            if tag in HEADER_TAGS:
+                self.block = {"header": HEADER_TAGS[tag]}
+            elif tag == "li":
+                self.block = {"list": self.lists[-1] if self.lists else "bullet"}
+            elif tag == "blockquote":
+                self.block = {"blockquote": True}
+            elif tag == "pre":
+                self.block = {"code-block": True}
+            else:
+                self.block = {}
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in HTML_INLINE or tag == "a":
+            name = "link" if tag == "a" else HTML_INLINE[tag]
+            for index in range(len(self.inline) - 1, -1, -1):
+                if self.inline[index][0] == name:
+                    del self.inline[index]
+                    break
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+        elif tag in HTML_BLOCKS:
+            self._newline()
+            self.block = {}
+            self.in_block = False
+
+    def handle_data(self, data: str) -> None:
+        if not self.in_block:
+            # testo fuori dai blocchi: gli spazi tra i tag sono ignorati
+            if not data.strip():
+                return
+            self.in_block = True
+        self._insert(data, self._attributes())
+
+    def finish(self) -> list[dict]:
+        if self.in_block:
+            self._newline()
+        return normalize_ops(self.ops) or [{"insert": "\n"}]
+
+
+def clear_caches() -> None:
+    for function in (_parse_delta, _text_to_delta, _delta_to_text, _delta_to_html, _html_to_delta):
+        function.cache_clear()
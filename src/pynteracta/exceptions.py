@@ -26,3 +26,23 @@ class PostDoesNotFound(ObjectDoesNotFound):
 
 class MultipleObjectsReturned(InteractaError):
     pass
+
+
+class CassetteError(InteractaError):
+    pass
+
+
+class QueryError(InteractaError):
+    pass
+
+
+class DeadlineExceeded(InteractaError):
+    pass
+
+
+class CircuitOpenError(InteractaError):
+    def __init__(self, message: str, endpoint: str | None = None, retry_after: float = 0.0):
+        super().__init__(message)
+        self.message = message
+        self.endpoint = endpoint
+        self.retry_after = retry_after
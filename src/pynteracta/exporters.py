@@ -0,0 +1,139 @@
+import contextvars
+import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .schemas.models import Post, PostComment
+from .schemas.requests import ListPostCommentsIn
+
+if TYPE_CHECKING:
+    from .api import InteractaApi
+
+
+@dataclass
+class ExportedComment:
+    post_id: int
+    comment: PostComment
+
+
+@dataclass
+class ExportStats:
+    posts: int = 0
+    skipped: int = 0
+    comments: int = 0
+
+
+@dataclass
+class ExportState:
+    """Stato di un export incrementale: numero di commenti e ultima operazione dei post
+    esportati. Può essere salvato e ricaricato in formato json tra un'esecuzione e l'altra."""
+
+    posts: dict[int, tuple[int | None, str | None]] = field(default_factory=dict)
+
+    @staticmethod
+    def signature(post: Post) -> tuple[int | None, str | None]:
+        timestamp = post.last_operation_timestamp
+        return post.comments_count, timestamp.isoformat() if timestamp else None
+
+    def changed(self, post: Post) -> bool:
+        return self.posts.get(post.id) != self.signature(post)
+
+    def update(self, post: Post) -> None:
+        self.posts[post.id] = self.signature(post)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ExportState":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        return cls({int(post_id): tuple(value) for post_id, value in data["posts"].items()})
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps({"posts": self.posts}))
+
+
+class CommentsExporter:
+    """Esporta i commenti di molti post scaricandone le pagine in parallelo.
+
+    I post possono essere indicati con l'id o con l'elemento dell'elenco dei post; in questo
+    caso, se è indicato uno ``state``, i post con numero di commenti e ultima operazione
+    invariati rispetto all'esecuzione precedente vengono saltati. I commenti di ogni post sono
+    restituiti tutti insieme, nell'ordine in cui i post vengono completati; lo stato di un post
+    è aggiornato solo dopo che i suoi commenti sono stati consumati.
+    """
+
+    def __init__(
+        self,
+        api: "InteractaApi",
+        max_workers: int = 8,
+        page_size: int = 100,
+        state: ExportState | None = None,
+    ) -> None:
+        self.api = api
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.state = state
+        self.stats = ExportStats()
+
+    def fetch(self, post_id: int) -> list[PostComment]:
+        data = ListPostCommentsIn(page_size=self.page_size)
+        return list(self.api.iter_comments(post_id, data=data))
+
+    def export_community(self, community_id: int) -> Iterator[ExportedComment]:
+        return self.export(self._commented_posts(community_id))
+
+    def _commented_posts(self, community_id: int) -> Iterator[Post]:
+        for post in self.api.iter_posts(community_id):
+            if post.comments_count != 0:
+                yield post
+            elif (
+                self.state is not None and post.id in self.state.posts and self.state.changed(post)
+            ):
+                # i post con commentsCount a 0 non richiedono chiamate, ma se prima avevano
+                # commenti (ora tutti eliminati) lo stato va comunque aggiornato
+                self.state.update(post)
+                self.stats.posts += 1
+
+    def export(self, posts: Iterable[Post | int]) -> Iterator[ExportedComment]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: dict[Future, Post | int] = {}
+            source = iter(posts)
+            try:
+                while True:
+                    # le richieste in coda sono limitate, così i post sono letti man mano
+                    while len(pending) < self.max_workers * 2:
+                        post = self._next_post(source)
+                        if post is None:
+                            break
+                        post_id = post if isinstance(post, int) else post.id
+                        context = contextvars.copy_context()
+                        pending[executor.submit(context.run, self.fetch, post_id)] = post
+                    if not pending:
+                        return
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        post = pending.pop(future)
+                        yield from self._collect(post, future.result())
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _next_post(self, source: Iterator[Post | int]) -> Post | int | None:
+        for post in source:
+            if isinstance(post, int) or self.state is None or self.state.changed(post):
+                return post
+            self.stats.skipped += 1
+        return None
+
+    def _collect(self, post: Post | int, comments: list[PostComment]) -> Iterator[ExportedComment]:
+        post_id = post if isinstance(post, int) else post.id
+        for comment in comments:
+            yield ExportedComment(post_id, comment)
+        self.stats.posts += 1
+        self.stats.comments += len(comments)
+        if self.state is not None and not isinstance(post, int):
+            self.state.update(post)
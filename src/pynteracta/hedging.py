@@ -0,0 +1,181 @@
+import contextvars
+import math
+import threading
+from collections import deque
+from collections.abc import Callable, Hashable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from time import perf_counter
+from typing import Any
+
+from .cache import CACHEABLE_OPERATIONS
+
+# Operazioni di sola lettura (idempotenti) le cui richieste possono essere duplicate, comprese
+# quelle di elenco inviate in POST
+HEDGED_OPERATIONS = frozenset(
+    {
+        *CACHEABLE_OPERATIONS,
+        "list_posts",
+        "list_posts_filtered",
+        "list_users",
+        "list_groups",
+        "list_catalogs",
+    }
+)
+
+# Credito massimo di richieste duplicate accumulabile nei periodi senza code lente
+MAX_HEDGE_TOKENS = 10.0
+
+
+class LatencyWindow:
+    """Latenze delle ultime richieste di un endpoint, per stimarne i percentili."""
+
+    def __init__(self, size: int) -> None:
+        self.values: deque[float] = deque(maxlen=size)
+        self._sorted: list[float] | None = None
+
+    def record(self, value: float) -> None:
+        self.values.append(value)
+        self._sorted = None
+
+    def percentile(self, percent: float) -> float:
+        if self._sorted is None:
+            self._sorted = sorted(self.values)
+        index = min(len(self._sorted) - 1, math.ceil(len(self._sorted) * percent / 100) - 1)
+        return self._sorted[max(index, 0)]
+
+
+class Hedger:
+    """Duplica le richieste di lettura che non ricevono risposta entro il percentile
+    ``percentile`` delle latenze recenti dell'endpoint, restituendo la prima risposta arrivata.
+
+    Ogni richiesta aggiunge ``budget`` al credito di richieste duplicate e ogni duplicato ne
+    consuma una unità, così le richieste aggiuntive restano al più una frazione ``budget`` del
+    totale. Finché un endpoint non ha almeno ``min_samples`` latenze registrate le sue richieste
+    non vengono duplicate. La risposta perdente viene scartata quando arriva.
+
+    Solo le richieste che potrebbero essere duplicate sono inviate dai ``max_workers`` thread
+    del pool: senza credito, o con tutti i thread occupati, la richiesta è eseguita nel thread
+    chiamante, così la concorrenza del client non è limitata dal pool.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_delay: float = 0.005,
+        window: int = 200,
+        min_samples: int = 20,
+        max_workers: int = 32,
+    ) -> None:
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        # creato alla prima richiesta duplicabile, così un Api senza hedging non avvia thread
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._windows: dict[Hashable, LatencyWindow] = {}
+        self._tokens = 0.0
+        # richieste in corso nei thread del pool
+        self._in_flight = 0
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+
+    def record(self, key: Hashable, latency: float) -> None:
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = LatencyWindow(self.window)
+            window.record(latency)
+
+    def delay(self, key: Hashable) -> float | None:
+        """Attesa prima di duplicare una richiesta dell'endpoint (None se non si duplica)."""
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or len(window.values) < self.min_samples:
+                return None
+            return max(window.percentile(self.percentile), self.min_delay)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="pynteracta-hedge"
+                )
+            return self._executor
+
+    def _timed(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        started = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # le latenze registrate sono quelle reali, anche delle risposte scartate, e non
+            # comprendono l'eventuale attesa in coda nel pool
+            self.record(key, perf_counter() - started)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _submit(self, key: Hashable, func: Callable, *args, **kwargs) -> Future:
+        executor = self._get_executor()
+        with self._lock:
+            self._in_flight += 1
+        # il contesto (deadline, chiamata in corso) è copiato nel thread della richiesta
+        context = contextvars.copy_context()
+        future = executor.submit(context.run, self._timed, key, func, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> tuple[Any, bool, bool]:
+        """Risultato di ``func``, se è stata duplicata e se ha vinto il duplicato."""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self._tokens + self.budget, MAX_HEDGE_TOKENS)
+            inline = self._tokens < 1 or self._in_flight >= self.max_workers
+        delay = None if inline else self.delay(key)
+        if delay is None:
+            return self._timed(key, func, *args, **kwargs), False, False
+        primary = self._submit(key, func, *args, **kwargs)
+        try:
+            return primary.result(timeout=delay), False, False
+        except FutureTimeoutError:
+            pass
+        if not self._take_token():
+            return primary.result(), False, False
+        hedge = self._submit(key, func, *args, **kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # a parità preferisce la richiesta originale
+            for future in sorted(done, key=lambda future: future is hedge):
+                if future.exception() is None:
+                    won = future is hedge
+                    if won:
+                        with self._lock:
+                            self.won += 1
+                    return future.result(), True, won
+        # entrambe fallite: si propaga l'errore della richiesta originale
+        return primary.result(), True, False
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "hedged": self.hedged, "won": self.won}
@@ -0,0 +1,215 @@
+import contextvars
+import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from .custom_data import CustomDataCodec
+from .schemas.requests import CreateCustomPostIn, ListCommunityPostsIn
+
+if TYPE_CHECKING:
+    from .api import InteractaApi
+
+
+class ImportStatus(StrEnum):
+    CREATED = "created"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass
+class ImportRecord:
+    """Post da importare: ``custom_id`` identifica il record tra un'esecuzione e l'altra, la
+    descrizione è testo semplice e i ``custom_data`` sono indicati per id o label del campo,
+    con i valori enum e le entry dei cataloghi anche per label."""
+
+    custom_id: str
+    title: str
+    description: str | None = None
+    custom_data: dict[int | str, Any] = field(default_factory=dict)
+    # altri campi di CreateCustomPostIn (visibility, draft, watcher_user_ids, ...)
+    options: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, row: dict) -> "ImportRecord":
+        row = dict(row)
+        return cls(
+            custom_id=str(row.pop("custom_id")),
+            title=row.pop("title"),
+            description=row.pop("description", None),
+            custom_data=row.pop("custom_data", None) or {},
+            options=row,
+        )
+
+
+@dataclass
+class ImportResult:
+    record: ImportRecord
+    status: ImportStatus
+    post_id: int | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class ImportStats:
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+class ImportJournal:
+    """Giornale dei post creati, in formato jsonl (una riga ``{"custom_id", "post_id"}`` per
+    post). Ogni riga è scritta appena il post è creato, così un'importazione interrotta può
+    essere ripresa; le righe incomplete o non valide vengono ignorate."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.posts: dict[str, int] = {}
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                    self.posts[entry["custom_id"]] = entry["post_id"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+        self._file = None
+
+    def __contains__(self, custom_id: str) -> bool:
+        return custom_id in self.posts
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, custom_id: str, post_id: int) -> None:
+        if self._file is None:
+            self._file = self.path.open("a")
+        self._file.write(json.dumps({"custom_id": custom_id, "post_id": post_id}) + "\n")
+        self._file.flush()
+        self.posts[custom_id] = post_id
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PostImporter:
+    """Crea in parallelo i post di una community a partire da un flusso di record.
+
+    Prima di iniziare costruisce l'indice dei ``custom_id`` dei post già presenti nella
+    community e ne legge la definizione, per convertire i ``custom_data`` indicati per label. I
+    record il cui ``custom_id`` è già nell'indice o nel ``journal`` sono saltati, così
+    un'importazione ripetuta (o ripresa dopo un errore) non crea duplicati. Al più
+    ``max_workers`` creazioni sono in corso contemporaneamente e i record sono letti man mano;
+    i risultati sono restituiti nell'ordine in cui le creazioni si concludono.
+    """
+
+    def __init__(
+        self,
+        api: "InteractaApi",
+        community_id: int,
+        max_workers: int = 8,
+        journal: ImportJournal | None = None,
+    ) -> None:
+        self.api = api
+        self.community_id = community_id
+        self.max_workers = max_workers
+        self.journal = journal
+        self.stats = ImportStats()
+        self.codec: CustomDataCodec | None = None
+        self.existing: dict[str, int] | None = None
+
+    def build_index(self) -> dict[str, int]:
+        """custom_id -> id dei post della community."""
+        data = ListCommunityPostsIn(page_size=100)
+        self.existing = {
+            post.custom_id: post.id
+            for post in self.api.iter_posts(self.community_id, data=data)
+            if post.custom_id
+        }
+        return self.existing
+
+    def prepare(self, record: ImportRecord) -> CreateCustomPostIn:
+        custom_data = self.codec.encode(record.custom_data) if record.custom_data else None
+        return CreateCustomPostIn.from_text(
+            record.title,
+            record.description,
+            custom_data=custom_data,
+            custom_id=record.custom_id,
+            **record.options,
+        )
+
+    def create(self, data: CreateCustomPostIn) -> int:
+        return self.api.create_post(self.community_id, data).post_id
+
+    def run(self, records: Iterable[ImportRecord | dict]) -> Iterator[ImportResult]:
+        if self.codec is None:
+            self.codec = self.api.get_custom_data_codec(self.community_id)
+        if self.existing is None:
+            self.build_index()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: dict[Future, ImportRecord] = {}
+            # custom_id dei record già incontrati, per saltare i duplicati nell'input
+            seen: set[str] = set()
+            source = iter(records)
+            try:
+                while True:
+                    while len(pending) < self.max_workers:
+                        record = next(source, None)
+                        if record is None:
+                            break
+                        if isinstance(record, dict):
+                            record = ImportRecord.from_dict(record)
+                        skipped = self._skip(record, seen)
+                        if skipped is not None:
+                            yield skipped
+                            continue
+                        try:
+                            data = self.prepare(record)
+                        except ValueError as exc:
+                            # valori non validi (es. label senza corrispondenza nella definizione)
+                            yield self._failed(record, exc)
+                            continue
+                        context = contextvars.copy_context()
+                        pending[executor.submit(context.run, self.create, data)] = record
+                    if not pending:
+                        return
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._collect(pending.pop(future), future)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _skip(self, record: ImportRecord, seen: set[str]) -> ImportResult | None:
+        custom_id = record.custom_id
+        post_id = self.existing.get(custom_id)
+        if post_id is None and self.journal is not None:
+            post_id = self.journal.posts.get(custom_id)
+        if post_id is None and custom_id not in seen:
+            seen.add(custom_id)
+            return None
+        self.stats.skipped += 1
+        return ImportResult(record, ImportStatus.SKIPPED, post_id)
+
+    def _failed(self, record: ImportRecord, error: Exception) -> ImportResult:
+        self.stats.failed += 1
+        return ImportResult(record, ImportStatus.FAILED, error=error)
+
+    def _collect(self, record: ImportRecord, future: Future) -> ImportResult:
+        error = future.exception()
+        if error is not None:
+            # il record resta fuori dal giornale e viene ritentato alla prossima esecuzione
+            return self._failed(record, error)
+        post_id = future.result()
+        self.existing[record.custom_id] = post_id
+        if self.journal is not None:
+            self.journal.record(record.custom_id, post_id)
+        self.stats.created += 1
+        return ImportResult(record, ImportStatus.CREATED, post_id)
@@ -0,0 +1,197 @@
+import bisect
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from .exceptions import MultipleObjectsReturned, PostDoesNotFound
+from .instrumentation import CallInfo, InstrumentationHook
+from .schemas.models import BaseListPostsElement
+from .schemas.requests import CommunityPostFilters, ListCommunityPostsFilteredIn
+
+if TYPE_CHECKING:
+    from .api import InteractaApi
+
+NGRAM_SIZE = 3
+
+
+def normalize_title(title: str | None) -> str:
+    return (title or "").strip().casefold()
+
+
+def ngrams(text: str) -> set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class PostTitleIndex(InstrumentationHook):
+    """Indice locale dei titoli dei post di una community.
+
+    Consente ricerche per titolo esatto (con o senza distinzione tra maiuscole e minuscole), per
+    prefisso e per sottostringa senza chiamare le api. Registrato come hook dell'api
+    (``api.add_hook(index)``) viene aggiornato con i post creati, modificati ed eliminati dal
+    client stesso; le modifiche fatte da altri sono recuperate con ``refresh``. Aggiornamenti
+    e ricerche sono protetti da un lock, perché gli hook sono invocati anche dai thread che
+    creano o modificano post in parallelo.
+    """
+
+    def __init__(self, community_id: int) -> None:
+        self.community_id = int(community_id)
+        self.posts: dict[int, BaseListPostsElement] = {}
+        # titolo normalizzato -> id dei post, più le strutture per prefissi e sottostringhe
+        self._by_key: dict[str, set[int]] = {}
+        self._sorted_keys: list[str] = []
+        self._ngrams: dict[str, set[str]] = {}
+        self.last_modify_timestamp: datetime | None = None
+        # rientrante: add richiama remove e set_title richiama add
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def __contains__(self, post_id: int) -> bool:
+        return post_id in self.posts
+
+    @classmethod
+    def build(cls, api: "InteractaApi", community_id: int, **kwargs) -> "PostTitleIndex":
+        index = cls(community_id)
+        index.update(api.iter_posts(community_id, **kwargs))
+        return index
+
+    def update(self, posts: Iterable[BaseListPostsElement]) -> None:
+        for post in posts:
+            self.add(post)
+
+    def refresh(self, api: "InteractaApi", **kwargs) -> int:
+        """Aggiorna l'indice con i post creati o modificati dopo l'ultima modifica indicizzata.
+
+        I post eliminati da altri client non vengono rilevati: in quel caso serve ricostruire
+        l'indice.
+        """
+        filters = CommunityPostFilters()
+        if self.last_modify_timestamp is not None:
+            filters.modified_timestamp_from = int(self.last_modify_timestamp.timestamp() * 1000)
+        data = ListCommunityPostsFilteredIn(community_post_filters=filters, page_size=100)
+        count = 0
+        for post in api.iter_posts_filtered(self.community_id, data=data, **kwargs):
+            self.add(post)
+            count += 1
+        return count
+
+    def add(self, post: BaseListPostsElement) -> None:
+        with self._lock:
+            if post.id in self.posts:
+                self.remove(post.id)
+            self.posts[post.id] = post
+            key = normalize_title(post.title)
+            post_ids = self._by_key.get(key)
+            if post_ids is None:
+                post_ids = self._by_key[key] = set()
+                bisect.insort(self._sorted_keys, key)
+                for ngram in ngrams(key):
+                    self._ngrams.setdefault(ngram, set()).add(key)
+            post_ids.add(post.id)
+            timestamp = post.last_modify_timestamp
+            if timestamp is not None and (
+                self.last_modify_timestamp is None or timestamp > self.last_modify_timestamp
+            ):
+                self.last_modify_timestamp = timestamp
+
+    def remove(self, post_id: int) -> BaseListPostsElement | None:
+        with self._lock:
+            post = self.posts.pop(post_id, None)
+            if post is None:
+                return None
+            key = normalize_title(post.title)
+            post_ids = self._by_key[key]
+            post_ids.discard(post_id)
+            if not post_ids:
+                del self._by_key[key]
+                del self._sorted_keys[bisect.bisect_left(self._sorted_keys, key)]
+                for ngram in ngrams(key):
+                    keys = self._ngrams[ngram]
+                    keys.discard(key)
+                    if not keys:
+                        del self._ngrams[ngram]
+            return post
+
+    def set_title(self, post_id: int, title: str) -> None:
+        with self._lock:
+            post = self.posts.get(post_id)
+            if post is not None and post.title != title:
+                self.add(post.model_copy(update={"title": title}))
+
+    def _posts_for_keys(self, keys: Iterable[str]) -> list[BaseListPostsElement]:
+        with self._lock:
+            post_ids = sorted(post_id for key in keys for post_id in self._by_key[key])
+            return [self.posts[post_id] for post_id in post_ids]
+
+    def find_exact(self, title: str, case_sensitive: bool = False) -> list[BaseListPostsElement]:
+        """Post con il titolo indicato; gli spazi iniziali e finali sono sempre ignorati, come
+        nella normalizzazione dei titoli indicizzati."""
+        with self._lock:
+            key = normalize_title(title)
+            posts = self._posts_for_keys([key] if key in self._by_key else [])
+            if case_sensitive:
+                return [post for post in posts if post.title.strip() == title.strip()]
+            return posts
+
+    def find_prefix(self, prefix: str) -> list[BaseListPostsElement]:
+        prefix = normalize_title(prefix)
+        keys = []
+        with self._lock:
+            sorted_keys = self._sorted_keys
+            position = bisect.bisect_left(sorted_keys, prefix)
+            while position < len(sorted_keys) and sorted_keys[position].startswith(prefix):
+                keys.append(sorted_keys[position])
+                position += 1
+            return self._posts_for_keys(keys)
+
+    def find_substring(self, text: str) -> list[BaseListPostsElement]:
+        with self._lock:
+            text = text.casefold()
+            if len(text) < NGRAM_SIZE:
+                candidates = self._by_key
+            else:
+                sets = sorted((self._ngrams.get(ngram, set()) for ngram in ngrams(text)), key=len)
+                candidates = set.intersection(*sets) if sets else set()
+            return self._posts_for_keys(key for key in candidates if text in key)
+
+    def get_by_title(self, title: str) -> BaseListPostsElement:
+        posts = self.find_substring(title)
+        if len(posts) == 0:
+            raise PostDoesNotFound(f"Post with '{title}' in title non found in interacta")
+        elif len(posts) > 1:
+            raise MultipleObjectsReturned(
+                f"Multiple post with '{title}' in title founded in interacta"
+            )
+        return posts[0]
+
+    def get_by_exact_title(self, title: str) -> BaseListPostsElement:
+        posts = self.find_exact(title)
+        if len(posts) == 0:
+            raise PostDoesNotFound(f"Post with title '{title}' non found in interacta")
+        elif len(posts) > 1:
+            raise MultipleObjectsReturned(
+                f"Multiple post with title '{title}' founded in interacta"
+            )
+        return posts[0]
+
+    def after_request(self, call: CallInfo) -> None:
+        if call.failed or call.operation is None:
+            return
+        arguments = call.arguments
+        if call.operation == "create_post":
+            # con validate=False il risultato è la risposta non validata, senza post_id
+            result_id = getattr(call.result, "post_id", None)
+            if int(arguments.get("community_id", 0)) == self.community_id and result_id:
+                self.add(
+                    BaseListPostsElement(
+                        id=result_id,
+                        community_id=self.community_id,
+                        title=arguments["data"].title,
+                    )
+                )
+        elif call.operation == "edit_post":
+            self.set_title(int(arguments["post_id"]), arguments["data"].title)
+        elif call.operation == "delete_post":
+            self.remove(int(arguments["post_id"]))
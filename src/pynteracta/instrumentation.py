@@ -0,0 +1,292 @@
+import bisect
+import logging
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Argomenti dei metodi api che non compaiono mai nel path
+NOT_PATH_ARGUMENTS = frozenset({"self", "data", "params", "parms", "headers", "kwargs"})
+
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie"})
+
+
+@dataclass
+class CallInfo:
+    """Dati di una singola chiamata alle api, condivisi con gli hook di strumentazione."""
+
+    # nome del metodo di InteractaApi (None per le chiamate dirette a call_api, es. login)
+    operation: str | None = None
+    arguments: dict[str, Any] = field(default_factory=dict)
+    method: str = ""
+    path: str = ""
+    path_template: str = ""
+    status_code: int | None = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    # risposta condivisa con una richiesta identica già in corso (vedi SingleFlight)
+    coalesced: bool = False
+    # risposta restituita dalla cache senza chiamare le api (vedi ResponseCache)
+    cached: bool = False
+    # richiesta duplicata dopo un ritardo e risposta ottenuta dal duplicato (vedi Hedger)
+    hedged: bool = False
+    hedge_won: bool = False
+    started: float = field(default_factory=perf_counter)
+    # tempo fino alla ricezione degli header della risposta (connessione inclusa: requests non
+    # espone separatamente il tempo di connect)
+    server_time: float | None = None
+    download_time: float | None = None
+    validation_time: float | None = None
+    total_time: float | None = None
+    error: BaseException | None = None
+    # valore restituito dal metodo di InteractaApi (risposta validata o Response)
+    result: Any = None
+    # dati aggiuntivi valorizzati da hook o altre funzionalità del client
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.path_template}"
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+current_call: ContextVar[CallInfo | None] = ContextVar("pynteracta_current_call", default=None)
+
+
+def template_path(path: str, arguments: dict[str, Any]) -> str:
+    """Ricostruisce il template del path sostituendo i valori degli argomenti con il loro nome.
+
+    I segmenti numerici che non corrispondono ad alcun argomento diventano '{id}'.
+    """
+    values = {
+        str(value): name
+        for name, value in arguments.items()
+        if name not in NOT_PATH_ARGUMENTS and isinstance(value, str | int)
+    }
+    segments = []
+    for segment in path.split("/"):
+        if segment in values:
+            segment = f"{{{values[segment]}}}"
+        elif segment.lstrip("-").isdigit():
+            segment = "{id}"
+        segments.append(segment)
+    return "/".join(segments)
+
+
+def authorization_header(headers: dict | None) -> str | None:
+    """Header di autenticazione della richiesta, che identifica l'utente (o il token)."""
+    return next(
+        (value for key, value in (headers or {}).items() if key.lower() == "authorization"), None
+    )
+
+
+def redact_headers(headers: dict | None) -> dict:
+    if not headers:
+        return {}
+    return {
+        key: "***" if key.lower() in SENSITIVE_HEADERS else value for key, value in headers.items()
+    }
+
+
+class InstrumentationHook:
+    """Classe base per gli hook invocati prima e dopo ogni chiamata alle api."""
+
+    def before_request(self, call: CallInfo) -> None:
+        pass
+
+    def after_request(self, call: CallInfo) -> None:
+        pass
+
+
+def notify_hooks(hooks: list[InstrumentationHook], event: str, call: CallInfo) -> None:
+    for hook in hooks:
+        try:
+            getattr(hook, event)(call)
+        except Exception:
+            logger.exception(f"Error in instrumentation hook {hook!r} on {event}")
+
+
+# Limiti superiori (secondi) dei bucket degli istogrammi di latenza
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    float("inf"),
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Stima del percentile come limite superiore del bucket che lo contiene."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        cumulative = 0
+        for bucket, count in zip(self.buckets, self.counts, strict=True):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bucket, self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class EndpointMetrics:
+    TIMINGS = ("total_time", "server_time", "download_time", "validation_time")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.cached = 0
+        self.hedged = 0
+        self.hedge_won = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status_codes: dict[int, int] = {}
+        self.histograms = {timing: Histogram() for timing in self.TIMINGS}
+
+    def observe(self, call: CallInfo) -> None:
+        self.calls += 1
+        self.errors += int(call.failed)
+        self.coalesced += int(call.coalesced)
+        self.cached += int(call.cached)
+        self.hedged += int(call.hedged)
+        self.hedge_won += int(call.hedge_won)
+        self.request_bytes += call.request_bytes
+        self.response_bytes += call.response_bytes
+        if call.status_code is not None:
+            self.status_codes[call.status_code] = self.status_codes.get(call.status_code, 0) + 1
+        for timing, histogram in self.histograms.items():
+            value = getattr(call, timing)
+            if value is not None:
+                histogram.observe(value)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "coalesced": self.coalesced,
+            "cached": self.cached,
+            "hedged": self.hedged,
+            "hedge_won": self.hedge_won,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "status_codes": dict(self.status_codes),
+            **{timing: histogram.as_dict() for timing, histogram in self.histograms.items()},
+        }
+
+
+class MetricsAggregator(InstrumentationHook):
+    """Hook che aggrega in memoria le metriche delle chiamate per endpoint."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def after_request(self, call: CallInfo) -> None:
+        with self._lock:
+            self.endpoints.setdefault(call.endpoint, EndpointMetrics()).observe(call)
+
+    def summary(self) -> dict[str, dict]:
+        """Metriche per endpoint, ordinate per tempo totale decrescente."""
+        with self._lock:
+            items = [(endpoint, metrics.as_dict()) for endpoint, metrics in self.endpoints.items()]
+        return dict(sorted(items, key=lambda item: item[1]["total_time"]["total"], reverse=True))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+
+
+class OpenTelemetryHook(InstrumentationHook):
+    """Adattatore che crea uno span per chiamata tramite un tracer OpenTelemetry.
+
+    Il tracer è passato dall'esterno (es. ``opentelemetry.trace.get_tracer(__name__)``), per cui
+    opentelemetry non è una dipendenza di pynteracta.
+    """
+
+    SPAN_KEY = "otel_span"
+
+    def __init__(self, tracer: Any) -> None:
+        self.tracer = tracer
+
+    def before_request(self, call: CallInfo) -> None:
+        call.extra[self.SPAN_KEY] = self.tracer.start_span(
+            call.endpoint,
+            attributes={
+                "http.request.method": call.method,
+                "url.template": call.path_template,
+                "url.path": call.path,
+                "pynteracta.operation": call.operation or "",
+            },
+        )
+
+    def after_request(self, call: CallInfo) -> None:
+        span = call.extra.pop(self.SPAN_KEY, None)
+        if span is None:
+            return
+        attributes = {
+            "http.request.body.size": call.request_bytes,
+            "http.response.body.size": call.response_bytes,
+        }
+        if call.status_code is not None:
+            attributes["http.response.status_code"] = call.status_code
+        for timing in EndpointMetrics.TIMINGS:
+            value = getattr(call, timing)
+            if value is not None:
+                attributes[f"pynteracta.{timing}"] = value
+        span.set_attributes(attributes)
+        if call.error is not None:
+            span.record_exception(call.error)
+            self._set_error_status(span, call.error)
+        span.end()
+
+    @staticmethod
+    def _set_error_status(span: Any, error: BaseException) -> None:
+        try:
+            from opentelemetry.trace import Status, StatusCode
+        except ImportError:
+            return
+        span.set_status(Status(StatusCode.ERROR, str(error)))
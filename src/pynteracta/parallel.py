@@ -0,0 +1,117 @@
+import json
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Self
+
+from pydantic import BaseModel
+
+from .schemas.core import PaginatedIn
+
+# Token della pagina successiva letto dal json grezzo, senza validare la risposta
+NEXT_PAGE_TOKEN_RE = re.compile(rb'"nextPageToken"\s*:\s*("(?:[^"\\]|\\.)*"|null)')
+# Stringhe json, ignorate nel conteggio delle parentesi
+JSON_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+
+def nesting(content: bytes) -> int:
+    """Variazione del livello di annidamento in un frammento di json con stringhe complete."""
+    structure = JSON_STRING_RE.sub(b"", content)
+    opened = structure.count(b"{") + structure.count(b"[")
+    return opened - structure.count(b"}") - structure.count(b"]")
+
+
+def next_page_token(content: bytes) -> str | None:
+    # la stessa chiave può comparire negli elementi: vale solo quella dell'oggetto principale
+    depth, position = 0, 0
+    for match in NEXT_PAGE_TOKEN_RE.finditer(content):
+        depth += nesting(content[position : match.start()])
+        position = match.start()
+        if depth == 1:
+            return json.loads(match.group(1))
+    return None
+
+
+def validate_page(
+    schema_out: type[BaseModel], content: bytes, transform: Callable[[Any], Any] | None = None
+) -> Any:
+    """Valida una pagina (ed eventualmente la trasforma): eseguita nei processi del pool."""
+    page = schema_out.model_validate_json(content)
+    return transform(page) if transform is not None else page
+
+
+@dataclass(frozen=True)
+class Columns:
+    """Trasforma una pagina in colonne (campo -> valori degli elementi), più leggere da
+    restituire al processo principale dei modelli validati."""
+
+    fields: tuple[str, ...]
+
+    def __call__(self, page: Any) -> dict[str, list]:
+        items = page.items or []
+        return {name: [getattr(item, name) for item in items] for name in self.fields}
+
+
+class ParallelValidator:
+    """Scarica le pagine di un elenco nel processo corrente e ne affida la validazione (e la
+    trasformazione) a un pool di processi, così il lavoro di pydantic scala con i core.
+
+    Le pagine sono richieste una dopo l'altra, leggendo il token della successiva dal json
+    grezzo, e i risultati sono restituiti nell'ordine delle pagine. Al più ``prefetch`` pagine
+    sono in attesa di validazione. Le funzioni di trasformazione devono essere serializzabili
+    con pickle (funzioni di modulo o istanze come ``Columns``).
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        prefetch: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.prefetch = prefetch or self.max_workers * 2
+        self._owned = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._owned:
+            self.executor.shutdown(cancel_futures=True)
+
+    def iter_pages(
+        self,
+        fetch: Callable,
+        data: PaginatedIn,
+        transform: Callable[[Any], Any] | None = None,
+        **kwargs,
+    ) -> Iterator:
+        """Come ``InteractaApi.iter_pages`` ma restituisce le pagine (validate o trasformate)
+        invece dei singoli elementi. ``fetch`` è un metodo dell'api decorato con interactapi."""
+        schema_out = fetch.schema_out
+        pending: deque[Future] = deque()
+        page_token = None
+        try:
+            while True:
+                data.page_token = page_token
+                content = fetch(data=data, validate=False, **kwargs).content
+                pending.append(self.executor.submit(validate_page, schema_out, content, transform))
+                page_token = next_page_token(content)
+                while pending and (len(pending) >= self.prefetch or not page_token):
+                    yield pending.popleft().result()
+                if not page_token:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def iter_items(self, fetch: Callable, data: PaginatedIn, **kwargs) -> Iterator:
+        for page in self.iter_pages(fetch, data, **kwargs):
+            yield from page.items or []
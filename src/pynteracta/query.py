@@ -0,0 +1,601 @@
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from .enums import FieldFilterTypeEnum
+from .exceptions import QueryError
+from .schemas.models import BaseListPostsElement, CustomFieldFilter, Post
+from .schemas.requests import CommunityPostFilters, ListCommunityPostsFilteredIn
+
+if TYPE_CHECKING:
+    from .api import InteractaApi
+    from .trees import ChoiceTree
+
+
+def to_timestamp_ms(value: datetime | int | None) -> int | None:
+    if value is None or isinstance(value, int):
+        return value
+    return int(value.timestamp() * 1000)
+
+
+class FilterBuilder:
+    """Valori di CommunityPostFilters raccolti dai predicati spinti lato server.
+
+    I metodi restituiscono False, senza modificare i filtri, se il vincolo non è esprimibile
+    insieme a quelli già presenti (es. due filtri diversi sul titolo). Se i vincoli sono
+    contraddittori (es. due insiemi di stati disgiunti) ``empty`` diventa True: nessun post li
+    soddisfa e la ricerca non va inviata al server.
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+        self.field_filters: list[CustomFieldFilter] = []
+        self.empty = False
+
+    def contradiction(self) -> bool:
+        self.empty = True
+        return True
+
+    def set_once(self, name: str, value: Any) -> bool:
+        if self.values.get(name, value) != value:
+            return False
+        self.values[name] = value
+        return True
+
+    def intersect(self, name: str, ids: Iterable[int]) -> bool:
+        ids = set(ids)
+        if name in self.values:
+            ids &= set(self.values[name])
+        # un elenco vuoto sarebbe ignorato dal server invece di non restituire nulla
+        if not ids:
+            return self.contradiction()
+        self.values[name] = sorted(ids)
+        return True
+
+    def narrow(self, name: str, low: int | None, high: int | None) -> bool:
+        if low is not None:
+            current = self.values.get(f"{name}_from")
+            self.values[f"{name}_from"] = low if current is None else max(current, low)
+        if high is not None:
+            current = self.values.get(f"{name}_to")
+            self.values[f"{name}_to"] = high if current is None else min(current, high)
+        low, high = self.values.get(f"{name}_from"), self.values.get(f"{name}_to")
+        if low is not None and high is not None and low > high:
+            return self.contradiction()
+        return True
+
+    def add_field_filter(self, field_filter: CustomFieldFilter) -> bool:
+        self.field_filters.append(field_filter)
+        return True
+
+    def build(self) -> CommunityPostFilters:
+        filters = CommunityPostFilters(**self.values)
+        if self.field_filters:
+            filters.post_field_filters = self.field_filters
+        return filters
+
+
+class Predicate:
+    # False per i predicati valutabili solo dal server (i dati non sono negli elementi dell'elenco)
+    local: bool = True
+
+    def matches(self, post: Post) -> bool:
+        raise NotImplementedError
+
+    def push(self, filters: FilterBuilder) -> bool:
+        """Aggiunge il predicato ai filtri lato server, restituisce True se questi lo soddisfano
+        completamente. Può anche aggiungere un filtro meno restrittivo e restituire False: il
+        predicato viene allora rivalutato localmente."""
+        return False
+
+    def union(self, other: "Predicate") -> "Predicate | None":
+        """Predicato equivalente a ``self | other``, se esprimibile lato server."""
+        return None
+
+    @property
+    def evaluable(self) -> bool:
+        return self.local
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+class And(Predicate):
+    def __init__(self, *predicates: Predicate) -> None:
+        self.predicates = [
+            child
+            for predicate in predicates
+            for child in (predicate.predicates if isinstance(predicate, And) else [predicate])
+        ]
+
+    @property
+    def evaluable(self) -> bool:
+        return all(predicate.evaluable for predicate in self.predicates)
+
+    def matches(self, post: Post) -> bool:
+        return all(predicate.matches(post) for predicate in self.predicates)
+
+    def __repr__(self) -> str:
+        return f"And({', '.join(map(repr, self.predicates))})"
+
+
+class Or(Predicate):
+    def __init__(self, *predicates: Predicate) -> None:
+        self.predicates = [
+            child
+            for predicate in predicates
+            for child in (predicate.predicates if isinstance(predicate, Or) else [predicate])
+        ]
+
+    @property
+    def evaluable(self) -> bool:
+        return all(predicate.evaluable for predicate in self.predicates)
+
+    def matches(self, post: Post) -> bool:
+        return any(predicate.matches(post) for predicate in self.predicates)
+
+    def push(self, filters: FilterBuilder) -> bool:
+        # un'alternativa tra valori dello stesso campo diventa un unico filtro IN
+        merged = self.predicates[0]
+        for predicate in self.predicates[1:]:
+            merged = merged.union(predicate)
+            if merged is None:
+                return False
+        return merged.push(filters)
+
+    def __repr__(self) -> str:
+        return f"Or({', '.join(map(repr, self.predicates))})"
+
+
+class Not(Predicate):
+    def __init__(self, predicate: Predicate) -> None:
+        self.predicate = predicate
+
+    @property
+    def evaluable(self) -> bool:
+        return self.predicate.evaluable
+
+    def matches(self, post: Post) -> bool:
+        return not self.predicate.matches(post)
+
+    def __repr__(self) -> str:
+        return f"Not({self.predicate!r})"
+
+
+class Where(Predicate):
+    """Condizione arbitraria sul post, valutata sempre localmente."""
+
+    def __init__(self, func: Callable[[Post], bool], description: str = "") -> None:
+        self.func = func
+        self.description = description or getattr(func, "__name__", "")
+
+    def matches(self, post: Post) -> bool:
+        return bool(self.func(post))
+
+    def __repr__(self) -> str:
+        return f"Where({self.description})"
+
+
+@dataclass(repr=False)
+class TextContains(Predicate):
+    # campo del post confrontato e corrispondente filtro lato server
+    attribute: str
+    filter_name: str
+    text: str
+
+    def matches(self, post: Post) -> bool:
+        value = getattr(post, self.attribute) or ""
+        return self.text.casefold() in value.casefold()
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.set_once(self.filter_name, self.text)
+
+    def __repr__(self) -> str:
+        return f"{self.attribute} contains {self.text!r}"
+
+
+@dataclass(repr=False)
+class FullTextContains(Predicate):
+    text: str
+
+    def matches(self, post: Post) -> bool:
+        text = self.text.casefold()
+        return any(
+            text in (value or "").casefold() for value in (post.title, post.description_plain_text)
+        )
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.set_once("contains_text", self.text)
+
+    def __repr__(self) -> str:
+        return f"text contains {self.text!r}"
+
+
+@dataclass(repr=False)
+class TitleEquals(Predicate):
+    text: str
+    case_sensitive: bool = False
+
+    def matches(self, post: Post) -> bool:
+        title = post.title.strip()
+        if self.case_sensitive:
+            return title == self.text.strip()
+        return title.casefold() == self.text.strip().casefold()
+
+    def push(self, filters: FilterBuilder) -> bool:
+        # il server filtra per sottostringa: restringe i risultati ma il confronto esatto resta
+        # locale
+        filters.set_once("title", self.text.strip())
+        return False
+
+    def __repr__(self) -> str:
+        return f"title == {self.text!r}"
+
+
+@dataclass(repr=False)
+class CreatedBy(Predicate):
+    user_ids: list[int]
+
+    def matches(self, post: Post) -> bool:
+        return post.creator_user is not None and post.creator_user.id in self.user_ids
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.intersect("created_by_user_ids", self.user_ids)
+
+    def union(self, other: Predicate) -> Predicate | None:
+        if isinstance(other, CreatedBy):
+            return CreatedBy(sorted({*self.user_ids, *other.user_ids}))
+        return None
+
+    def __repr__(self) -> str:
+        return f"creator in {self.user_ids}"
+
+
+@dataclass(repr=False)
+class TimestampBetween(Predicate):
+    # "creation" o "modified"
+    name: str
+    low: int | None = None
+    high: int | None = None
+
+    def matches(self, post: Post) -> bool:
+        attribute = "creation_timestamp" if self.name == "creation" else "last_modify_timestamp"
+        value = to_timestamp_ms(getattr(post, attribute))
+        if value is None:
+            return False
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.narrow(f"{self.name}_timestamp", self.low, self.high)
+
+    def __repr__(self) -> str:
+        return f"{self.name} between {self.low} and {self.high}"
+
+
+@dataclass(repr=False)
+class StatusIn(Predicate):
+    status_ids: list[int]
+    local = False
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.intersect("current_workflow_status_ids", self.status_ids)
+
+    def union(self, other: Predicate) -> Predicate | None:
+        if isinstance(other, StatusIn):
+            return StatusIn(sorted({*self.status_ids, *other.status_ids}))
+        return None
+
+    def __repr__(self) -> str:
+        return f"status in {self.status_ids}"
+
+
+@dataclass(repr=False)
+class HashtagsIn(Predicate):
+    hashtag_ids: list[int]
+    match_all: bool = False
+    local = False
+
+    def push(self, filters: FilterBuilder) -> bool:
+        ids = set(self.hashtag_ids)
+        # con un solo hashtag "almeno uno" e "tutti" coincidono
+        match_all = self.match_all or len(ids) == 1
+        if not ids:
+            # tutti gli hashtag di un elenco vuoto: sempre vero; almeno uno: mai
+            return True if match_all else filters.contradiction()
+        if "hashtag_ids" not in filters.values:
+            filters.values["hashtag_ids"] = sorted(ids)
+            filters.values["hashtags_logical_and"] = match_all
+            return True
+        current = set(filters.values["hashtag_ids"])
+        current_all = filters.values["hashtags_logical_and"]
+        if current_all and match_all:
+            ids |= current
+        elif current_all or match_all:
+            # "tutti" implica "almeno uno" di un insieme che ne condivide qualcuno
+            if current.isdisjoint(ids):
+                return False
+            if current_all:
+                return True
+        elif current <= ids:
+            return True
+        elif not ids <= current:
+            # "almeno uno" di due insiemi non è esprimibile con un solo filtro
+            return False
+        filters.values["hashtag_ids"] = sorted(ids)
+        filters.values["hashtags_logical_and"] = match_all
+        return True
+
+    def __repr__(self) -> str:
+        return f"hashtags {'all' if self.match_all else 'any'} of {self.hashtag_ids}"
+
+
+@dataclass(repr=False)
+class VisibilityIs(Predicate):
+    visibility: int
+
+    def matches(self, post: Post) -> bool:
+        return post.visibility == self.visibility
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.set_once("visibility", self.visibility)
+
+    def __repr__(self) -> str:
+        return f"visibility == {self.visibility}"
+
+
+@dataclass(repr=False)
+class CustomFieldIs(Predicate):
+    column_id: int
+    type_id: FieldFilterTypeEnum
+    parameters: list[Any]
+
+    def matches(self, post: Post) -> bool:
+        value = (post.custom_data or {}).get(str(self.column_id))
+        values = value if isinstance(value, list) else [value]
+        parameters = self.parameters
+        match self.type_id:
+            case FieldFilterTypeEnum.EQUAL:
+                return bool(parameters) and value == parameters[0]
+            case FieldFilterTypeEnum.INTERVAL:
+                low, high = (list(parameters) + [None, None])[:2]
+                return (
+                    value is not None
+                    and (low is None or value >= low)
+                    and (high is None or value <= high)
+                )
+            case FieldFilterTypeEnum.LIKE:
+                return (
+                    bool(parameters)
+                    and isinstance(value, str)
+                    and parameters[0].casefold() in value.casefold()
+                )
+            case FieldFilterTypeEnum.IN | FieldFilterTypeEnum.CONTAINS:
+                return any(item in parameters for item in values)
+            case FieldFilterTypeEnum.IS_NULL_OR_IN:
+                return value in (None, []) or any(item in parameters for item in values)
+            case FieldFilterTypeEnum.IS_EMPTY:
+                return value in (None, "", [])
+        return False
+
+    def push(self, filters: FilterBuilder) -> bool:
+        return filters.add_field_filter(
+            CustomFieldFilter(
+                column_id=self.column_id, type_id=self.type_id, parameters=self.parameters
+            )
+        )
+
+    def union(self, other: Predicate) -> Predicate | None:
+        in_types = (FieldFilterTypeEnum.EQUAL, FieldFilterTypeEnum.IN)
+        if (
+            isinstance(other, CustomFieldIs)
+            and other.column_id == self.column_id
+            and self.type_id in in_types
+            and other.type_id in in_types
+        ):
+            parameters = list(dict.fromkeys([*self.parameters, *other.parameters]))
+            return CustomFieldIs(self.column_id, FieldFilterTypeEnum.IN, parameters)
+        return None
+
+    def __repr__(self) -> str:
+        return f"custom[{self.column_id}] {self.type_id.name} {self.parameters}"
+
+
+class Title:
+    @staticmethod
+    def contains(text: str) -> Predicate:
+        return TextContains("title", "title", text)
+
+    @staticmethod
+    def equals(text: str, case_sensitive: bool = False) -> Predicate:
+        return TitleEquals(text, case_sensitive)
+
+
+class Description:
+    @staticmethod
+    def contains(text: str) -> Predicate:
+        return TextContains("description_plain_text", "description", text)
+
+
+class Text:
+    @staticmethod
+    def contains(text: str) -> Predicate:
+        return FullTextContains(text)
+
+
+class Created:
+    @staticmethod
+    def between(low: datetime | int | None = None, high: datetime | int | None = None):
+        return TimestampBetween("creation", to_timestamp_ms(low), to_timestamp_ms(high))
+
+    @staticmethod
+    def by(*user_ids: int) -> Predicate:
+        return CreatedBy(list(user_ids))
+
+
+class Modified:
+    @staticmethod
+    def between(low: datetime | int | None = None, high: datetime | int | None = None):
+        return TimestampBetween("modified", to_timestamp_ms(low), to_timestamp_ms(high))
+
+
+class Status:
+    @staticmethod
+    def isin(*status_ids: int) -> Predicate:
+        return StatusIn(list(status_ids))
+
+
+class Hashtags:
+    @staticmethod
+    def any(*hashtag_ids: int) -> Predicate:
+        return HashtagsIn(list(hashtag_ids))
+
+    @staticmethod
+    def all(*hashtag_ids: int) -> Predicate:
+        return HashtagsIn(list(hashtag_ids), match_all=True)
+
+
+class Visibility:
+    @staticmethod
+    def equals(visibility: int) -> Predicate:
+        return VisibilityIs(visibility)
+
+
+class CustomField:
+    """Condizioni su un campo custom, corrispondenti ai tipi di FieldFilterTypeEnum."""
+
+    def __init__(self, column_id: int) -> None:
+        self.column_id = column_id
+
+    def _is(self, type_id: FieldFilterTypeEnum, *parameters: Any) -> Predicate:
+        return CustomFieldIs(self.column_id, type_id, list(parameters))
+
+    def equals(self, value: Any) -> Predicate:
+        return self._is(FieldFilterTypeEnum.EQUAL, value)
+
+    def between(self, low: Any = None, high: Any = None) -> Predicate:
+        return self._is(FieldFilterTypeEnum.INTERVAL, low, high)
+
+    def like(self, text: str) -> Predicate:
+        return self._is(FieldFilterTypeEnum.LIKE, text)
+
+    def isin(self, *values: Any) -> Predicate:
+        return self._is(FieldFilterTypeEnum.IN, *values)
+
+    def contains(self, *values: Any) -> Predicate:
+        return self._is(FieldFilterTypeEnum.CONTAINS, *values)
+
+    def under(self, tree: "ChoiceTree", *values: int) -> Predicate:
+        """Valori indicati o loro discendenti, per enum gerarchici e cataloghi."""
+        return self.isin(*tree.expand(values))
+
+    def is_null_or_in(self, *values: Any) -> Predicate:
+        return self._is(FieldFilterTypeEnum.IS_NULL_OR_IN, *values)
+
+    def is_empty(self) -> Predicate:
+        return self._is(FieldFilterTypeEnum.IS_EMPTY)
+
+
+@dataclass
+class QueryPlan:
+    filters: CommunityPostFilters
+    # predicati non espressi (o espressi solo in parte) dai filtri lato server
+    residual: list[Predicate]
+    # predicati contraddittori: nessun post li soddisfa
+    empty: bool = False
+
+    def matches(self, post: Post) -> bool:
+        return all(predicate.matches(post) for predicate in self.residual)
+
+    def explain(self) -> str:
+        if self.empty:
+            return "empty: contradictory predicates, no request is sent"
+        pushed = self.filters.model_dump_json(by_alias=True, exclude_none=True)
+        residual = " AND ".join(map(repr, self.residual)) or "-"
+        return f"server: {pushed}\nlocal: {residual}"
+
+
+class PostQuery:
+    """Ricerca di post di una community espressa con predicati.
+
+    I predicati sono tradotti nei filtri lato server più restrittivi possibili
+    (CommunityPostFilters); solo quelli non esprimibili vengono valutati localmente sui post
+    ricevuti, pagina per pagina:
+
+        query = PostQuery(1, Title.equals("Guasto caldaia") & CustomField(10007).isin(1, 2))
+        posts = query.all(api)
+    """
+
+    def __init__(
+        self,
+        community_id: int,
+        predicate: Predicate | None = None,
+        order_by: str | None = None,
+        order_desc: bool | None = None,
+        page_size: int = 100,
+    ) -> None:
+        self.community_id = community_id
+        self.predicate = predicate
+        self.order_by = order_by
+        self.order_desc = order_desc
+        self.page_size = page_size
+
+    def where(self, *predicates: Predicate) -> "PostQuery":
+        predicates = ([self.predicate] if self.predicate else []) + list(predicates)
+        return PostQuery(
+            self.community_id, And(*predicates), self.order_by, self.order_desc, self.page_size
+        )
+
+    def plan(self) -> QueryPlan:
+        if self.predicate is None:
+            return QueryPlan(CommunityPostFilters(), [])
+        conjuncts = (
+            self.predicate.predicates if isinstance(self.predicate, And) else [self.predicate]
+        )
+        builder = FilterBuilder()
+        residual = []
+        # prima i predicati che il server soddisfa completamente, poi quelli solo restringibili
+        for predicate in sorted(
+            conjuncts, key=lambda predicate: isinstance(predicate, TitleEquals)
+        ):
+            if predicate.push(builder):
+                if builder.empty:
+                    return QueryPlan(CommunityPostFilters(), [], empty=True)
+                continue
+            if not predicate.evaluable:
+                raise QueryError(f"Predicate {predicate!r} can be evaluated only by the server")
+            residual.append(predicate)
+        return QueryPlan(builder.build(), residual)
+
+    def request(self, plan: QueryPlan | None = None) -> ListCommunityPostsFilteredIn:
+        plan = plan or self.plan()
+        return ListCommunityPostsFilteredIn(
+            community_post_filters=plan.filters,
+            order_by=self.order_by,
+            order_desc=self.order_desc,
+            page_size=self.page_size,
+        )
+
+    def iter(self, api: "InteractaApi", limit: int | None = None) -> Iterator[BaseListPostsElement]:
+        plan = self.plan()
+        if plan.empty or (limit is not None and limit <= 0):
+            return
+        count = 0
+        for post in api.iter_posts_filtered(self.community_id, data=self.request(plan)):
+            if plan.matches(post):
+                yield post
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def all(self, api: "InteractaApi") -> list[BaseListPostsElement]:
+        return list(self.iter(api))
+
+    def first(self, api: "InteractaApi") -> BaseListPostsElement | None:
+        return next(self.iter(api, limit=1), None)
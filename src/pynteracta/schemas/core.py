@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, ClassVar
 
 from pydantic import BaseModel, ConfigDict, PrivateAttr
 from pydantic.alias_generators import to_camel
@@ -9,7 +9,12 @@ class InteractaModel(BaseModel):
         alias_generator=to_camel,
         populate_by_name=True,
         validate_assignment=True,
+        # validator e serializer sono costruiti al primo utilizzo del modello e non all'import
+        defer_build=True,
     )
+    # se True i campi a None non vengono inviati nel body delle richieste (vedi prepare_data);
+    # vale per il modello del body, anche per i modelli annidati
+    serialize_exclude_none: ClassVar[bool] = False
 
     def get_absolute_url(self, base_url: str | None = None) -> str:
         raise NotImplementedError
@@ -40,6 +45,8 @@ class ItemCreatedEditedOut(InteractaOut):
 
 
 class PaginatedIn(InteractaModel):
+    serialize_exclude_none: ClassVar[bool] = True
+
     page_token: str | None = None
     page_size: int = 15
     calculate_total_items_count: bool | None = True
@@ -47,3 +54,24 @@ class PaginatedIn(InteractaModel):
 
 class InteractaIn(PaginatedIn):
     order_desc: bool | None = None
+
+
+def prewarm(*models: type[BaseModel]) -> None:
+    """Costruisce subito validator e serializer dei modelli indicati.
+
+    Senza argomenti vengono preparati tutti i modelli del package schemas.
+    """
+    if not models:
+        # l'import di responses registra tutte le sottoclassi di InteractaModel del package
+        from . import responses  # noqa: F401
+
+        models = tuple(iter_subclasses(InteractaModel))
+    for model in models:
+        if not model.__pydantic_complete__:
+            model.model_rebuild(force=True)
+
+
+def iter_subclasses(cls: type):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from iter_subclasses(subclass)
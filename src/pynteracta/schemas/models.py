@@ -4,6 +4,7 @@ from typing import Any
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
+from ..delta import delta_to_html
 from ..enums import FieldFilterTypeEnum, FieldTypeEnum
 from ..exceptions import ObjectDoesNotFound
 from .core import InteractaModel
@@ -308,6 +309,10 @@ class Post(InteractaModel):
             url = f"{base_url}{url}"
         return url
 
+    @property
+    def description_html(self) -> str | None:
+        return delta_to_html(self.description_delta) if self.description_delta else None
+
 
 class BaseListPostsElement(Post):
     # BaseListPostsElementDTO
@@ -393,7 +398,7 @@ class FieldBase(InteractaModel):
 
     @property
     def catalog_id(self):
-        return self.metadata.catalog_id
+        return self.metadata.catalog_id if self.metadata else None
 
     def get_enum_id(self, label: str) -> int | None:
         for option in self.enum_values:
@@ -495,6 +500,18 @@ class PostWorkflowDefinition(InteractaModel):
                 return screen_field
         raise ObjectDoesNotFound(f"Screen field metadata {label} not found")
 
+    @property
+    def catalog_ids(self) -> list[int]:
+        fields = list(self.screen_field_metadatas or [])
+        for transition in self.transitions or []:
+            if transition.screen:
+                fields.extend(transition.screen.field_metadatas or [])
+        return [
+            field.metadata.catalog_id
+            for field in fields
+            if field.metadata and field.metadata.catalog_id
+        ]
+
 
 class PostDefinition(InteractaModel):
     acknowledge_task_enabled: bool | None = None
@@ -648,3 +665,7 @@ class PostComment(InteractaModel):
     likes_count: int | None = None
     liked_by_me: bool | None | None
     show_like_section: bool | None | None
+
+    @property
+    def comment_html(self) -> str | None:
+        return delta_to_html(self.comment_delta) if self.comment_delta else None
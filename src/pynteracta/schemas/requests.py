@@ -1,7 +1,8 @@
-from typing import Literal
+from typing import Literal, Self
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
+from ..delta import html_to_delta, text_to_delta
 from .core import InteractaIn, InteractaModel, PaginatedIn
 from .models import (
     AcknowledgeTaskFilter,
@@ -44,6 +45,20 @@ class CustomPostIn(InteractaModel):
     draft: bool = False  # Creazione in stato bozza/pubblicato
     scheduled_publication: ZonedDatetimeInput | None = None
 
+    @classmethod
+    def from_text(cls, title: str, description: str | None, **kwargs) -> Self:
+        # descrizione convertita in delta, memorizzata per le descrizioni ripetute; se None il
+        # campo resta non valorizzato (mentre "" invia una descrizione vuota)
+        if description is not None:
+            kwargs["description"] = text_to_delta(description)
+        return cls(title=title, **kwargs)
+
+    @classmethod
+    def from_html(cls, title: str, description: str | None, **kwargs) -> Self:
+        if description is not None:
+            kwargs["description"] = html_to_delta(description)
+        return cls(title=title, **kwargs)
+
 
 class CreateCustomPostIn(CustomPostIn):
     # CreateCustomPostRequest
@@ -51,6 +66,8 @@ class CreateCustomPostIn(CustomPostIn):
     watcher_user_ids: list[int] | None = None
     announcement: bool | None = None
     client_uid: str | None = None
+    # Codice del post assegnato dal client (es. la chiave del record importato)
+    custom_id: str | None = None
 
 
 class EditCustomPostIn(CustomPostIn):
@@ -132,6 +149,7 @@ class ListCommunityPostsIn(InteractaIn):
 
 class CommunityPostFilters(InteractaModel):
     # 	CommunityPostFiltersDTO
+
     # Filtro sul titolo
     title: str | None = None
     # Filtro sulla descrizione
@@ -195,6 +213,7 @@ class CommunityPostFilters(InteractaModel):
 
 class CommunityAttachmentFilters(InteractaModel):
     # CommunityAttachmentFiltersDTO
+
     # Filtro sul nome
     name: str | None = None
     # Filtro utente creatore
@@ -459,3 +478,15 @@ class CreatePostCommentIn(InteractaModel):
     client_uid: str | None = None
     attachments: InputPostCommentAttachmentIn | None = None
     parent_comment_id: int | None = None
+
+    @classmethod
+    def from_text(cls, comment: str | None, **kwargs) -> Self:
+        if comment is not None:
+            kwargs["comment"] = text_to_delta(comment)
+        return cls(comment_format=1, **kwargs)
+
+    @classmethod
+    def from_html(cls, comment: str | None, **kwargs) -> Self:
+        if comment is not None:
+            kwargs["comment"] = html_to_delta(comment)
+        return cls(comment_format=1, **kwargs)
@@ -0,0 +1,310 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from .schemas.models import Post, PostComment
+from .schemas.requests import CommunityPostFilters, ListCommunityPostsFilteredIn
+
+if TYPE_CHECKING:
+    from .api import InteractaApi
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Peso delle occorrenze di un termine in base al campo in cui compaiono
+FIELD_WEIGHTS = {"title": 3.0, "description": 1.0, "custom": 1.0, "comment": 1.0}
+
+# Parametri del ranking BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Numero massimo di termini in cui viene espanso un prefisso
+MAX_PREFIX_EXPANSIONS = 200
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Termini di un testo, senza accenti e senza distinzione tra maiuscole e minuscole."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return TOKEN_RE.findall(text.casefold())
+
+
+@dataclass
+class Document:
+    kind: str
+    id: int
+    post_id: int
+    community_id: int
+    title: str
+    length: float
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    id: int
+    post_id: int
+    community_id: int
+    title: str
+    score: float
+
+
+@dataclass
+class QueryTerm:
+    text: str
+    prefix: bool = False
+
+
+@dataclass
+class QueryClause:
+    required: list[QueryTerm] = field(default_factory=list)
+    excluded: list[QueryTerm] = field(default_factory=list)
+
+
+def parse_query(query: str) -> list[QueryClause]:
+    """Interpreta una query: i termini sono in AND, ``OR`` separa alternative, ``-termine`` esclude
+    e ``prefisso*`` cerca i termini che iniziano con il prefisso."""
+    clauses = [QueryClause()]
+    for word in query.split():
+        if word == "OR":
+            clauses.append(QueryClause())
+            continue
+        excluded = word.startswith("-")
+        prefix = word.endswith("*")
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        terms = [QueryTerm(token) for token in tokens]
+        terms[-1].prefix = prefix
+        target = clauses[-1].excluded if excluded else clauses[-1].required
+        target.extend(terms)
+    return [clause for clause in clauses if clause.required]
+
+
+class SearchIndex:
+    """Indice full-text locale (inverted index) di post e commenti di alcune community.
+
+    Sono indicizzati titolo, descrizione e campi custom testuali dei post (tutti, o solo quelli
+    in ``custom_field_ids``) e il testo dei commenti. L'indice si costruisce con ``build`` e si
+    aggiorna con ``refresh``, che rilegge solo i post modificati o commentati dopo l'ultimo
+    aggiornamento.
+    """
+
+    def __init__(
+        self, community_ids: Iterable[int], custom_field_ids: Iterable[int] | None = None
+    ) -> None:
+        self.community_ids = [int(community_id) for community_id in community_ids]
+        self.custom_field_ids = (
+            None if custom_field_ids is None else {str(field_id) for field_id in custom_field_ids}
+        )
+        self._postings: dict[str, dict[int, float]] = {}
+        self._doc_terms: dict[int, dict[str, float]] = {}
+        self._docs: dict[int, Document] = {}
+        self._doc_ids: dict[tuple[str, int], int] = {}
+        self._vocabulary: list[str] = []
+        self._post_comments: dict[int, set[int]] = {}
+        self._total_length = 0.0
+        self._next_doc_id = 0
+        # ultimo istante di modifica o commento visto per community e commenti visti per post
+        self.watermarks: dict[int, datetime] = {}
+        self.comments_counts: dict[int, int | None] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # indicizzazione
+
+    def build(self, api: "InteractaApi", comments: bool = True) -> None:
+        for community_id in self.community_ids:
+            for post in api.iter_posts(community_id):
+                self.index_post(post)
+                if comments and post.comments_count != 0:
+                    self.index_comments(post, api.iter_comments(post.id))
+
+    def refresh(self, api: "InteractaApi", comments: bool = True) -> int:
+        """Reindicizza i post modificati o commentati dopo l'ultimo aggiornamento, restituisce il
+        numero di post aggiornati. I post eliminati da altri client non vengono rilevati."""
+        updated = 0
+        for community_id in self.community_ids:
+            watermark = self.watermarks.get(community_id)
+            data = ListCommunityPostsFilteredIn(
+                community_post_filters=CommunityPostFilters(),
+                order_by="postLastModifyAndCommentTimestamp",
+                order_desc=True,
+                # i post pinnati, anche se vecchi, interromperebbero la scansione
+                pinned_first=False,
+                page_size=100,
+            )
+            for post in api.iter_posts_filtered(community_id, data=data):
+                changed = last_change(post)
+                if watermark is not None and changed is not None and changed < watermark:
+                    break
+                # un commento modificato, o eliminato e sostituito, non cambia il conteggio: i
+                # commenti sono riletti per ogni post con attività dopo l'ultimo aggiornamento
+                active = watermark is None or changed is None or changed > watermark
+                comments_changed = (
+                    active or post.comments_count != self.comments_counts.get(post.id)
+                ) and (post.comments_count != 0 or post.id in self._post_comments)
+                self.index_post(post)
+                if comments and comments_changed:
+                    self.index_comments(post, api.iter_comments(post.id))
+                updated += 1
+        return updated
+
+    def index_post(self, post: Post) -> None:
+        fields = {"title": post.title, "description": post.description_plain_text}
+        if isinstance(post.custom_data, dict):
+            fields["custom"] = " ".join(
+                value
+                for key, value in post.custom_data.items()
+                if isinstance(value, str)
+                and (self.custom_field_ids is None or key in self.custom_field_ids)
+            )
+        document = Document("post", post.id, post.id, post.community_id, post.title, 0.0)
+        self._add(document, fields)
+        self.comments_counts.setdefault(post.id, None)
+        changed = last_change(post)
+        if changed is not None and (
+            post.community_id not in self.watermarks or changed > self.watermarks[post.community_id]
+        ):
+            self.watermarks[post.community_id] = changed
+
+    def index_comments(self, post: Post, comments: Iterable[PostComment]) -> None:
+        for doc_id in self._post_comments.pop(post.id, set()):
+            self._remove(doc_id)
+        count = 0
+        for comment in comments:
+            count += 1
+            if comment.deleted:
+                continue
+            document = Document("comment", comment.id, post.id, post.community_id, post.title, 0.0)
+            doc_id = self._add(document, {"comment": comment.comment_plain_text})
+            self._post_comments.setdefault(post.id, set()).add(doc_id)
+        self.comments_counts[post.id] = (
+            post.comments_count if post.comments_count is not None else count
+        )
+
+    def remove_post(self, post_id: int) -> None:
+        for doc_id in self._post_comments.pop(post_id, set()):
+            self._remove(doc_id)
+        if (doc_id := self._doc_ids.get(("post", post_id))) is not None:
+            self._remove(doc_id)
+        self.comments_counts.pop(post_id, None)
+
+    def _add(self, document: Document, fields: dict[str, str | None]) -> int:
+        key = (document.kind, document.id)
+        if key in self._doc_ids:
+            self._remove(self._doc_ids[key])
+        doc_id = self._next_doc_id
+        self._next_doc_id += 1
+        terms: dict[str, float] = {}
+        for field_name, text in fields.items():
+            weight = FIELD_WEIGHTS[field_name]
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[doc_id] = frequency
+        document.length = sum(terms.values())
+        self._total_length += document.length
+        self._docs[doc_id] = document
+        self._doc_ids[key] = doc_id
+        self._doc_terms[doc_id] = terms
+        return doc_id
+
+    def _remove(self, doc_id: int) -> None:
+        document = self._docs.pop(doc_id)
+        del self._doc_ids[(document.kind, document.id)]
+        self._total_length -= document.length
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    # ricerca
+
+    def expand(self, term: QueryTerm) -> list[str]:
+        if not term.prefix:
+            return [term.text] if term.text in self._postings else []
+        expansions = []
+        position = bisect.bisect_left(self._vocabulary, term.text)
+        while (
+            position < len(self._vocabulary)
+            and self._vocabulary[position].startswith(term.text)
+            and len(expansions) < MAX_PREFIX_EXPANSIONS
+        ):
+            expansions.append(self._vocabulary[position])
+            position += 1
+        return expansions
+
+    def _matches(self, term: QueryTerm) -> dict[int, float]:
+        """Documenti che contengono il termine (o un suo completamento) con il relativo score."""
+        scores: dict[int, float] = {}
+        count = len(self._docs)
+        average_length = self._total_length / count if count else 0.0
+        for text in self.expand(term):
+            postings = self._postings[text]
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = 1 - BM25_B + BM25_B * self._docs[doc_id].length / (average_length or 1)
+                score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                scores[doc_id] = max(scores.get(doc_id, 0.0), score)
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int | None = 20,
+        kinds: Iterable[str] | None = None,
+        community_id: int | None = None,
+    ) -> list[SearchHit]:
+        results: dict[int, float] = {}
+        for clause in parse_query(query):
+            matches = sorted((self._matches(term) for term in clause.required), key=len)
+            doc_ids = set(matches[0]).intersection(*matches[1:])
+            for term in clause.excluded:
+                doc_ids.difference_update(self._matches(term))
+            for doc_id in doc_ids:
+                score = sum(scores[doc_id] for scores in matches)
+                results[doc_id] = max(results.get(doc_id, 0.0), score)
+        kinds = set(kinds) if kinds is not None else None
+        hits = (
+            (score, doc_id)
+            for doc_id, score in results.items()
+            if (kinds is None or self._docs[doc_id].kind in kinds)
+            and (community_id is None or self._docs[doc_id].community_id == community_id)
+        )
+        ranked = heapq.nlargest(limit, hits) if limit is not None else sorted(hits, reverse=True)
+        return [self._hit(doc_id, score) for score, doc_id in ranked]
+
+    def _hit(self, doc_id: int, score: float) -> SearchHit:
+        document = self._docs[doc_id]
+        return SearchHit(
+            kind=document.kind,
+            id=document.id,
+            post_id=document.post_id,
+            community_id=document.community_id,
+            title=document.title,
+            score=score,
+        )
+
+
+def last_change(post: Post) -> datetime | None:
+    timestamps = [
+        timestamp
+        for timestamp in (post.last_modify_timestamp, post.last_operation_timestamp)
+        if timestamp is not None
+    ]
+    return max(timestamps) if timestamps else None
@@ -6,6 +6,7 @@ from typing import Any
 from pydantic import BaseModel, ConfigDict, HttpUrl, SecretStr, computed_field
 from pydantic_settings_toml import TomlSettings, TomlSettingsError
 
+from .deadlines import endpoint_class
 from .enums import LoginProviderEnum
 from .exceptions import InteractaError
 from .models import ServiceAccountModel
@@ -45,6 +46,47 @@ class ApiSettings(BaseModel):
     auth_service_account: ServiceAccountModel | None = None
     auth_username: str | None = None
     auth_password: SecretStr | None = None
+    # dimensione minima (byte) oltre la quale il body delle richieste viene compresso con gzip,
+    # da abilitare solo se il portale accetta richieste con content-encoding gzip
+    request_compression_min_size: int | None = None
+    # unisce le GET identiche (stessi path, parametri e token) eseguite contemporaneamente da più
+    # thread in un'unica richiesta, la cui risposta è condivisa
+    coalesce_requests: bool = False
+    # secondi di validità in cache delle risposte per nome dell'operazione (es.
+    # {"get_post_definition_detail": 300}), le operazioni non indicate non sono mai in cache
+    cache_ttl: dict[str, float] = {}
+    cache_max_bytes: int = 32 * 2**20
+    # duplica le richieste di lettura ancora senza risposta dopo il percentile hedge_percentile
+    # delle latenze recenti dell'endpoint, usando la prima risposta ricevuta; i duplicati sono al
+    # più una frazione hedge_budget delle richieste. Le richieste duplicabili sono inviate da al
+    # più hedge_max_workers thread, le altre dal thread chiamante
+    hedge_requests: bool = False
+    hedge_percentile: float = 95.0
+    hedge_budget: float = 0.05
+    hedge_min_delay: float = 0.005
+    hedge_max_workers: int = 32
+    # circuit breaker per endpoint: con una frazione di errori (5xx, 429, errori di rete) di
+    # almeno breaker_error_rate su almeno breaker_min_requests delle ultime breaker_window
+    # richieste, per breaker_open_seconds le richieste all'endpoint falliscono subito con
+    # CircuitOpenError, poi breaker_half_open_requests richieste di prova decidono se richiudere
+    circuit_breaker: bool = False
+    breaker_error_rate: float = 0.5
+    breaker_min_requests: int = 20
+    breaker_window: int = 50
+    breaker_open_seconds: float = 30.0
+    breaker_half_open_requests: int = 1
+    # timeout (secondi) di connessione e lettura delle richieste per classe di endpoint (auth,
+    # admin, communication), "default" per le altre; None per non porre limiti
+    timeouts: dict[str, float | tuple[float, float] | None] = {
+        "auth": (5.0, 30.0),
+        "admin": (5.0, 120.0),
+        "communication": (5.0, 120.0),
+        "default": (5.0, 120.0),
+    }
+
+    def get_timeout(self, path: str) -> float | tuple[float, float] | None:
+        timeouts = self.timeouts
+        return timeouts.get(endpoint_class(path), timeouts.get("default"))
 
     def model_post_init(self, __context: Any) -> None:
         if self.auth_service_file_path:
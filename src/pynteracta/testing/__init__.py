@@ -0,0 +1,12 @@
+from .dataset import FakeDataset, GeneratedMapping, GeneratedSequence
+from .generator import TenantGenerator, build_dataset
+from .server import FakeInteractaServer
+
+__all__ = [
+    "FakeDataset",
+    "FakeInteractaServer",
+    "GeneratedMapping",
+    "GeneratedSequence",
+    "TenantGenerator",
+    "build_dataset",
+]
@@ -0,0 +1,406 @@
+import bisect
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass, field
+from itertools import chain, pairwise
+from typing import Any
+
+from ..enums import FieldTypeEnum
+
+# 2024-01-01T00:00:00Z in millisecondi, riferimento per i timestamp dei dati finti
+BASE_TIMESTAMP = 1_704_067_200_000
+DAY_MS = 86_400_000
+
+WORDS = [
+    "richiesta",
+    "intervento",
+    "manutenzione",
+    "verifica",
+    "progetto",
+    "documento",
+    "riunione",
+    "contratto",
+    "fornitura",
+    "servizio",
+    "ufficio",
+    "comune",
+    "scuola",
+    "strada",
+    "illuminazione",
+    "verde",
+    "pubblico",
+    "bilancio",
+    "delibera",
+    "protocollo",
+    "archivio",
+    "personale",
+    "formazione",
+    "sicurezza",
+    "impianto",
+    "edificio",
+    "lavori",
+    "urgente",
+]
+
+FIRST_NAMES = [
+    "Mario",
+    "Luigi",
+    "Anna",
+    "Giulia",
+    "Marco",
+    "Paola",
+    "Luca",
+    "Sara",
+    "Davide",
+    "Chiara",
+    "Simone",
+    "Elena",
+]
+LAST_NAMES = [
+    "Rossi",
+    "Bianchi",
+    "Verdi",
+    "Russo",
+    "Ferrari",
+    "Esposito",
+    "Romano",
+    "Colombo",
+    "Ricci",
+    "Marino",
+]
+
+
+def short_user(user: dict) -> dict:
+    return {
+        key: user[key]
+        for key in ("id", "firstName", "lastName", "contactEmail", "deleted", "blocked")
+    }
+
+
+class GeneratedSequence(Sequence):
+    """Sequenza di record json generati su richiesta a partire dal loro indice.
+
+    Permette di servire milioni di record senza tenerli in memoria: solo i record recuperati
+    per id (e quindi potenzialmente modificati dal server) vengono conservati. Sono supportati
+    l'inserimento in testa, l'accodamento e la rimozione, come per le liste del dataset.
+    """
+
+    def __init__(
+        self,
+        length: int,
+        factory: Callable[[int], dict],
+        index_of: Callable[[int], int | None] | None = None,
+    ) -> None:
+        self.length = length
+        self.factory = factory
+        # id del record -> indice, None se l'id non appartiene alla sequenza
+        self.index_of = index_of
+        self.head: list[dict] = []
+        self.tail: list[dict] = []
+        self.cache: dict[int, dict] = {}
+        self.removed: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.head) + self.length - len(self.removed) + len(self.tail)
+
+    def _generated(self, index: int) -> dict:
+        item = self.cache.get(index)
+        return item if item is not None else self.factory(index)
+
+    def _physical_index(self, position: int) -> int:
+        index = position
+        for removed in self.removed:
+            if removed > index:
+                break
+            index += 1
+        return index
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(len(self)))]
+        size = len(self)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("GeneratedSequence index out of range")
+        if position < len(self.head):
+            return self.head[position]
+        position -= len(self.head)
+        generated = self.length - len(self.removed)
+        if position >= generated:
+            return self.tail[position - generated]
+        return self._generated(self._physical_index(position))
+
+    def __iter__(self) -> Iterator[dict]:
+        removed = set(self.removed)
+        generated = (self._generated(index) for index in range(self.length) if index not in removed)
+        return chain(self.head, generated, self.tail)
+
+    def get_by_id(self, item_id: int) -> dict | None:
+        index = self.index_of(item_id) if self.index_of else None
+        if index is not None and 0 <= index < self.length:
+            position = bisect.bisect_left(self.removed, index)
+            if position < len(self.removed) and self.removed[position] == index:
+                return None
+            if index not in self.cache:
+                self.cache[index] = self.factory(index)
+            return self.cache[index]
+        return next((item for item in chain(self.head, self.tail) if item["id"] == item_id), None)
+
+    def insert(self, position: int, item: dict) -> None:
+        if position > len(self.head):
+            raise ValueError("GeneratedSequence supports insertions only at the beginning")
+        self.head.insert(position, item)
+
+    def append(self, item: dict) -> None:
+        self.tail.append(item)
+
+    def remove(self, item: dict) -> None:
+        for items in (self.head, self.tail):
+            if any(existing is item for existing in items):
+                items.remove(item)
+                return
+        index = self.index_of(item["id"]) if self.index_of else None
+        if index is None or not 0 <= index < self.length or index in self.removed:
+            raise ValueError(f"Item {item['id']} not in sequence")
+        bisect.insort(self.removed, index)
+        self.cache.pop(index, None)
+
+
+class GeneratedMapping(dict):
+    """Dizionario i cui valori mancanti sono generati (e conservati) al primo accesso."""
+
+    def __init__(self, factory: Callable[[Any], Any]) -> None:
+        super().__init__()
+        self.factory = factory
+
+    def __missing__(self, key: Any) -> Any:
+        value = self.factory(key)
+        if value is None:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+
+@dataclass
+class FakeDataset:
+    """Dati in memoria serviti da FakeInteractaServer, nel formato json delle api (camelCase).
+
+    Post, utenti, commenti ed entry dei cataloghi possono essere liste o, per dataset molto
+    grandi, GeneratedSequence/GeneratedMapping (vedi pynteracta.testing.generator).
+    """
+
+    communities: dict[int, dict] = field(default_factory=dict)
+    post_definitions: dict[int, dict] = field(default_factory=dict)
+    # post per community, nell'ordine in cui sono restituiti dalle liste
+    posts: dict[int, Sequence[dict]] = field(default_factory=dict)
+    comments: dict[int, list[dict]] = field(default_factory=dict)
+    screen_data: dict[int, dict] = field(default_factory=dict)
+    users: Sequence[dict] = field(default_factory=list)
+    groups: list[dict] = field(default_factory=list)
+    group_members: dict[int, list[int]] = field(default_factory=dict)
+    catalogs: dict[int, dict] = field(default_factory=dict)
+    hashtags: dict[int, list[dict]] = field(default_factory=dict)
+    business_units: list[dict] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.lock = threading.RLock()
+        self._post_index: dict[int, dict] | None = None
+        self._next_ids: dict[str, int] = {}
+
+    # lookup
+
+    @property
+    def post_index(self) -> dict[int, dict]:
+        if self._post_index is None:
+            self._post_index = {
+                post["id"]: post
+                for posts in self.posts.values()
+                if not isinstance(posts, GeneratedSequence)
+                for post in posts
+            }
+        return self._post_index
+
+    def get_post(self, post_id: int) -> dict | None:
+        post = self.post_index.get(post_id)
+        if post is None:
+            for posts in self.posts.values():
+                if isinstance(posts, GeneratedSequence):
+                    post = posts.get_by_id(post_id)
+                    if post is not None:
+                        break
+        return post
+
+    def get_user(self, user_id: int) -> dict | None:
+        if isinstance(self.users, GeneratedSequence):
+            return self.users.get_by_id(user_id)
+        return next((user for user in self.users if user["id"] == user_id), None)
+
+    def get_group(self, group_id: int) -> dict | None:
+        return next((group for group in self.groups if group["id"] == group_id), None)
+
+    def next_id(self, kind: str, start: int) -> int:
+        with self.lock:
+            self._next_ids[kind] = self._next_ids.get(kind, start) + 1
+            return self._next_ids[kind]
+
+    # mutazioni
+
+    def add_post(self, community_id: int, post: dict) -> None:
+        with self.lock:
+            self.posts.setdefault(community_id, []).insert(0, post)
+            self.post_index[post["id"]] = post
+
+    def remove_post(self, post_id: int) -> dict | None:
+        with self.lock:
+            post = self.get_post(post_id)
+            if post is not None:
+                self.post_index.pop(post_id, None)
+                self.posts[post["communityId"]].remove(post)
+                self.comments.pop(post_id, None)
+            return post
+
+
+def build_post_definition(community_id: int, catalog_id: int, workflow_states: int = 3) -> dict:
+    """Definizione dei post con un campo per ogni FieldTypeEnum e un workflow lineare.
+
+    Il workflow ha ``workflow_states`` stati (almeno 3) collegati in sequenza, la transizione
+    verso lo stato finale richiede una schermata e lo stato finale può essere riaperto.
+    """
+
+    def enum_values(offset: int, labels: list[str], parents: dict[int, int] | None = None):
+        parents = parents or {}
+        return [
+            {
+                "id": offset + index,
+                "label": label,
+                "externalId": f"ext-{offset + index}",
+                "parentIds": [parents[index]] if index in parents else None,
+                "deleted": False,
+            }
+            for index, label in enumerate(labels)
+        ]
+
+    base_id = community_id * 10_000
+    fields = [
+        (FieldTypeEnum.INT, "Numero", {}),
+        (FieldTypeEnum.BIGINT, "Protocollo", {}),
+        (FieldTypeEnum.DECIMAL, "Importo", {}),
+        (FieldTypeEnum.DATE, "Scadenza", {}),
+        (FieldTypeEnum.DATETIME, "Appuntamento", {}),
+        (FieldTypeEnum.STRING, "Codice", {}),
+        (
+            FieldTypeEnum.ENUM,
+            "Priorita",
+            {"enumValues": enum_values(base_id + 10, ["Bassa", "Media", "Alta"])},
+        ),
+        (
+            FieldTypeEnum.ENUM_LIST,
+            "Categorie",
+            {"enumValues": enum_values(base_id + 20, ["Strade", "Verde", "Edifici", "Scuole"])},
+        ),
+        (FieldTypeEnum.TEXT_AREA, "Note", {}),
+        (FieldTypeEnum.FLAG, "Urgente", {}),
+        (FieldTypeEnum.DELTA_AREA, "Dettagli", {}),
+        (
+            FieldTypeEnum.HIERARCHICAL_ENUM,
+            "Area",
+            {
+                "enumValues": enum_values(
+                    base_id + 40,
+                    ["Nord", "Sud", "Nord-Est", "Nord-Ovest", "Sud-Est"],
+                    parents={2: base_id + 40, 3: base_id + 40, 4: base_id + 41},
+                ),
+                "metadata": {"hierarchical": True},
+            },
+        ),
+        (FieldTypeEnum.LINK, "Collegamento", {}),
+        (FieldTypeEnum.GENERIC_ENTITY_LIST, "Fornitore", {"metadata": {"catalogId": catalog_id}}),
+        # in coda, per non cambiare gli id dei campi precedenti
+        (FieldTypeEnum.FEEDBACK, "Valutazione", {}),
+    ]
+    field_definitions = [
+        {
+            "id": base_id + index + 1,
+            "name": label.lower(),
+            "label": label,
+            "type": int(field_type),
+            "required": False,
+            "searchable": True,
+            "sortable": True,
+            "visibleInCreate": True,
+            "visibleInEdit": True,
+            "enumValues": [],
+            "metadata": {},
+            **extra,
+        }
+        for index, (field_type, label, extra) in enumerate(fields)
+    ]
+    names = ["Aperto", "In lavorazione"]
+    names += [f"Fase {index}" for index in range(1, max(workflow_states, 3) - 2)] + ["Chiuso"]
+    states = [
+        {
+            "id": base_id + 1000 + index,
+            "name": name,
+            "initState": index == 0,
+            "terminal": index == len(names) - 1,
+            "deleted": False,
+            "metadata": {"style_color": "#3366ff"},
+        }
+        for index, name in enumerate(names)
+    ]
+    screen_field = {
+        "id": base_id + 3001,
+        "label": "Esito",
+        "type": int(FieldTypeEnum.STRING),
+        "enumValues": [],
+        "metadata": {},
+    }
+    screen = {"id": base_id + 3000, "name": "Chiusura", "fieldMetadatas": [screen_field]}
+    transitions = [
+        {
+            "id": base_id + 2000 + index,
+            "name": f"Avanza a {to_state['name']}",
+            "fromState": from_state,
+            "toState": to_state,
+            **({"screen": screen} if to_state["terminal"] else {}),
+        }
+        for index, (from_state, to_state) in enumerate(pairwise(states))
+    ]
+    transitions.append(
+        {
+            "id": base_id + 2000 + len(transitions),
+            "name": "Riapri",
+            "fromState": states[-1],
+            "toState": states[0],
+        }
+    )
+    return {
+        "communityId": community_id,
+        "customFieldsEnabled": True,
+        "titleEnabled": 1,
+        "descriptionEnabled": 1,
+        "hashTagEnabled": True,
+        "fieldDefinitions": field_definitions,
+        "workflowDefinition": {
+            "id": base_id + 999,
+            "title": "Workflow",
+            "states": states,
+            "transitions": transitions,
+            "screenFieldMetadatas": [screen_field],
+            "empty": False,
+        },
+    }
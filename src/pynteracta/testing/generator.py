@@ -0,0 +1,459 @@
+import functools
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic_core import to_json
+
+from .dataset import (
+    BASE_TIMESTAMP,
+    DAY_MS,
+    FIRST_NAMES,
+    LAST_NAMES,
+    WORDS,
+    FakeDataset,
+    GeneratedMapping,
+    GeneratedSequence,
+    build_post_definition,
+    short_user,
+)
+
+MASK64 = (1 << 64) - 1
+# gli id dei post sono community_id * POST_ID_STRIDE + indice + 1
+POST_ID_STRIDE = 1_000_000_000
+# gli id dei commenti sono post_id * COMMENT_ID_STRIDE + indice + 1
+COMMENT_ID_STRIDE = 1_000
+MINUTE_MS = 60_000
+LOGIN_PROVIDERS = [["custom"], ["google"], ["microsoft"], ["google", "custom"], []]
+
+
+def mix64(value: int) -> int:
+    """Finalizzatore di splitmix64: hash veloce e ben distribuito di un intero a 64 bit."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+PHRASE_WORDS = 4
+PHRASE_MASK = 0xFFF
+
+
+@functools.cache
+def phrase_table() -> tuple[str, ...]:
+    # frasi precalcolate: comporre i testi per frasi invece che per parole rende la
+    # generazione dei post diverse volte più veloce
+    phrases = []
+    for index in range(PHRASE_MASK + 1):
+        value = mix64(index)
+        words = []
+        for _ in range(PHRASE_WORDS):
+            words.append(WORDS[(value & 0xFFFF) % len(WORDS)])
+            value >>= 16
+        phrases.append(" ".join(words))
+    return tuple(phrases)
+
+
+class Draws:
+    """Sequenza deterministica di estrazioni pseudo-casuali derivata da una tupla di chiavi.
+
+    Ogni record è generato da una propria sequenza (seed, tipo, indice...), per cui può essere
+    ricostruito in qualsiasi ordine senza generare i precedenti.
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, *keys: int) -> None:
+        state = 0
+        for key in keys:
+            state = mix64(state ^ key)
+        self.state = state
+
+    def next(self) -> int:
+        self.state = mix64(self.state)
+        return self.state
+
+    def below(self, limit: int) -> int:
+        return self.next() % limit
+
+    def choice(self, items: list):
+        return items[self.next() % len(items)]
+
+    def phrases(self, count: int) -> str:
+        """Testo di ``count`` frasi di PHRASE_WORDS parole, 5 frasi per estrazione."""
+        table = phrase_table()
+        parts = []
+        while len(parts) < count:
+            value = self.next()
+            for _ in range(min(5, count - len(parts))):
+                parts.append(table[value & PHRASE_MASK])
+                value >>= 12
+        return " ".join(parts)
+
+
+# chiavi che distinguono le sequenze di estrazione dei diversi tipi di record
+USER_KEY, GROUP_KEY, POST_KEY, COMMENT_KEY, FIELD_KEY = 1, 2, 3, 4, 5
+
+
+@dataclass
+class TenantGenerator:
+    """Generatore deterministico di un tenant Interacta sintetico.
+
+    Ogni record è funzione solo di seed e indice, quindi i dataset possono essere molto grandi:
+    ``dataset()`` restituisce un FakeDataset con sequenze generate su richiesta, utilizzabile
+    da FakeInteractaServer, mentre ``write()`` scrive su disco le pagine json delle liste.
+
+        generator = TenantGenerator(seed=1, posts_per_community=1_000_000, users=200_000)
+        with FakeInteractaServer(generator.dataset()) as server:
+            ...
+    """
+
+    seed: int = 0
+    communities: int = 1
+    posts_per_community: int = 1_000
+    users: int = 100
+    groups: int = 10
+    comments_per_post: int = 2
+    catalog_entries: int = 100
+    workflow_states: int = 3
+    hashtags_per_community: int = 5
+    post_definitions: dict[int, dict] = field(default_factory=dict, init=False, repr=False)
+    _hashtags: dict[int, list[dict]] = field(default_factory=dict, init=False, repr=False)
+
+    # definizioni
+
+    def catalog_id(self, community_id: int) -> int:
+        return community_id * 1_000
+
+    def post_definition(self, community_id: int) -> dict:
+        if community_id not in self.post_definitions:
+            self.post_definitions[community_id] = build_post_definition(
+                community_id, self.catalog_id(community_id), self.workflow_states
+            )
+        return self.post_definitions[community_id]
+
+    def catalog(self, community_id: int) -> dict:
+        catalog_id = self.catalog_id(community_id)
+        return {
+            "id": catalog_id,
+            "name": f"fornitori-{community_id}",
+            "etag": 1,
+            "paged": self.catalog_entries > 1_000,
+            "entries": GeneratedSequence(
+                self.catalog_entries, lambda index: self.catalog_entry(catalog_id, index)
+            ),
+        }
+
+    def catalog_entry(self, catalog_id: int, index: int) -> dict:
+        return {
+            "id": catalog_id * POST_ID_STRIDE + index + 1,
+            "catalogId": catalog_id,
+            "label": f"Fornitore {index + 1}",
+            "externalId": f"f-{index + 1}",
+            "parentIds": None,
+            "deleted": False,
+        }
+
+    def hashtags(self, community_id: int) -> list[dict]:
+        if community_id not in self._hashtags:
+            self._hashtags[community_id] = [
+                {
+                    "id": community_id * 10_000 + index + 1,
+                    "name": f"{WORDS[index % len(WORDS)]}{index // len(WORDS) or ''}",
+                    "communityId": community_id,
+                }
+                for index in range(self.hashtags_per_community)
+            ]
+        return self._hashtags[community_id]
+
+    def community(self, community_id: int) -> dict:
+        return {
+            "id": community_id,
+            "name": f"Community {community_id}",
+            "workspaceId": 1,
+            "membersCount": self.users,
+            "draft": False,
+        }
+
+    # record
+
+    def user(self, index: int) -> dict:
+        draws = Draws(self.seed, USER_KEY, index)
+        user_id = index + 1
+        first_name, last_name = draws.choice(FIRST_NAMES), draws.choice(LAST_NAMES)
+        email = f"{first_name}.{last_name}.{user_id}@example.org".lower()
+        providers = draws.choice(LOGIN_PROVIDERS)
+        return {
+            "id": user_id,
+            "firstName": first_name,
+            "lastName": last_name,
+            "contactEmail": email,
+            "googleAccountId": email if "google" in providers else None,
+            "microsoftAccountId": email if "microsoft" in providers else None,
+            "deleted": user_id % 23 == 0,
+            "blocked": user_id % 29 == 0,
+            "externalId": f"u-{user_id}",
+            "loginProviders": providers,
+            "lastAccessTimestamp": BASE_TIMESTAMP + draws.below(365) * DAY_MS,
+            "occToken": 1,
+        }
+
+    def group(self, index: int) -> dict:
+        group_id = index + 1
+        return {
+            "id": group_id,
+            "name": f"gruppo-{group_id}",
+            "email": f"gruppo-{group_id}@example.org",
+            "visible": True,
+            "externalId": f"g-{group_id}",
+            "deleted": False,
+            "occToken": 1,
+            "membersCount": len(self.group_members(group_id)),
+        }
+
+    def group_members(self, group_id: int) -> list[int]:
+        if not self.users:
+            return []
+        draws = Draws(self.seed, GROUP_KEY, group_id)
+        return sorted({draws.below(self.users) + 1 for _ in range(min(self.users, 5))})
+
+    def post_id(self, community_id: int, index: int) -> int:
+        return community_id * POST_ID_STRIDE + index + 1
+
+    def post_index(self, community_id: int, post_id: int) -> int | None:
+        index = post_id - community_id * POST_ID_STRIDE - 1
+        return index if 0 <= index < self.posts_per_community else None
+
+    def post(self, community_id: int, index: int) -> dict:
+        draws = Draws(self.seed, POST_KEY, community_id, index)
+        definition = self.post_definition(community_id)
+        fields = definition["fieldDefinitions"]
+        states = definition["workflowDefinition"]["states"]
+        post_id = self.post_id(community_id, index)
+        created = BASE_TIMESTAMP + index * MINUTE_MS
+        modified = created + draws.below(30) * DAY_MS
+        creator = short_user(self.user(draws.below(self.users))) if self.users else None
+        hashtags = self.hashtags(community_id)
+        state = states[index % len(states)]
+        return {
+            "id": post_id,
+            "communityId": community_id,
+            "customId": f"C{community_id}-{index + 1}",
+            "title": f"{draws.phrases(1).capitalize()} {index + 1}",
+            "descriptionPlainText": draws.phrases(5),
+            "descriptionDelta": None,
+            "visibility": 1,
+            "customData": {
+                str(fields[0]["id"]): index,
+                str(fields[2]["id"]): draws.below(1_000_000) / 100,
+                str(fields[3]["id"]): created + draws.below(90) * DAY_MS,
+                str(fields[5]["id"]): f"COD-{draws.below(10_000):04d}",
+                str(fields[6]["id"]): fields[6]["enumValues"][index % 3]["id"],
+                str(fields[7]["id"]): [draws.choice(fields[7]["enumValues"])["id"]],
+                str(fields[9]["id"]): draws.below(10) == 0,
+                **self.other_custom_data(community_id, index, created),
+            },
+            "creatorUser": creator,
+            "creationTimestamp": created,
+            "lastModifyUser": creator,
+            "lastModifyTimestamp": modified,
+            "lastOperationTimestamp": modified,
+            "commentsCount": self.comments_per_post,
+            "workflowStateDescription": state["name"],
+            "currentWorkflowState": state,
+            "hashtags": [draws.choice(hashtags)] if hashtags else [],
+            "occToken": 1,
+        }
+
+    def other_custom_data(self, community_id: int, index: int, created: int) -> dict:
+        # valori dei restanti campi da una sequenza separata, così quelli degli altri campi (e
+        # dei dati successivi del post) restano invariati
+        draws = Draws(self.seed, FIELD_KEY, community_id, index)
+        fields = {
+            field["label"]: field
+            for field in self.post_definition(community_id)["fieldDefinitions"]
+        }
+        catalog_id = self.catalog_id(community_id)
+        data = {
+            "Protocollo": 10**12 + self.post_id(community_id, index),
+            "Appuntamento": created + draws.below(90 * 24 * 60) * MINUTE_MS,
+            "Note": draws.phrases(2),
+            "Dettagli": to_json([{"insert": f"{draws.phrases(1)}\n"}]).decode(),
+            "Area": draws.choice(fields["Area"]["enumValues"])["id"],
+            "Collegamento": {
+                "label": f"Pratica {index + 1}",
+                "url": f"https://example.org/{index + 1}",
+            },
+            "Valutazione": draws.below(5) + 1,
+        }
+        if self.catalog_entries:
+            entry = self.catalog_entry(catalog_id, draws.below(self.catalog_entries))
+            data["Fornitore"] = [entry["id"]]
+        return {str(fields[label]["id"]): value for label, value in data.items()}
+
+    def comments(self, post_id: int) -> list[dict]:
+        community_id = post_id // POST_ID_STRIDE
+        index = self.post_index(community_id, post_id)
+        if index is None:
+            return []
+        created = BASE_TIMESTAMP + index * MINUTE_MS
+        comments = []
+        for number in range(self.comments_per_post):
+            draws = Draws(self.seed, COMMENT_KEY, post_id, number)
+            comments.append(
+                {
+                    "id": post_id * COMMENT_ID_STRIDE + number + 1,
+                    "commentPlainText": draws.phrases(2),
+                    "commentDelta": None,
+                    "creatorUser": (
+                        short_user(self.user(draws.below(self.users))) if self.users else None
+                    ),
+                    "creationTimestamp": created + (number + 1) * MINUTE_MS,
+                    "deleted": False,
+                    "likesCount": draws.below(5),
+                    "likedByMe": False,
+                    "showLikeSection": True,
+                }
+            )
+        return comments
+
+    # sequenze
+
+    def iter_users(self) -> Iterator[dict]:
+        return map(self.user, range(self.users))
+
+    def iter_posts(self, community_id: int) -> Iterator[dict]:
+        return (self.post(community_id, index) for index in range(self.posts_per_community))
+
+    def user_sequence(self) -> GeneratedSequence:
+        return GeneratedSequence(
+            self.users,
+            self.user,
+            index_of=lambda user_id: user_id - 1 if 0 < user_id <= self.users else None,
+        )
+
+    def post_sequence(self, community_id: int) -> GeneratedSequence:
+        return GeneratedSequence(
+            self.posts_per_community,
+            lambda index: self.post(community_id, index),
+            index_of=lambda post_id: self.post_index(community_id, post_id),
+        )
+
+    def dataset(self, materialize: bool = False) -> FakeDataset:
+        """Dataset per FakeInteractaServer.
+
+        Con ``materialize=True`` tutti i record sono generati subito in liste ordinarie (adatto
+        a dataset piccoli), altrimenti post, utenti, commenti ed entry dei cataloghi sono
+        generati solo quando richiesti.
+        """
+        dataset = FakeDataset(
+            users=list(self.iter_users()) if materialize else self.user_sequence(),
+            groups=[self.group(index) for index in range(self.groups)],
+            business_units=[{"id": 1, "name": "Direzione"}, {"id": 2, "name": "Tecnico"}],
+        )
+        dataset.group_members = {
+            group["id"]: self.group_members(group["id"]) for group in dataset.groups
+        }
+        for community_id in range(1, self.communities + 1):
+            catalog = self.catalog(community_id)
+            if materialize:
+                catalog["entries"] = list(catalog["entries"])
+            dataset.catalogs[catalog["id"]] = catalog
+            dataset.hashtags[community_id] = self.hashtags(community_id)
+            dataset.communities[community_id] = self.community(community_id)
+            dataset.post_definitions[community_id] = self.post_definition(community_id)
+            dataset.posts[community_id] = (
+                list(self.iter_posts(community_id))
+                if materialize
+                else self.post_sequence(community_id)
+            )
+        if materialize:
+            dataset.comments = {
+                post["id"]: self.comments(post["id"])
+                for posts in dataset.posts.values()
+                for post in posts
+            }
+        else:
+            dataset.comments = GeneratedMapping(self.comments)
+        return dataset
+
+    # scrittura su disco
+
+    def write(self, directory: str | Path, page_size: int = 100) -> dict[str, Path]:
+        """Scrive il tenant in ``directory`` e restituisce i file creati.
+
+        Le liste (utenti, post e entry dei cataloghi) sono scritte in file jsonl con una
+        pagina di risposta per riga, nello stesso formato restituito dalle api; le
+        definizioni dei post in file json.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = {"users": directory / "users.jsonl"}
+        write_pages(files["users"], self.iter_users(), self.users, page_size)
+        for community_id in range(1, self.communities + 1):
+            posts_path = directory / f"posts-{community_id}.jsonl"
+            write_pages(
+                posts_path, self.iter_posts(community_id), self.posts_per_community, page_size
+            )
+            files[f"posts-{community_id}"] = posts_path
+            definition_path = directory / f"post-definition-{community_id}.json"
+            definition_path.write_bytes(to_json(self.post_definition(community_id)))
+            files[f"post-definition-{community_id}"] = definition_path
+            catalog_id = self.catalog_id(community_id)
+            entries_path = directory / f"catalog-entries-{catalog_id}.jsonl"
+            write_pages(
+                entries_path, self.catalog(community_id)["entries"], self.catalog_entries, page_size
+            )
+            files[f"catalog-entries-{catalog_id}"] = entries_path
+        return files
+
+
+def iter_pages(items: Iterable[dict], total: int, page_size: int) -> Iterator[dict]:
+    from .server import encode_page_token
+
+    page = []
+    offset = 0
+    for item in items:
+        page.append(item)
+        if len(page) == page_size:
+            offset += page_size
+            yield {
+                "items": page,
+                "nextPageToken": encode_page_token(offset) if offset < total else None,
+                "totalItemsCount": total,
+            }
+            page = []
+    if page or not offset:
+        yield {"items": page, "nextPageToken": None, "totalItemsCount": total}
+
+
+def write_pages(path: Path, items: Iterable[dict], total: int, page_size: int) -> int:
+    """Scrive le pagine in formato jsonl, restituisce il numero di pagine scritte."""
+    pages = 0
+    with open(path, "wb") as file:
+        for page in iter_pages(items, total, page_size):
+            file.write(to_json(page))
+            file.write(b"\n")
+            pages += 1
+    return pages
+
+
+def build_dataset(
+    communities: int = 1,
+    posts_per_community: int = 100,
+    users: int = 50,
+    groups: int = 5,
+    comments_per_post: int = 2,
+    catalog_entries: int = 20,
+    seed: int = 0,
+) -> FakeDataset:
+    """Costruisce un dataset deterministico di piccole dimensioni, interamente in memoria."""
+    return TenantGenerator(
+        seed=seed,
+        communities=communities,
+        posts_per_community=posts_per_community,
+        users=users,
+        groups=groups,
+        comments_per_post=comments_per_post,
+        catalog_entries=catalog_entries,
+    ).dataset(materialize=True)
@@ -0,0 +1,967 @@
+import base64
+import binascii
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+from urllib.parse import parse_qs, urlsplit
+
+from ..enums import FieldFilterTypeEnum
+from ..settings import InteractaSettings
+from ..urls import API_ENDPOINT_PATH
+from .dataset import FakeDataset, short_user
+from .generator import POST_ID_STRIDE, build_dataset
+
+ROUTES: list[tuple[str, str, str]] = [
+    ("POST", "/core/auth/create-access-token-by-credentials", "login_credentials"),
+    ("POST", "/core/auth/create-access-token-by-service-account", "login_service"),
+    ("POST", "/communication/posts/data/community-list/{community_id}", "list_posts"),
+    ("POST", "/communication/posts/data/list/community/{community_id}", "list_posts_filtered"),
+    ("GET", "/communication/posts/data/post-detail-by-id/{post_id}", "post_detail"),
+    ("POST", "/communication/posts/manage/create-post/{community_id}", "create_post"),
+    ("GET", "/communication/posts/manage/post-data-for-edit/{post_id}", "post_data_for_edit"),
+    ("PUT", "/communication/posts/manage/edit-post/{post_id}/{occ_token}", "edit_post"),
+    ("DELETE", "/communication/posts/manage/delete-post/{post_id}", "delete_post"),
+    ("POST", "/communication/posts/data/comments-list/{post_id}", "list_comments"),
+    ("POST", "/communication/posts/manage/create-comment/{post_id}", "create_comment"),
+    ("DELETE", "/communication/posts/manage/delete-comment/{comment_id}", "delete_comment"),
+    ("POST", "/admin/data/users", "list_users"),
+    ("POST", "/admin/manage/users", "create_user"),
+    ("GET", "/admin/manage/users/{user_id}/edit", "user_data_for_edit"),
+    ("PUT", "/admin/manage/users/{user_id}", "edit_user"),
+    ("DELETE", "/admin/manage/users/{user_id}", "delete_user"),
+    ("GET", "/admin/data/business-units", "list_business_units"),
+    ("POST", "/admin/data/groups", "list_groups"),
+    ("POST", "/admin/manage/groups", "create_group"),
+    ("POST", "/admin/data/groups/{group_id}/members", "list_group_members"),
+    ("GET", "/admin/manage/groups/{group_id}/edit", "group_data_for_edit"),
+    ("PUT", "/admin/manage/groups/{group_id}", "edit_group"),
+    ("DELETE", "/admin/manage/groups/{group_id}", "delete_group"),
+    ("POST", "/admin/data/communities/{community_id}/hashtags", "list_hashtags"),
+    (
+        "GET",
+        "/communication/settings/communities/{community_id}/post-definition",
+        "post_definition",
+    ),
+    ("GET", "/communication/settings/communities/{community_id}/details", "community_detail"),
+    ("POST", "/communication/settings/post-definition/catalogs", "list_catalogs"),
+    (
+        "POST",
+        "/communication/settings/post-definition/catalogs/{catalog_id}/entries",
+        "list_catalog_entries",
+    ),
+    (
+        "GET",
+        "/communication/posts/manage/post-workflow-screen-data-for-edit/{post_id}",
+        "screen_data_for_edit",
+    ),
+    (
+        "POST",
+        "/communication/posts/manage/execute-post-workflow-operation/{post_id}/{operation_id}",
+        "execute_workflow_operation",
+    ),
+    (
+        "PUT",
+        "/communication/posts/manage/edit-post-workflow-screen-data/{post_id}/{screen_occ_token}",
+        "edit_screen_data",
+    ),
+]
+
+
+def compile_route(template: str) -> re.Pattern:
+    return re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>-?\\d+)", template) + "$")
+
+
+COMPILED_ROUTES = [
+    (method, compile_route(template), template, handler) for method, template, handler in ROUTES
+]
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status: int, message: str = "", headers: dict | None = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class FakeRequest:
+    method: str
+    path: str
+    template: str
+    handler: str
+    args: dict[str, int]
+    params: dict[str, str]
+    body: Any
+    headers: dict[str, str]
+
+
+def encode_page_token(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def decode_page_token(token: str | None) -> int:
+    if not token:
+        return 0
+    try:
+        kind, offset = base64.urlsafe_b64decode(token.encode()).decode().split(":")
+        if kind != "offset":
+            raise ValueError(kind)
+        return int(offset)
+    except (ValueError, binascii.Error) as exc:
+        raise FakeHttpError(400, f"Invalid page token {token!r}") from exc
+
+
+def paginate(items: Sequence, body: dict | None, default_page_size: int = 15) -> dict:
+    body = body or {}
+    offset = decode_page_token(body.get("pageToken"))
+    page_size = body.get("pageSize") or default_page_size
+    page = list(items[offset : offset + page_size])
+    next_offset = offset + page_size
+    result = {
+        "items": page,
+        "nextPageToken": encode_page_token(next_offset) if next_offset < len(items) else None,
+    }
+    if body.get("calculateTotalItemsCount", True):
+        result["totalItemsCount"] = len(items)
+    return result
+
+
+def contains(value: str | None, text: str | None) -> bool:
+    return bool(value) and text.lower() in value.lower()
+
+
+def match_field_filter(value: Any, field_filter: dict) -> bool:
+    type_id = field_filter.get("typeId")
+    parameters = field_filter.get("parameters") or []
+    values = value if isinstance(value, list) else [value]
+    match type_id:
+        case FieldFilterTypeEnum.EQUAL:
+            return bool(parameters) and value == parameters[0]
+        case FieldFilterTypeEnum.INTERVAL:
+            low, high = (list(parameters) + [None, None])[:2]
+            return (
+                value is not None
+                and (low is None or value >= low)
+                and (high is None or value <= high)
+            )
+        case FieldFilterTypeEnum.LIKE:
+            return bool(parameters) and isinstance(value, str) and contains(value, parameters[0])
+        case FieldFilterTypeEnum.IN | FieldFilterTypeEnum.CONTAINS:
+            return any(item in parameters for item in values)
+        case FieldFilterTypeEnum.IS_NULL_OR_IN:
+            return value in (None, []) or any(item in parameters for item in values)
+        case FieldFilterTypeEnum.IS_EMPTY:
+            return value in (None, "", [])
+    raise FakeHttpError(400, f"Unsupported field filter type {type_id}")
+
+
+# chiavi dei filtri gestite da match_post, le altre (paginazione, ordinamento...) sono ignorate
+POST_FILTER_KEYS = frozenset(
+    {
+        "title",
+        "description",
+        "containsText",
+        "postId",
+        "createdByUserId",
+        "createdByUserIds",
+        "creationTimestampFrom",
+        "creationTimestampTo",
+        "modifiedTimestampFrom",
+        "modifiedTimestampTo",
+        "currentWorkflowStatusIds",
+        "hashtagIds",
+        "visibility",
+        "postFieldFilters",
+        "customFieldFilters",
+    }
+)
+
+
+# Criteri di ordinamento supportati da list_posts_filtered (orderBy)
+POST_ORDERINGS: dict[str, Callable[[dict], Any]] = {
+    "postTitle": lambda post: post.get("title") or "",
+    "postCustomId": lambda post: post.get("customId") or "",
+    "postCreationTimestamp": lambda post: post.get("creationTimestamp") or 0,
+    "postLastModifyTimestamp": lambda post: post.get("lastModifyTimestamp") or 0,
+    "postLastModifyAndCommentTimestamp": lambda post: max(
+        post.get("lastModifyTimestamp") or 0, post.get("lastOperationTimestamp") or 0
+    ),
+}
+
+
+def pinned_first(posts: list[dict], body: dict) -> list[dict]:
+    # come il server, senza pinnedFirst i post pinnati precedono gli altri
+    if body.get("pinnedFirst") is False:
+        return posts
+    return sorted(posts, key=lambda post: not post.get("pinned"))
+
+
+def match_post(post: dict, filters: dict) -> bool:  # noqa: C901
+    if filters.get("title") and not contains(post.get("title"), filters["title"]):
+        return False
+    if filters.get("description") and not contains(
+        post.get("descriptionPlainText"), filters["description"]
+    ):
+        return False
+    if filters.get("containsText") and not (
+        contains(post.get("title"), filters["containsText"])
+        or contains(post.get("descriptionPlainText"), filters["containsText"])
+    ):
+        return False
+    if filters.get("postId") and post["id"] != filters["postId"]:
+        return False
+    creator_id = (post.get("creatorUser") or {}).get("id")
+    if filters.get("createdByUserId") and creator_id != filters["createdByUserId"]:
+        return False
+    if filters.get("createdByUserIds") and creator_id not in filters["createdByUserIds"]:
+        return False
+    for key, timestamp_key in (
+        ("creationTimestamp", "creationTimestamp"),
+        ("modifiedTimestamp", "lastModifyTimestamp"),
+    ):
+        low, high = filters.get(f"{key}From"), filters.get(f"{key}To")
+        if low is not None and post[timestamp_key] < low:
+            return False
+        if high is not None and post[timestamp_key] > high:
+            return False
+    status_ids = filters.get("currentWorkflowStatusIds")
+    if status_ids and (post.get("currentWorkflowState") or {}).get("id") not in status_ids:
+        return False
+    hashtag_ids = filters.get("hashtagIds")
+    if hashtag_ids:
+        post_hashtags = {hashtag["id"] for hashtag in post.get("hashtags") or []}
+        check = all if filters.get("hashtagsLogicalAnd") else any
+        if not check(hashtag_id in post_hashtags for hashtag_id in hashtag_ids):
+            return False
+    if filters.get("visibility") is not None and post.get("visibility") != filters["visibility"]:
+        return False
+    custom_data = post.get("customData") or {}
+    # customFieldFilters nella lista semplice, postFieldFilters in quella filtrata
+    field_filters = filters.get("postFieldFilters") or filters.get("customFieldFilters") or []
+    for field_filter in field_filters:
+        value = custom_data.get(str(field_filter.get("columnId")))
+        if not match_field_filter(value, field_filter):
+            return False
+    return True
+
+
+def match_user(user: dict, filters: dict) -> bool:
+    text = filters.get("fullTextFilter")
+    if text and not any(
+        contains(user.get(key), text) for key in ("firstName", "lastName", "contactEmail")
+    ):
+        return False
+    email = filters.get("externalAuthServiceEmailFullTextFilter")
+    if email and not any(
+        contains(user.get(key), email) for key in ("googleAccountId", "microsoftAccountId")
+    ):
+        return False
+    status_filter = filters.get("statusFilter")
+    if status_filter == [0] and (user.get("deleted") or user.get("blocked")):
+        return False
+    providers = filters.get("loginProviderFilter")
+    if providers is not None:
+        if providers == []:
+            return not user.get("loginProviders")
+        if not set(providers) & set(user.get("loginProviders") or []):
+            return False
+    return True
+
+
+class RateLimiter:
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.calls: deque[float] = deque()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            while self.calls and now - self.calls[0] >= 1:
+                self.calls.popleft()
+            if len(self.calls) >= self.rate:
+                return False
+            self.calls.append(now)
+            return True
+
+
+def description_texts(body: dict) -> tuple[str | None, str | None]:
+    """Testo e delta della descrizione di un post creato o modificato: con descriptionFormat 1
+    la descrizione è un delta, ma si accetta anche testo semplice."""
+    description = body.get("description")
+    if description is None or body.get("descriptionFormat", 1) != 1:
+        return description, None
+    try:
+        ops = json.loads(description)
+        ops = ops.get("ops", []) if isinstance(ops, dict) else ops
+        text = "".join(op["insert"] for op in ops if isinstance(op.get("insert"), str))
+    except (ValueError, AttributeError, TypeError, KeyError):
+        return description, None
+    return text.removesuffix("\n"), description
+
+
+class FakeInteractaServer:
+    """Server http locale che simula le api di Interacta usate da InteractaApi.
+
+    Pensato per test offline e benchmark: latenza, errori e rate limit sono configurabili e le
+    chiamate ricevute sono conteggiate per endpoint (``requests_count``).
+
+        with FakeInteractaServer(build_dataset(posts_per_community=500)) as server:
+            api = InteractaApi(server.settings())
+            api.login()
+            posts = api.list_all_posts(community_id=1)
+    """
+
+    def __init__(
+        self,
+        dataset: FakeDataset | None = None,
+        *,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: float | None = None,
+        compress_responses: bool = True,
+        username: str = "user",
+        password: str = "password",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ) -> None:
+        self.dataset = dataset if dataset is not None else build_dataset()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.compress_responses = compress_responses
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+        self.tokens: set[str] = set()
+        self.requests_count: Counter[str] = Counter()
+        self.injected_errors: deque[tuple[int, str | None]] = deque()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread: threading.Thread | None = None
+
+    # ciclo di vita
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def settings(self, **kwargs) -> InteractaSettings:
+        return InteractaSettings(
+            base_url=self.base_url,
+            auth_username=self.username,
+            auth_password=self.password,
+            **kwargs,
+        )
+
+    def start(self) -> "FakeInteractaServer":
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def inject_errors(self, status: int = 503, count: int = 1, path: str | None = None) -> None:
+        """Le prossime ``count`` richieste (sul path indicato, se presente) falliscono."""
+        with self.lock:
+            self.injected_errors.extend([(status, path)] * count)
+
+    # dispatch
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self, "GET")
+
+            def do_POST(self):
+                server.handle(self, "POST")
+
+            def do_PUT(self):
+                server.handle(self, "PUT")
+
+            def do_DELETE(self):
+                server.handle(self, "DELETE")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        url = urlsplit(handler.path)
+        length = int(handler.headers.get("content-length") or 0)
+        raw_body = handler.rfile.read(length) if length else b""
+        headers = {key.lower(): value for key, value in handler.headers.items()}
+        try:
+            request = self._build_request(method, url, raw_body, headers)
+            # gli handler sono eseguiti in thread diversi
+            with self.lock:
+                self.requests_count[f"{method} {request.template}"] += 1
+            self._simulate_conditions(request)
+            status, payload = 200, getattr(self, f"handle_{request.handler}")(request)
+        except FakeHttpError as error:
+            status, payload = error.status, {"message": error.message}
+            headers_out = error.headers
+        else:
+            headers_out = {}
+        self._send(handler, status, payload, headers, headers_out)
+
+    def _build_request(self, method: str, url, raw_body: bytes, headers: dict) -> FakeRequest:
+        if not url.path.startswith(API_ENDPOINT_PATH):
+            raise FakeHttpError(404, f"Unknown path {url.path}")
+        path = url.path[len(API_ENDPOINT_PATH) :]
+        for route_method, pattern, template, handler in COMPILED_ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            raise FakeHttpError(404, f"No route for {method} {path}")
+        if headers.get("content-encoding") == "gzip":
+            raw_body = gzip.decompress(raw_body)
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError as exc:
+            raise FakeHttpError(400, "Invalid json body") from exc
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        request = FakeRequest(
+            method=method,
+            path=path,
+            template=template,
+            handler=handler,
+            args={key: int(value) for key, value in match.groupdict().items()},
+            params=params,
+            body=body,
+            headers=headers,
+        )
+        if not template.startswith("/core/auth/"):
+            authorization = headers.get("authorization", "")
+            if authorization.removeprefix("Bearer ") not in self.tokens:
+                raise FakeHttpError(401, "Invalid access token")
+        return request
+
+    def _simulate_conditions(self, request: FakeRequest) -> None:
+        if self.rate_limiter and not self.rate_limiter.allow():
+            raise FakeHttpError(429, "Too many requests", {"retry-after": "1"})
+        with self.lock:
+            for index, (status, path) in enumerate(self.injected_errors):
+                if path is None or request.path.startswith(path):
+                    del self.injected_errors[index]
+                    raise FakeHttpError(status, "Injected error")
+            latency = (
+                self.random.uniform(*self.latency)
+                if isinstance(self.latency, tuple)
+                else self.latency
+            )
+            failing = self.error_rate and self.random.random() < self.error_rate
+        if latency:
+            time.sleep(latency)
+        if failing:
+            raise FakeHttpError(self.error_status, "Random injected error")
+
+    def _send(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        payload: Any,
+        request_headers: dict,
+        headers: dict,
+    ) -> None:
+        # default=list serializza le GeneratedSequence (es. entry dei cataloghi generati)
+        body = json.dumps(payload, separators=(",", ":"), default=list).encode()
+        handler.send_response(status)
+        handler.send_header("content-type", "application/json")
+        if (
+            self.compress_responses
+            and len(body) > 1024
+            and "gzip" in request_headers.get("accept-encoding", "")
+        ):
+            body = gzip.compress(body, compresslevel=1)
+            handler.send_header("content-encoding", "gzip")
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header("content-length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    # helper
+
+    def _get_or_404(self, getter: Callable[[int], Any], object_id: int, kind: str) -> Any:
+        found = getter(object_id)
+        if found is None:
+            raise FakeHttpError(404, f"{kind} {object_id} not found")
+        return found
+
+    def _post(self, request: FakeRequest) -> dict:
+        return self._get_or_404(self.dataset.get_post, request.args["post_id"], "Post")
+
+    def _community(self, request: FakeRequest) -> int:
+        community_id = request.args["community_id"]
+        if community_id not in self.dataset.communities:
+            raise FakeHttpError(404, f"Community {community_id} not found")
+        return community_id
+
+    def _issue_token(self) -> dict:
+        token = uuid.uuid4().hex
+        self.tokens.add(token)
+        return {"accessToken": token}
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    # auth
+
+    def handle_login_credentials(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        if body.get("username") != self.username or body.get("password") != self.password:
+            raise FakeHttpError(401, "Wrong credentials")
+        return self._issue_token()
+
+    def handle_login_service(self, request: FakeRequest) -> dict:
+        if not (request.body or {}).get("jwtAssertion"):
+            raise FakeHttpError(401, "Missing jwtAssertion")
+        return self._issue_token()
+
+    # post
+
+    def _filtered_posts(self, community_id: int, filters: dict) -> Sequence[dict]:
+        posts = self.dataset.posts.get(community_id, [])
+        active = {
+            key: value
+            for key, value in filters.items()
+            if key in POST_FILTER_KEYS and value not in (None, [], "")
+        }
+        if not active:
+            return posts
+        return [post for post in posts if match_post(post, active)]
+
+    def handle_list_posts(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        posts = self._filtered_posts(self._community(request), body)
+        return paginate(pinned_first(posts, body), body)
+
+    def handle_list_posts_filtered(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        filters = body.get("communityPostFilters") or {}
+        posts = self._filtered_posts(self._community(request), filters)
+        if body.get("orderBy") in POST_ORDERINGS:
+            posts = sorted(
+                posts, key=POST_ORDERINGS[body["orderBy"]], reverse=bool(body.get("orderDesc"))
+            )
+        return paginate(pinned_first(posts, body), body)
+
+    def handle_post_detail(self, request: FakeRequest) -> dict:
+        return self._post(request)
+
+    def handle_create_post(self, request: FakeRequest) -> dict:
+        community_id = self._community(request)
+        body = request.body or {}
+        if not body.get("title"):
+            raise FakeHttpError(400, "Title is required")
+        user = short_user(self.dataset.users[0]) if self.dataset.users else None
+        now = self._now()
+        plain_text, delta = description_texts(body)
+        # i post creati hanno id nella seconda metà dell'intervallo della community, fuori da
+        # quello dei post generati
+        post_id = self.dataset.next_id(
+            f"post-{community_id}", community_id * POST_ID_STRIDE + POST_ID_STRIDE // 2
+        )
+        definition = self.dataset.post_definitions.get(community_id) or {}
+        states = (definition.get("workflowDefinition") or {}).get("states") or []
+        init_state = next((state for state in states if state.get("initState")), None)
+        post = {
+            "id": post_id,
+            "communityId": community_id,
+            "customId": body.get("customId") or f"C{community_id}-{post_id}",
+            "title": body["title"],
+            "descriptionPlainText": plain_text,
+            "descriptionDelta": delta,
+            "visibility": body.get("visibility") or 1,
+            "customData": body.get("customData") or {},
+            "creatorUser": user,
+            "creationTimestamp": now,
+            "lastModifyUser": user,
+            "lastModifyTimestamp": now,
+            "lastOperationTimestamp": now,
+            "commentsCount": 0,
+            "workflowStateDescription": init_state["name"] if init_state else None,
+            "currentWorkflowState": init_state,
+            "hashtags": [],
+            "occToken": 1,
+        }
+        self.dataset.add_post(community_id, post)
+        self.dataset.comments[post_id] = []
+        return {"postId": post_id, "nextOccToken": 1, "postData": post}
+
+    def handle_post_data_for_edit(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        return {
+            "contentData": {
+                "title": post["title"],
+                "description": post.get("descriptionPlainText"),
+                "descriptionDelta": post.get("descriptionDelta"),
+                "visibility": post.get("visibility"),
+                "customData": post.get("customData"),
+                "hashtags": post.get("hashtags"),
+            },
+            "occToken": post["occToken"],
+            "communityId": post["communityId"],
+            "customId": post.get("customId"),
+            "currentWorkflowState": post.get("currentWorkflowState"),
+            "creatorUser": post.get("creatorUser"),
+            "creationTimestamp": post.get("creationTimestamp"),
+            "lastModifyTimestamp": post.get("lastModifyTimestamp"),
+        }
+
+    def handle_edit_post(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        body = request.body or {}
+        with self.dataset.lock:
+            if request.args["occ_token"] != post["occToken"]:
+                raise FakeHttpError(409, "Concurrent modification (wrong occ token)")
+            if body.get("description") is not None:
+                post["descriptionPlainText"], post["descriptionDelta"] = description_texts(body)
+            for key, target in (
+                ("title", "title"),
+                ("visibility", "visibility"),
+                ("customData", "customData"),
+            ):
+                if key in body and body[key] is not None:
+                    post[target] = body[key]
+            post["occToken"] += 1
+            post["lastModifyTimestamp"] = post["lastOperationTimestamp"] = self._now()
+        return {"nextOccToken": post["occToken"]}
+
+    def handle_delete_post(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        self.dataset.remove_post(post["id"])
+        return {"postId": post["id"]}
+
+    # commenti
+
+    def handle_list_comments(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        return paginate(self.dataset.comments.get(post["id"], []), request.body)
+
+    def handle_create_comment(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        body = request.body or {}
+        text = body.get("comment") or ""
+        if body.get("commentFormat", 1) == 1:
+            try:
+                text = "".join(op.get("insert", "") for op in json.loads(text)).strip()
+            except (ValueError, AttributeError, TypeError) as exc:
+                raise FakeHttpError(400, "Invalid delta comment") from exc
+        comment = {
+            "id": self.dataset.next_id("comment", 10_000_000),
+            "commentPlainText": text,
+            "commentDelta": body.get("comment") if body.get("commentFormat", 1) == 1 else None,
+            "creatorUser": short_user(self.dataset.users[0]) if self.dataset.users else None,
+            "creationTimestamp": self._now(),
+            "deleted": False,
+            "parentComment": body.get("parentCommentId"),
+            "likesCount": 0,
+            "likedByMe": False,
+            "showLikeSection": True,
+        }
+        with self.dataset.lock:
+            self.dataset.comments.setdefault(post["id"], []).insert(0, comment)
+            post["commentsCount"] = (post.get("commentsCount") or 0) + 1
+            post["lastOperationTimestamp"] = comment["creationTimestamp"]
+        return {"comment": comment}
+
+    def handle_delete_comment(self, request: FakeRequest) -> dict:
+        comment_id = request.args["comment_id"]
+        with self.dataset.lock:
+            for post_id, comments in self.dataset.comments.items():
+                for comment in comments:
+                    if comment["id"] == comment_id:
+                        comments.remove(comment)
+                        post = self.dataset.get_post(post_id)
+                        post["commentsCount"] = max((post.get("commentsCount") or 1) - 1, 0)
+                        return {}
+        raise FakeHttpError(404, f"Comment {comment_id} not found")
+
+    # utenti
+
+    def handle_list_users(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        users = self.dataset.users
+        filters = {key: value for key, value in body.items() if value is not None}
+        if {
+            "fullTextFilter",
+            "externalAuthServiceEmailFullTextFilter",
+            "statusFilter",
+            "loginProviderFilter",
+        } & set(filters):
+            users = [user for user in users if match_user(user, filters)]
+        return paginate(users, body)
+
+    def handle_create_user(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        user_id = self.dataset.next_id("user", 5_000_000)
+        self.dataset.users.append(
+            {
+                "id": user_id,
+                "firstName": body.get("firstname"),
+                "lastName": body.get("lastname"),
+                "contactEmail": body.get("contactEmail"),
+                "privateEmail": body.get("privateEmail"),
+                "externalId": body.get("externalId"),
+                "deleted": False,
+                "blocked": False,
+                "loginProviders": [],
+                "occToken": 1,
+            }
+        )
+        return {"userId": user_id, "nextOccToken": 1}
+
+    def handle_user_data_for_edit(self, request: FakeRequest) -> dict:
+        user = self._get_or_404(self.dataset.get_user, request.args["user_id"], "User")
+        return {
+            "firstname": user.get("firstName"),
+            "lastname": user.get("lastName"),
+            "contactEmail": user.get("contactEmail"),
+            "privateEmail": user.get("privateEmail"),
+            "externalId": user.get("externalId"),
+            "occToken": user.get("occToken", 1),
+            "blocked": user.get("blocked"),
+            "userInfo": user.get("userInfo"),
+        }
+
+    def handle_edit_user(self, request: FakeRequest) -> dict:
+        user = self._get_or_404(self.dataset.get_user, request.args["user_id"], "User")
+        body = request.body or {}
+        with self.dataset.lock:
+            if body.get("occToken") is not None and body["occToken"] != user.get("occToken", 1):
+                raise FakeHttpError(409, "Concurrent modification (wrong occ token)")
+            for key, target in (
+                ("firstname", "firstName"),
+                ("lastname", "lastName"),
+                ("contactEmail", "contactEmail"),
+                ("privateEmail", "privateEmail"),
+                ("externalId", "externalId"),
+                ("userInfo", "userInfo"),
+            ):
+                if key in body:
+                    user[target] = body[key]
+            user["occToken"] = user.get("occToken", 1) + 1
+        return {"nextOccToken": user["occToken"]}
+
+    def handle_delete_user(self, request: FakeRequest) -> dict:
+        user = self._get_or_404(self.dataset.get_user, request.args["user_id"], "User")
+        user["deleted"] = True
+        return {}
+
+    def handle_list_business_units(self, request: FakeRequest) -> list:
+        return self.dataset.business_units
+
+    # gruppi
+
+    def handle_list_groups(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        groups = self.dataset.groups
+        if body.get("fullTextFilter"):
+            groups = [group for group in groups if contains(group["name"], body["fullTextFilter"])]
+        if body.get("statusFilter") == [0]:
+            groups = [group for group in groups if not group.get("deleted")]
+        return paginate(groups, body)
+
+    def handle_create_group(self, request: FakeRequest) -> dict:
+        body = request.body or {}
+        group_id = self.dataset.next_id("group", 5_000_000)
+        members = body.get("memberIds") or []
+        group = {
+            "id": group_id,
+            "name": body.get("name"),
+            "email": body.get("email"),
+            "visible": body.get("visible"),
+            "externalId": body.get("externalId"),
+            "deleted": False,
+            "occToken": 1,
+            "membersCount": len(members),
+        }
+        self.dataset.groups.append(group)
+        self.dataset.group_members[group_id] = list(members)
+        return {**group, "groupId": group_id, "nextOccToken": 1}
+
+    def _group_members(self, group_id: int) -> list[dict]:
+        members = self.dataset.group_members.get(group_id, [])
+        users = (self.dataset.get_user(member) for member in members)
+        return [short_user(user) for user in users if user is not None]
+
+    def handle_list_group_members(self, request: FakeRequest) -> dict:
+        group = self._get_or_404(self.dataset.get_group, request.args["group_id"], "Group")
+        return paginate(self._group_members(group["id"]), request.body)
+
+    def handle_group_data_for_edit(self, request: FakeRequest) -> dict:
+        group = self._get_or_404(self.dataset.get_group, request.args["group_id"], "Group")
+        return {**group, "members": self._group_members(group["id"]), "tags": []}
+
+    def handle_edit_group(self, request: FakeRequest) -> dict:
+        group = self._get_or_404(self.dataset.get_group, request.args["group_id"], "Group")
+        body = request.body or {}
+        with self.dataset.lock:
+            if body.get("occToken") is not None and body["occToken"] != group["occToken"]:
+                raise FakeHttpError(409, "Concurrent modification (wrong occ token)")
+            for key in ("name", "email", "visible", "externalId"):
+                if key in body:
+                    group[key] = body[key]
+            if body.get("memberIds") is not None:
+                self.dataset.group_members[group["id"]] = list(body["memberIds"])
+                group["membersCount"] = len(body["memberIds"])
+            group["occToken"] += 1
+        return {"nextOccToken": group["occToken"]}
+
+    def handle_delete_group(self, request: FakeRequest) -> dict:
+        group = self._get_or_404(self.dataset.get_group, request.args["group_id"], "Group")
+        group["deleted"] = True
+        return {}
+
+    # community, hashtag e cataloghi
+
+    def handle_list_hashtags(self, request: FakeRequest) -> dict:
+        community_id = self._community(request)
+        return paginate(self.dataset.hashtags.get(community_id, []), request.body)
+
+    def handle_post_definition(self, request: FakeRequest) -> dict:
+        return self.dataset.post_definitions[self._community(request)]
+
+    def handle_community_detail(self, request: FakeRequest) -> dict:
+        return {"community": self.dataset.communities[self._community(request)]}
+
+    def handle_list_catalogs(self, request: FakeRequest) -> dict:
+        catalog_ids = (request.body or {}).get("catalogIds") or []
+        load_entries = request.params.get("loadEntries", "false").lower() == "true"
+        catalogs = []
+        for catalog_id in catalog_ids:
+            catalog = self.dataset.catalogs.get(catalog_id)
+            if catalog is None:
+                continue
+            if not load_entries:
+                catalog = {**catalog, "entries": None}
+            elif catalog.get("paged"):
+                # dei cataloghi paginati è restituita solo la prima pagina di entry
+                catalog = {**catalog, "entries": paginate(catalog["entries"], None)["items"]}
+            catalogs.append(catalog)
+        return {"catalogs": catalogs}
+
+    def handle_list_catalog_entries(self, request: FakeRequest) -> dict:
+        catalog = self._get_or_404(self.dataset.catalogs.get, request.args["catalog_id"], "Catalog")
+        return paginate(catalog["entries"], request.body)
+
+    # workflow
+
+    def _workflow(self, post: dict) -> dict:
+        definition = self.dataset.post_definitions.get(post["communityId"]) or {}
+        return definition.get("workflowDefinition") or {}
+
+    def _screen_data(self, post: dict) -> dict:
+        return self.dataset.screen_data.setdefault(post["id"], {"data": {}, "occToken": 1})
+
+    def handle_screen_data_for_edit(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        screen_data = self._screen_data(post)
+        operation_id = request.params.get("workflowOperationId")
+        screen = None
+        if operation_id:
+            transition = next(
+                (
+                    transition
+                    for transition in self._workflow(post).get("transitions", [])
+                    if transition["id"] == int(operation_id)
+                ),
+                None,
+            )
+            screen = transition.get("screen") if transition else None
+        return {
+            "screenData": screen_data["data"],
+            "screenOccToken": screen_data["occToken"],
+            "screen": screen,
+            "currentWorkflowState": post.get("currentWorkflowState"),
+        }
+
+    def handle_execute_workflow_operation(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        body = request.body or {}
+        workflow = self._workflow(post)
+        transition = next(
+            (
+                transition
+                for transition in workflow.get("transitions", [])
+                if transition["id"] == request.args["operation_id"]
+            ),
+            None,
+        )
+        current_state_id = (post.get("currentWorkflowState") or {}).get("id")
+        if transition is None or transition["fromState"]["id"] != current_state_id:
+            raise FakeHttpError(400, "Workflow operation not permitted")
+        screen_data = self._screen_data(post)
+        with self.dataset.lock:
+            if body.get("screenOccToken", screen_data["occToken"]) != screen_data["occToken"]:
+                raise FakeHttpError(409, "Concurrent modification (wrong screen occ token)")
+            screen_data["data"].update(body.get("screenData") or {})
+            screen_data["occToken"] += 1
+            post["currentWorkflowState"] = transition["toState"]
+            post["workflowStateDescription"] = transition["toState"]["name"]
+            post["lastOperationTimestamp"] = self._now()
+        permitted = [
+            candidate
+            for candidate in workflow.get("transitions", [])
+            if candidate["fromState"]["id"] == transition["toState"]["id"]
+        ]
+        return {
+            "newScreenData": screen_data["data"],
+            "newLastModifyTimestamp": post["lastOperationTimestamp"],
+            "postDataHasChanged": False,
+            "newCurrentState": transition["toState"],
+            "newCurrentWorkflowPermittedOperations": permitted,
+            "newCanEditWorkflowScreenData": True,
+        }
+
+    def handle_edit_screen_data(self, request: FakeRequest) -> dict:
+        post = self._post(request)
+        screen_data = self._screen_data(post)
+        with self.dataset.lock:
+            if request.args["screen_occ_token"] != screen_data["occToken"]:
+                raise FakeHttpError(409, "Concurrent modification (wrong screen occ token)")
+            screen_data["data"].update((request.body or {}).get("screenData") or {})
+            screen_data["occToken"] += 1
+        return {
+            "newScreenData": screen_data["data"],
+            "nextScreenOccToken": screen_data["occToken"],
+            "postDataHasChanged": False,
+        }
@@ -0,0 +1,221 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import IO, Any, Self
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import CassetteError
+
+# Chiavi dei body json il cui valore non viene mai scritto nelle cassette
+SECRET_KEYS = frozenset(
+    {"password", "jwtAssertion", "accessToken", "refreshToken", "token", "clientSecret"}
+)
+SCRUBBED = "***"
+# Header delle risposte non registrati: il body è salvato già decompresso
+SKIPPED_RESPONSE_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding", "set-cookie", "connection"}
+)
+
+
+class Transport:
+    """Invio delle richieste http di Api, sostituibile per registrare o simulare il traffico."""
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: dict | None = None,
+        data: bytes | str | None = None,
+        params: dict | None = None,
+        **kwargs,
+    ) -> Response:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    def send(self, method, url, headers=None, data=None, params=None, **kwargs) -> Response:
+        return requests.request(method, url, headers=headers, data=data, params=params, **kwargs)
+
+
+def scrub(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: SCRUBBED if key in SECRET_KEYS else scrub(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    return value
+
+
+def scrub_body(body: bytes | str | None) -> str:
+    """Body in forma canonica (json ordinato) con i segreti rimossi."""
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(scrub(json.loads(body)), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return body
+
+
+def request_body(headers: dict | None, data: bytes | str | None) -> bytes | str | None:
+    # il body inviato può essere compresso (vedi ApiSettings.request_compression_min_size)
+    if isinstance(data, bytes) and (headers or {}).get("content-encoding") == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+def request_key(method: str, url: str, params: dict | None, body: str) -> str:
+    """Chiave di una richiesta indipendente dall'host, per poter rieseguire una cassetta
+    registrata su un tenant con qualsiasi base_url."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query) + sorted((params or {}).items())
+    path = f"{parts.path}?{urlencode(sorted(query))}" if query else parts.path
+    digest = hashlib.sha1(body.encode(), usedforsecurity=False).hexdigest() if body else ""
+    return f"{method.upper()} {path} {digest}"
+
+
+@dataclass
+class Interaction:
+    key: str
+    status_code: int
+    headers: dict[str, str]
+    body: str
+    # tempo di risposta del server e istante della richiesta rispetto all'inizio registrazione
+    elapsed: float
+    offset: float = 0.0
+
+    def to_response(self, url: str, elapsed: float | None = None) -> Response:
+        response = Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body.encode()
+        response.encoding = "utf-8"
+        response.url = url
+        response.elapsed = timedelta(seconds=self.elapsed if elapsed is None else elapsed)
+        return response
+
+
+def open_cassette(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_cassette(path: str | Path) -> list[Interaction]:
+    with open_cassette(Path(path), "r") as file:
+        return [Interaction(**json.loads(line)) for line in file if line.strip()]
+
+
+class RecordingTransport(Transport):
+    """Registra gli scambi di un altro transport in una cassetta jsonl (gzip se ``.gz``).
+
+    Token e credenziali non vengono scritti: gli header delle richieste non sono registrati e i
+    valori delle chiavi in SECRET_KEYS sono sostituiti nei body json.
+    """
+
+    def __init__(self, path: str | Path, transport: Transport | None = None) -> None:
+        self.path = Path(path)
+        self.transport = transport or RequestsTransport()
+        self._lock = threading.Lock()
+        self._file = open_cassette(self.path, "w")
+        self._started = time.perf_counter()
+        self.recorded = 0
+
+    def send(self, method, url, headers=None, data=None, params=None, **kwargs) -> Response:
+        offset = time.perf_counter() - self._started
+        response = self.transport.send(
+            method, url, headers=headers, data=data, params=params, **kwargs
+        )
+        interaction = Interaction(
+            key=request_key(method, url, params, scrub_body(request_body(headers, data))),
+            status_code=response.status_code,
+            headers={
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in SKIPPED_RESPONSE_HEADERS
+            },
+            body=scrub_body(response.text) if response.content else "",
+            elapsed=response.elapsed.total_seconds(),
+            offset=offset,
+        )
+        line = json.dumps(asdict(interaction), separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ReplayTransport(Transport):
+    """Restituisce le risposte di una cassetta senza accedere alla rete.
+
+    Le richieste uguali (metodo, path, parametri e body) sono servite nell'ordine di
+    registrazione. ``speed`` scala i tempi registrati (1 = originali, 10 = dieci volte più
+    veloce): una richiesta inviata prima del suo istante nella registrazione (rispetto alla
+    prima richiesta) attende fino a quell'istante, poi la risposta arriva dopo il tempo di
+    risposta registrato. Con ``speed=None`` le risposte sono immediate.
+    """
+
+    def __init__(self, path: str | Path, speed: float | None = 1.0) -> None:
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._interactions: dict[str, deque[Interaction]] = defaultdict(deque)
+        interactions = read_cassette(path)
+        for interaction in interactions:
+            self._interactions[interaction.key].append(interaction)
+        # istante della prima richiesta registrata e della prima richiesta riprodotta
+        self._first_offset = min((item.offset for item in interactions), default=0.0)
+        self._started: float | None = None
+        self.replayed = 0
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(interactions) for interactions in self._interactions.values())
+
+    def send(self, method, url, headers=None, data=None, params=None, **kwargs) -> Response:
+        key = request_key(method, url, params, scrub_body(request_body(headers, data)))
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                raise CassetteError(f"No recorded response for request {key}")
+            interaction = interactions.popleft()
+            self.replayed += 1
+            if self._started is None:
+                self._started = time.perf_counter()
+            started = self._started
+        if not self.speed:
+            return interaction.to_response(url, elapsed=0.0)
+        # distanza dalla prima richiesta come nella registrazione
+        wait = (interaction.offset - self._first_offset) / self.speed
+        wait -= time.perf_counter() - started
+        if wait > 0:
+            time.sleep(wait)
+        delay = interaction.elapsed / self.speed
+        if delay:
+            time.sleep(delay)
+        return interaction.to_response(url, elapsed=delay)
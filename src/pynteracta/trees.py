@@ -0,0 +1,142 @@
+from collections.abc import Iterable
+
+from .enums import FieldFilterTypeEnum
+from .schemas.models import Catalog, CatalogEntry, CustomFieldFilter, EnumValue, FieldBase
+
+Choice = EnumValue | CatalogEntry
+
+
+class ChoiceTree:
+    """Indice della gerarchia dei valori di un enum gerarchico o delle entry di un catalogo.
+
+    L'indice è costruito una sola volta dai ``parent_ids``: se ogni valore ha al più un padre
+    (foresta) i discendenti di un nodo sono un intervallo contiguo della visita in profondità,
+    altrimenti (più padri) per ogni nodo è calcolato l'insieme dei discendenti come bitset.
+    In entrambi i casi il test di discendenza costa O(1).
+    """
+
+    def __init__(self, choices: Iterable[Choice]) -> None:
+        self.choices: dict[int, Choice] = {choice.id: choice for choice in choices}
+        self.parents: dict[int, list[int]] = {}
+        self.children: dict[int, list[int]] = {choice_id: [] for choice_id in self.choices}
+        for choice in self.choices.values():
+            # i padri non presenti (es. eliminati) sono ignorati e il valore diventa una radice
+            parents = [
+                parent_id for parent_id in choice.parent_ids or [] if parent_id in self.choices
+            ]
+            self.parents[choice.id] = parents
+            for parent_id in parents:
+                self.children[parent_id].append(choice.id)
+        self.roots = [choice_id for choice_id, parents in self.parents.items() if not parents]
+        self.is_forest = all(len(parents) <= 1 for parents in self.parents.values())
+        self.depth: dict[int, int] = {}
+        # visita in profondità: per ogni nodo posizione di ingresso e di uscita
+        self.order: list[int] = []
+        self.enter: dict[int, int] = {}
+        self.exit: dict[int, int] = {}
+        self._visit()
+        self._bits: dict[int, int] = {} if self.is_forest else self._descendant_bits()
+
+    def __len__(self) -> int:
+        return len(self.choices)
+
+    def __contains__(self, choice_id: int) -> bool:
+        return choice_id in self.choices
+
+    @classmethod
+    def from_field(cls, field: FieldBase) -> "ChoiceTree":
+        return cls(field.enum_values or [])
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> "ChoiceTree":
+        return cls(catalog.entries or [])
+
+    def _visit(self) -> None:
+        # i nodi non raggiungibili dalle radici (cicli) sono visitati come radici
+        for start in [*self.roots, *self.choices]:
+            if start in self.enter:
+                continue
+            self.depth[start] = 0
+            self.enter[start] = len(self.order)
+            self.order.append(start)
+            stack = [(start, iter(self.children[start]))]
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    self.exit[node] = len(self.order)
+                elif child not in self.enter:
+                    self.depth[child] = self.depth[node] + 1
+                    self.enter[child] = len(self.order)
+                    self.order.append(child)
+                    stack.append((child, iter(self.children[child])))
+
+    def _descendant_bits(self) -> dict[int, int]:
+        # bit del nodo più quelli dei figli, calcolati dalle foglie (uscita dalla visita)
+        bits: dict[int, int] = {}
+        for node in sorted(self.order, key=self.exit.__getitem__):
+            value = 1 << self.enter[node]
+            for child in self.children[node]:
+                value |= bits.get(child, 0)
+            bits[node] = value
+        # i cicli non chiusi nel primo passaggio sono propagati fino a stabilità
+        changed = True
+        while changed:
+            changed = False
+            for node in self.order:
+                value = bits[node]
+                for child in self.children[node]:
+                    value |= bits[child]
+                if value != bits[node]:
+                    bits[node], changed = value, True
+        return bits
+
+    def is_ancestor(self, ancestor_id: int, choice_id: int, include_self: bool = False) -> bool:
+        if ancestor_id not in self.enter or choice_id not in self.enter:
+            return False
+        if ancestor_id == choice_id:
+            return include_self
+        if self.is_forest:
+            return self.enter[ancestor_id] < self.enter[choice_id] < self.exit[ancestor_id]
+        return bool(self._bits[ancestor_id] >> self.enter[choice_id] & 1)
+
+    def descendants(self, choice_id: int, include_self: bool = True) -> list[int]:
+        if choice_id not in self.enter:
+            return []
+        start = self.enter[choice_id] + (0 if include_self else 1)
+        if self.is_forest:
+            return self.order[start : self.exit[choice_id]]
+        bits = self._bits[choice_id]
+        if not include_self:
+            bits &= ~(1 << self.enter[choice_id])
+        return [node for index, node in enumerate(self.order) if bits >> index & 1]
+
+    def ancestors(self, choice_id: int) -> list[int]:
+        """Antenati dal padre alla radice (seguendo il primo padre se sono più di uno)."""
+        ancestors = []
+        parents = self.parents.get(choice_id)
+        while parents and parents[0] not in ancestors and parents[0] != choice_id:
+            ancestors.append(parents[0])
+            parents = self.parents[parents[0]]
+        return ancestors
+
+    def path(self, choice_id: int) -> list[Choice]:
+        if choice_id not in self.choices:
+            return []
+        return [self.choices[node] for node in [*reversed(self.ancestors(choice_id)), choice_id]]
+
+    def expand(self, choice_ids: Iterable[int]) -> list[int]:
+        """Valori indicati più tutti i loro discendenti, senza ripetizioni."""
+        expanded: dict[int, None] = {}
+        for choice_id in choice_ids:
+            if choice_id in expanded:
+                continue
+            expanded.update(dict.fromkeys(self.descendants(choice_id) or [choice_id]))
+        return list(expanded)
+
+    def filter(self, column_id: int, choice_ids: Iterable[int]) -> CustomFieldFilter:
+        """Filtro IN sul campo con i valori indicati e i loro discendenti."""
+        return CustomFieldFilter(
+            column_id=column_id, type_id=FieldFilterTypeEnum.IN, parameters=self.expand(choice_ids)
+        )
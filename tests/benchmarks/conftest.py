@@ -0,0 +1,277 @@
+# Benchmark dei percorsi critici del client, deselezionati di default:
+#
+#   pytest -m benchmark tests/benchmarks --bench-save .benchmarks/main.json
+#   pytest -m benchmark tests/benchmarks --bench-compare .benchmarks/main.json
+#
+# Con --bench-compare un benchmark fallisce se è più lento della baseline oltre
+# --bench-threshold; i tempi della baseline sono riscalati in base a un carico di calibrazione
+# per compensare le differenze di velocità tra macchine ed esecuzioni. I benchmark di memoria
+# (fixture memory_bench) falliscono oltre --bench-memory-threshold.
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+# durata minima di un round: le funzioni veloci sono ripetute più volte per round
+MIN_ROUND_TIME = 0.05
+ROUNDS = 7
+
+
+@dataclass
+class BenchResult:
+    name: str
+    median: float
+    min: float
+    max: float
+    rounds: int
+    iterations: int
+    baseline: float | None = None
+
+    @property
+    def ratio(self) -> float | None:
+        return self.min / self.baseline if self.baseline else None
+
+
+@dataclass
+class MemoryResult:
+    name: str
+    items: int
+    # byte allocati (tracemalloc) ancora in uso alla fine e picco durante l'esecuzione
+    retained: int
+    peak: int
+    # aumento del picco di RSS del processo, se misurato
+    rss: int | None = None
+    baseline: float | None = None
+
+    @property
+    def per_item(self) -> float:
+        return self.retained / self.items if self.items else 0.0
+
+    @property
+    def ratio(self) -> float | None:
+        return self.peak / self.baseline if self.baseline else None
+
+
+def calibration_workload() -> None:
+    data = [{"id": index, "name": f"item-{index}"} for index in range(2_000)]
+    json.loads(json.dumps(data))
+    sorted(data, key=lambda item: item["name"])
+
+
+def calibrate(rounds: int = 20) -> float:
+    """Tempo minimo di un carico di riferimento, per normalizzare i confronti tra esecuzioni."""
+    timings = []
+    for _ in range(rounds):
+        started = perf_counter()
+        calibration_workload()
+        timings.append(perf_counter() - started)
+    return min(timings)
+
+
+class BenchSession:
+    def __init__(self, config: pytest.Config) -> None:
+        self.results: dict[str, BenchResult] = {}
+        self.memory: dict[str, MemoryResult] = {}
+        self.memory_threshold = config.getoption("--bench-memory-threshold")
+        self.memory_baseline: dict[str, dict] = {}
+        self.save_path = config.getoption("--bench-save")
+        self.threshold = config.getoption("--bench-threshold")
+        self.calibration = calibrate()
+        compare_path = config.getoption("--bench-compare")
+        self.baseline: dict[str, dict] = {}
+        # rapporto di velocità tra la macchina attuale e quella della baseline
+        self.scale = 1.0
+        if compare_path:
+            data = json.loads(Path(compare_path).read_text())
+            self.baseline = data["results"]
+            self.memory_baseline = data.get("memory", {})
+            self.scale = self.calibration / data["machine"]["calibration"]
+
+    def record(self, result: BenchResult) -> None:
+        baseline = self.baseline.get(result.name)
+        if baseline:
+            # il confronto usa il tempo minimo, meno sensibile al rumore della mediana
+            result.baseline = baseline["min"] * self.scale
+        self.results[result.name] = result
+        if result.ratio is not None and result.ratio > 1 + self.threshold:
+            pytest.fail(
+                f"Benchmark {result.name} regressed: {result.min * 1000:.3f} ms vs baseline"
+                f" {result.baseline * 1000:.3f} ms (+{(result.ratio - 1) * 100:.0f}%,"
+                f" threshold {self.threshold * 100:.0f}%)"
+            )
+
+    def record_memory(self, result: MemoryResult) -> None:
+        baseline = self.memory_baseline.get(result.name)
+        if baseline:
+            result.baseline = baseline["peak"]
+        self.memory[result.name] = result
+        if result.ratio is not None and result.ratio > 1 + self.memory_threshold:
+            pytest.fail(
+                f"Memory benchmark {result.name} regressed: peak {result.peak} bytes vs baseline"
+                f" {result.baseline:.0f} bytes (+{(result.ratio - 1) * 100:.0f}%,"
+                f" threshold {self.memory_threshold * 100:.0f}%)"
+            )
+
+    def save(self) -> None:
+        if not self.save_path or not (self.results or self.memory):
+            return
+        path = Path(self.save_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "machine": {
+                "python": sys.version.split()[0],
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                "calibration": self.calibration,
+            },
+            "commit": git_commit(),
+            "results": {name: asdict(result) for name, result in self.results.items()},
+            "memory": {name: asdict(result) for name, result in self.memory.items()},
+        }
+        path.write_text(json.dumps(data, indent=2))
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class Bench:
+    """Misura il tempo per chiamata di una funzione (mediana su più round)."""
+
+    def __init__(self, session: BenchSession, name: str) -> None:
+        self.session = session
+        self.name = name
+
+    def __call__(self, func: Callable, *args, rounds: int = ROUNDS, **kwargs):
+        result = func(*args, **kwargs)
+        started = perf_counter()
+        func(*args, **kwargs)
+        single = perf_counter() - started
+        iterations = max(1, int(MIN_ROUND_TIME / single)) if single else 1000
+        timings = []
+        for _ in range(rounds):
+            started = perf_counter()
+            for _ in range(iterations):
+                func(*args, **kwargs)
+            timings.append((perf_counter() - started) / iterations)
+        self.session.record(
+            BenchResult(
+                name=self.name,
+                median=statistics.median(timings),
+                min=min(timings),
+                max=max(timings),
+                rounds=rounds,
+                iterations=iterations,
+            )
+        )
+        return result
+
+
+class MemoryBench:
+    """Misura con tracemalloc la memoria allocata da una funzione che produce ``items`` oggetti."""
+
+    def __init__(self, session: BenchSession, name: str) -> None:
+        self.session = session
+        self.name = name
+
+    def __call__(self, func: Callable, *args, items: int, **kwargs):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            result = func(*args, **kwargs)
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.record(items=items, retained=current - before, peak=peak - before)
+        return result
+
+    def record(self, items: int, retained: int, peak: int, rss: int | None = None) -> None:
+        self.session.record_memory(
+            MemoryResult(name=self.name, items=items, retained=retained, peak=peak, rss=rss)
+        )
+
+
+@pytest.fixture(scope="session")
+def bench_session(request) -> BenchSession:
+    session = BenchSession(request.config)
+    request.config.stash[bench_session_key] = session
+    yield session
+    session.save()
+
+
+bench_session_key = pytest.StashKey[BenchSession]()
+
+
+@pytest.fixture
+def bench(request, bench_session) -> Bench:
+    return Bench(bench_session, request.node.nodeid.split("::", 1)[-1])
+
+
+@pytest.fixture
+def memory_bench(request, bench_session) -> MemoryBench:
+    return MemoryBench(bench_session, request.node.nodeid.split("::", 1)[-1])
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    session = config.stash.get(bench_session_key, None)
+    if session is None:
+        return
+    if session.results:
+        write_time_summary(terminalreporter, session)
+    if session.memory:
+        write_memory_summary(terminalreporter, session)
+
+
+def write_memory_summary(terminalreporter, session: BenchSession) -> None:
+    terminalreporter.section("memory")
+    width = max(len(name) for name in session.memory)
+    for name, result in session.memory.items():
+        line = (
+            f"{name:<{width}}  {result.per_item:10.0f} B/item  peak {result.peak / 2**20:8.2f} MiB"
+        )
+        if result.rss is not None:
+            line += f"  rss +{result.rss / 2**20:.2f} MiB"
+        if result.ratio is not None:
+            line += f"  {(result.ratio - 1) * 100:+6.1f}%"
+        terminalreporter.write_line(line)
+
+
+def write_time_summary(terminalreporter, session: BenchSession) -> None:
+    terminalreporter.section("benchmark")
+    width = max(len(name) for name in session.results)
+    for name, result in session.results.items():
+        line = f"{name:<{width}}  {result.median * 1000:10.3f} ms  (min {result.min * 1000:.3f})"
+        if result.ratio is not None:
+            line += f"  {(result.ratio - 1) * 100:+6.1f}%"
+        terminalreporter.write_line(line)
+
+
+@pytest.fixture(scope="session")
+def generator() -> TenantGenerator:
+    return TenantGenerator(seed=1, posts_per_community=2_000, users=2_000)
+
+
+@pytest.fixture(scope="session")
+def fake_server(generator):
+    with FakeInteractaServer(generator.dataset(), compress_responses=False) as server:
+        yield server
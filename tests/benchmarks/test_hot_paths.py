@@ -0,0 +1,178 @@
+import subprocess
+import sys
+
+import pytest
+from requests import Response
+
+from pynteracta.api import InteractaApi
+from pynteracta.core import prepare_data
+from pynteracta.enums import FieldFilterTypeEnum
+from pynteracta.parallel import Columns, ParallelValidator
+from pynteracta.schemas.models import (
+    BaseListPostsElement,
+    CustomFieldFilter,
+    ListSystemUsersElement,
+    PostDefinition,
+)
+from pynteracta.schemas.requests import (
+    CommunityPostFilters,
+    CreateCustomPostIn,
+    EditUserIn,
+    ListCommunityPostsFilteredIn,
+    ListCommunityPostsIn,
+    ListSystemUsersIn,
+)
+from pynteracta.schemas.responses import GetPostDefinitionOut, ListSystemUsersOut, PostsOut
+from pynteracta.search import SearchIndex
+from pynteracta.testing.generator import iter_pages
+from pynteracta.utils.models import UsersStats
+
+pytestmark = pytest.mark.benchmark
+
+PAGE_SIZES = [10, 100, 500]
+
+
+def make_response(payload: dict) -> Response:
+    from pydantic_core import to_json
+
+    response = Response()
+    response.status_code = 200
+    response._content = to_json(payload)
+    return response
+
+
+def validate(schema_out, response: Response):
+    # stessa sequenza di operazioni del decoratore interactapi
+    return schema_out.model_validate(response.json())
+
+
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+def test_validate_posts_page(bench, generator, page_size):
+    posts = (generator.post(1, index) for index in range(page_size))
+    response = make_response(next(iter_pages(posts, page_size, page_size)))
+    result = bench(validate, PostsOut, response)
+    assert len(result.items) == page_size
+
+
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+def test_validate_users_page(bench, generator, page_size):
+    users = (generator.user(index) for index in range(page_size))
+    response = make_response(next(iter_pages(users, page_size, page_size)))
+    result = bench(validate, ListSystemUsersOut, response)
+    assert len(result.items) == page_size
+
+
+def test_validate_post_definition(bench, generator):
+    response = make_response(generator.post_definition(1))
+    result = bench(validate, GetPostDefinitionOut, response)
+    assert result.field_definitions
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(ListCommunityPostsIn(page_size=100), id="list-posts"),
+        pytest.param(
+            ListCommunityPostsFilteredIn(
+                community_post_filters=CommunityPostFilters(
+                    title="manutenzione",
+                    current_workflow_status_ids=[11000, 11001],
+                    post_field_filters=[
+                        CustomFieldFilter(
+                            column_id=10007, type_id=FieldFilterTypeEnum.IN, parameters=[10012]
+                        )
+                    ],
+                )
+            ),
+            id="list-posts-filtered",
+        ),
+        pytest.param(
+            CreateCustomPostIn(
+                title="Nuova segnalazione",
+                description="descrizione " * 50,
+                custom_data={str(10_000 + index): index for index in range(14)},
+            ),
+            id="create-post",
+        ),
+        pytest.param(
+            EditUserIn(firstname="Mario", lastname="Rossi", contact_email="m.rossi@example.org"),
+            id="edit-user",
+        ),
+        pytest.param({"pageSize": 100, "calculateTotalItemsCount": True}, id="dict"),
+    ],
+)
+def test_prepare_data(bench, data):
+    assert bench(prepare_data, data)
+
+
+@pytest.fixture(scope="module")
+def api(fake_server):
+    api = InteractaApi(fake_server.settings())
+    api.login()
+    return api
+
+
+def test_list_all_posts(bench, api, generator):
+    result = bench(
+        lambda: api.list_all_posts(1, data=ListCommunityPostsIn(page_size=100)), rounds=3
+    )
+    assert len(result) == generator.posts_per_community
+
+
+def test_all_users(bench, api, generator):
+    result = bench(lambda: api.all_users(data=ListSystemUsersIn(page_size=100)), rounds=3)
+    assert len(result) == generator.users
+
+
+def test_all_users_process_pool(bench, api, generator):
+    with ParallelValidator() as validator:
+
+        def run():
+            pages = validator.iter_pages(
+                api.list_users, ListSystemUsersIn(page_size=100), transform=Columns(("id",))
+            )
+            return [user_id for page in pages for user_id in page["id"]]
+
+        result = bench(run, rounds=3)
+    assert len(result) == generator.users
+
+
+def test_users_stats(bench, generator):
+    users = [ListSystemUsersElement.model_validate(user) for user in generator.iter_users()]
+    stats = bench(UsersStats.create_by_user_list, users)
+    assert sum(stats.counts.values()) >= len(users)
+
+
+def test_post_definition_lookups(bench, generator):
+    definition = PostDefinition.model_validate(generator.post_definition(1))
+    labels = [field.label for field in definition.field_definitions]
+    ids = definition.custom_fields_ids
+
+    def lookups():
+        for label, field_id in zip(labels, ids, strict=True):
+            definition.get_field_by_label(label)
+            definition.get_field_by_id(field_id)
+        definition.get_enum_id(ids[6], "Alta")
+        definition.workflow_definition.get_state("Chiuso")
+
+    bench(lookups)
+
+
+@pytest.mark.parametrize("query", ["manutenzione", "manut* -caldaia", "guasto OR perdita"])
+def test_search_query(bench, generator, query):
+    index = SearchIndex([1])
+    for post in generator.iter_posts(1):
+        index.index_post(BaseListPostsElement.model_validate(post))
+    bench(index.search, query)
+
+
+def test_cli_startup(bench):
+    def run_help():
+        subprocess.run(
+            [sys.executable, "-c", "from pynteracta.cli.commands import app; app(['--help'])"],
+            capture_output=True,
+            check=True,
+            env={"PYTHONPATH": "./src", "COLUMNS": "100"},
+        )
+
+    bench(run_help, rounds=3)
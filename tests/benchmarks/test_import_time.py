@@ -0,0 +1,47 @@
+import json
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+ROUNDS = 5
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import pynteracta.api
+imported = time.perf_counter()
+if "--prewarm" in sys.argv:
+    from pynteracta.schemas.core import prewarm
+    prewarm()
+print(json.dumps({"import": imported - start, "total": time.perf_counter() - start}))
+"""
+
+
+def measure(*args: str) -> dict:
+    samples = []
+    for _ in range(ROUNDS):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"PYTHONPATH": "./src"},
+        )
+        samples.append(json.loads(result.stdout))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def test_import_api_deferred_vs_eager_schema_build():
+    deferred = measure()
+    # prewarm di tutti i modelli equivale alla costruzione eager degli schema (comportamento
+    # precedente a defer_build)
+    eager = measure("--prewarm")
+    print(  # noqa: T201
+        f"\nimport pynteracta.api: deferred {deferred['import'] * 1000:.1f} ms,"
+        f" eager {eager['total'] * 1000:.1f} ms"
+    )
+    assert deferred["import"] < eager["total"]
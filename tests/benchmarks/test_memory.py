@@ -0,0 +1,128 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pynteracta.schemas.models import BaseListPostsElement, ListSystemUsersElement, PostComment
+from pynteracta.schemas.responses import GetPostDefinitionOut
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+from pynteracta.utils.models import UsersStats, UsersStatsList
+
+pytestmark = pytest.mark.benchmark
+
+SCALES = [1_000, 5_000]
+
+# Le fetch paginate sono eseguite in un processo separato, così né il server (che gira nel
+# processo dei test) né le allocazioni precedenti falsano tracemalloc e il picco di RSS.
+PROBE = """
+import gc, json, os, resource, sys, tracemalloc
+from pynteracta.api import InteractaApi
+from pynteracta.schemas.requests import ListCommunityPostsIn, ListSystemUsersIn
+from pynteracta.settings import InteractaSettings
+
+base_url, kind, trace = sys.argv[1], sys.argv[2], sys.argv[3] == "trace"
+
+def reset_peak_rss():
+    # su linux il picco di RSS (VmHWM) può essere azzerato, altrimenti resta quello
+    # raggiunto durante gli import
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+def rss():
+    try:
+        with open("/proc/self/status") as status:
+            values = dict(line.split(":", 1) for line in status)
+        return int(values["VmRSS"].split()[0]) * 1024, int(values["VmHWM"].split()[0]) * 1024
+    except (OSError, KeyError):
+        # ru_maxrss è in KiB su linux e in byte su macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return 0, peak * (1 if sys.platform == "darwin" else 1024)
+
+api = InteractaApi(
+    InteractaSettings(base_url=base_url, auth_username="user", auth_password="password")
+)
+api.login()
+if kind == "posts":
+    fetch = lambda: api.list_all_posts(1, data=ListCommunityPostsIn(page_size=100))
+    api.list_posts(1, data=ListCommunityPostsIn(page_size=1))
+else:
+    fetch = lambda: api.all_users(data=ListSystemUsersIn(page_size=100))
+    api.list_users(data=ListSystemUsersIn(page_size=1))
+gc.collect()
+if trace:
+    tracemalloc.start()
+reset_peak_rss()
+rss_before = rss()[0]
+items = fetch()
+result = {"items": len(items)}
+if trace:
+    gc.collect()
+    result["retained"], result["peak"] = tracemalloc.get_traced_memory()
+else:
+    result["rss"] = max(rss()[1] - rss_before, 0)
+print(json.dumps(result))
+"""
+
+
+def run_probe(server: FakeInteractaServer, kind: str, trace: bool) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, server.base_url, kind, "trace" if trace else "rss"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": "./src"},
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize("kind", ["posts", "users"])
+@pytest.mark.parametrize("scale", SCALES)
+def test_paginated_fetch_memory(memory_bench, kind, scale):
+    generator = TenantGenerator(seed=1, posts_per_community=scale, users=scale)
+    with FakeInteractaServer(generator.dataset(), compress_responses=False) as server:
+        traced = run_probe(server, kind, trace=True)
+        rss = run_probe(server, kind, trace=False)
+    assert traced["items"] == scale
+    memory_bench.record(
+        items=scale, retained=traced["retained"], peak=traced["peak"], rss=rss["rss"]
+    )
+
+
+MODELS = {
+    "post": (BaseListPostsElement, lambda generator, index: generator.post(1, index)),
+    "user": (ListSystemUsersElement, lambda generator, index: generator.user(index)),
+    "comment": (
+        PostComment,
+        lambda generator, index: generator.comments(generator.post_id(1, index))[0],
+    ),
+}
+
+
+@pytest.mark.parametrize("model_name", MODELS)
+def test_model_footprint(memory_bench, model_name):
+    # byte per istanza validata, esclusi i dati json di partenza
+    model, factory = MODELS[model_name]
+    generator = TenantGenerator(seed=1, posts_per_community=2_000, users=2_000)
+    payloads = [factory(generator, index) for index in range(2_000)]
+    instances = memory_bench(
+        lambda: [model.model_validate(payload) for payload in payloads], items=len(payloads)
+    )
+    assert len(instances) == len(payloads)
+
+
+def test_post_definition_footprint(memory_bench):
+    payload = TenantGenerator(workflow_states=20).post_definition(1)
+    assert memory_bench(GetPostDefinitionOut.model_validate, payload, items=1)
+
+
+@pytest.mark.parametrize("stats_class", [UsersStats, UsersStatsList])
+@pytest.mark.parametrize("scale", SCALES)
+def test_users_stats_memory(memory_bench, stats_class, scale):
+    generator = TenantGenerator(seed=1, users=scale)
+    users = [ListSystemUsersElement.model_validate(user) for user in generator.iter_users()]
+    stats = memory_bench(stats_class.create_by_user_list, users, items=scale)
+    assert stats.counts["active"]
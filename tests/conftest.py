@@ -25,9 +25,37 @@ def mocked_responses():
 
 @pytest.fixture
 def settings():
-    return InteractaSettings(base_url="https://interacta.com")
+    return InteractaSettings(
+        base_url="https://interacta.com", auth_username="user", auth_password="password"
+    )
 
 
 @pytest.fixture
 def service_account_path():
     return Path("./tests/fake_service_account.json")
+
+
+def pytest_addoption(parser):
+    # opzioni dei benchmark (tests/benchmarks), registrate qui perché pytest legge
+    # pytest_addoption solo dai conftest caricati all'avvio
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--bench-save", metavar="PATH", help="salva i risultati dei benchmark in un file json"
+    )
+    group.addoption(
+        "--bench-compare",
+        metavar="PATH",
+        help="confronta i risultati con quelli salvati in un precedente --bench-save",
+    )
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.25,
+        help="rallentamento massimo ammesso rispetto a --bench-compare (default 0.25 = 25%%)",
+    )
+    group.addoption(
+        "--bench-memory-threshold",
+        type=float,
+        default=0.10,
+        help="aumento massimo di memoria ammesso rispetto a --bench-compare (default 0.10 = 10%%)",
+    )
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.breakers import CircuitBreaker, CircuitState
+from pynteracta.exceptions import CircuitOpenError, InteractaResponseError
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+from pynteracta.transport import RequestsTransport
+
+USERS_ENDPOINT = "POST /admin/data/users"
+
+
+def test_breaker_states():
+    breaker = CircuitBreaker("GET /x", error_rate=0.5, min_requests=4, open_seconds=0.05)
+    for success in (True, False, True):
+        breaker.acquire()
+        breaker.record(success)
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.acquire()
+    assert exc_info.value.endpoint == "GET /x"
+    assert 0 < exc_info.value.retry_after <= 0.05
+
+    time.sleep(0.06)
+    breaker.acquire()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # una sola richiesta di prova alla volta
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    time.sleep(0.06)
+    breaker.acquire()
+    breaker.record(True)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.as_dict()["times_opened"] == 2
+    assert breaker.as_dict()["rejected"] == 2
+
+
+def test_api_fails_fast_when_open():
+    generator = TenantGenerator(seed=10, posts_per_community=5, users=20)
+    with FakeInteractaServer(generator.dataset()) as server:
+        settings = server.settings(
+            circuit_breaker=True,
+            breaker_min_requests=4,
+            breaker_window=10,
+            breaker_open_seconds=0.2,
+        )
+        api = InteractaApi(settings)
+        api.login()
+        server.inject_errors(503, count=4, path="/admin/data/users")
+        for _ in range(4):
+            with pytest.raises(InteractaResponseError):
+                api.list_users()
+        sent = server.requests_count[USERS_ENDPOINT]
+        with pytest.raises(CircuitOpenError):
+            api.list_users()
+        assert server.requests_count[USERS_ENDPOINT] == sent
+        # gli altri endpoint non sono coinvolti
+        assert api.list_posts(1).items
+        states = api.circuit_breakers.as_dict()
+        assert states[USERS_ENDPOINT]["state"] == "open"
+        assert states["POST /communication/posts/data/community-list/{community_id}"] == {
+            "state": "closed",
+            "requests": 1,
+            "failures": 0,
+            "rejected": 0,
+            "times_opened": 0,
+            "retry_after": None,
+        }
+
+        time.sleep(0.2)
+        assert api.list_users().items
+        assert api.circuit_breakers.states()[USERS_ENDPOINT] == CircuitState.CLOSED
+
+
+class SlowTransport(RequestsTransport):
+    def send(self, method, url, **kwargs):
+        time.sleep(0.1)
+        return super().send(method, url, **kwargs)
+
+
+def test_coalesced_requests_recorded_once():
+    generator = TenantGenerator(seed=10, posts_per_community=5, users=20)
+    with FakeInteractaServer(generator.dataset()) as server:
+        settings = server.settings(circuit_breaker=True, coalesce_requests=True)
+        api = InteractaApi(settings, transport=SlowTransport())
+        api.login()
+        server.inject_errors(503, count=1, path="/admin/manage/users/1/edit")
+        with ThreadPoolExecutor(5) as executor:
+            futures = [executor.submit(api.get_user_data_for_edit, 1) for _ in range(5)]
+            for future in futures:
+                with pytest.raises(InteractaResponseError):
+                    future.result()
+        breaker = api.circuit_breakers.as_dict()["GET /admin/manage/users/{user_id}/edit"]
+        # una sola richiesta inviata, un solo esito registrato
+        assert (breaker["requests"], breaker["failures"]) == (1, 1)
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+from requests import Response
+
+from pynteracta.api import InteractaApi
+from pynteracta.cache import ENTRY_OVERHEAD, ResponseCache
+from pynteracta.deadlines import deadline
+from pynteracta.exceptions import DeadlineExceeded
+from pynteracta.instrumentation import MetricsAggregator
+from pynteracta.schemas.requests import EditCustomPostIn, EditUserIn
+from pynteracta.testing import FakeInteractaServer, build_dataset
+
+
+def make_response(size: int) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = b"x" * size
+    return response
+
+
+def test_lru_eviction_by_size():
+    cache = ResponseCache(max_bytes=3 * (100 + ENTRY_OVERHEAD))
+    for key in "abc":
+        cache.set(key, make_response(100), ttl=60)
+    assert cache.get("a") is not None
+    cache.set("d", make_response(100), ttl=60)
+    assert cache.get("b") is None
+    assert [key for key in "acd" if cache.get(key)] == ["a", "c", "d"]
+    assert cache.size == 3 * (100 + ENTRY_OVERHEAD)
+    # le risposte più grandi dell'intera cache non vengono salvate
+    cache.set("e", make_response(10_000), ttl=60)
+    assert cache.as_dict() == {
+        "entries": 3,
+        "size": cache.size,
+        "hits": 4,
+        "misses": 1,
+        "evictions": 1,
+        "invalidations": 0,
+    }
+
+
+def test_expiration_and_invalidation():
+    cache = ResponseCache(max_bytes=2**20)
+    cache.set("short", make_response(10), ttl=0.01)
+    cache.set("post", make_response(10), ttl=60, tag=("post", "1"))
+    cache.set("other", make_response(10), ttl=60, tag=("post", "2"))
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.invalidate(("post", "1")) == 1
+    assert cache.get("post") is None
+    assert cache.get("other") is not None
+    assert len(cache) == 1
+
+
+@pytest.fixture
+def server():
+    with FakeInteractaServer(build_dataset(posts_per_community=5)) as server:
+        yield server
+
+
+def get_count(server, endpoint: str) -> int:
+    return server.requests_count[f"GET {endpoint}"]
+
+
+def test_api_cache(server):
+    api = InteractaApi(
+        server.settings(cache_ttl={"get_post_detail": 60, "get_user_data_for_edit": 60})
+    )
+    metrics = api.add_hook(MetricsAggregator())
+    api.login()
+    post_id = api.list_posts(1).items[0].id
+    first = api.get_post_detail(post_id)
+    assert api.get_post_detail(post_id).model_dump() == first.model_dump()
+    assert get_count(server, "/communication/posts/data/post-detail-by-id/{post_id}") == 1
+    api.get_post_definition_detail(1)
+    api.get_post_definition_detail(1)
+    assert (
+        get_count(server, "/communication/settings/communities/{community_id}/post-definition") == 2
+    )
+
+    occ_token = api.get_post_data_for_edit(post_id).occ_token
+    api.edit_post(post_id, occ_token, EditCustomPostIn(title="Titolo modificato"))
+    assert api.get_post_detail(post_id).title == "Titolo modificato"
+    assert get_count(server, "/communication/posts/data/post-detail-by-id/{post_id}") == 2
+
+    api.get_user_data_for_edit(1)
+    api.edit_user(1, EditUserIn(firstname="Mario"))
+    assert api.get_user_data_for_edit(1).firstname == "Mario"
+    assert get_count(server, "/admin/manage/users/{user_id}/edit") == 2
+
+    summary = metrics.summary()
+    assert summary["GET /communication/posts/data/post-detail-by-id/{post_id}"]["cached"] == 1
+    assert api.cache.as_dict()["hits"] == 1
+    assert api.cache.as_dict()["invalidations"] == 2
+
+
+def test_cache_invalidated_by_failed_writes_and_comment_deletion(server):
+    api = InteractaApi(server.settings(cache_ttl={"get_post_detail": 60, "list_comment_post": 60}))
+    api.login()
+    post_id = api.list_posts(1).items[0].id
+    api.get_post_detail(post_id)
+    # la scrittura non viene inviata perché la deadline è già scaduta
+    with pytest.raises(DeadlineExceeded), deadline(0.001):
+        time.sleep(0.01)
+        api.edit_post(post_id, 1, EditCustomPostIn(title="Titolo"))
+    api.get_post_detail(post_id)
+    assert get_count(server, "/communication/posts/data/post-detail-by-id/{post_id}") == 2
+
+    comments = api.list_comment_post(post_id)
+    api.delete_comment_post(comments.items[0].id)
+    assert len(api.list_comment_post(post_id).items) == len(comments.items) - 1
+
+
+def test_cache_key_includes_authorization(server):
+    settings = server.settings(cache_ttl={"get_post_detail": 60})
+    first, second = InteractaApi(settings), InteractaApi(settings)
+    second.cache = first.cache
+    first.login()
+    second.login()
+    post_id = first.list_posts(1).items[0].id
+    first.get_post_detail(post_id)
+    second.get_post_detail(post_id)
+    assert get_count(server, "/communication/posts/data/post-detail-by-id/{post_id}") == 2
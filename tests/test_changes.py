@@ -0,0 +1,142 @@
+from pynteracta.api import InteractaApi
+from pynteracta.changes import (
+    ChangeDetector,
+    EditState,
+    canonical_custom_data,
+    content_hash,
+    matches,
+)
+from pynteracta.schemas.requests import (
+    DataUserInfoIn,
+    EditCustomPostIn,
+    EditGroupIn,
+    EditUserIn,
+    UserInfoIn,
+)
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+EDIT_POST = "PUT /communication/posts/manage/edit-post/{post_id}/{occ_token}"
+EDIT_USER = "PUT /admin/manage/users/{user_id}"
+EDIT_GROUP = "PUT /admin/manage/groups/{group_id}"
+POST_FOR_EDIT = "GET /communication/posts/manage/post-data-for-edit/{post_id}"
+
+
+def test_matches():
+    assert matches({"id": 3}, {"id": 3, "firstname": "Mario"})
+    assert not matches({"id": 3}, None)
+    assert matches({}, None)
+    assert matches([{"id": 1}], [{"id": 1, "name": "a"}])
+    assert not matches([1, 2], [1, 2, 3])
+
+
+def test_canonical_custom_data_and_hash():
+    assert canonical_custom_data({10001: "a", "10002": None, 10008: [3, 1]}) == {
+        "10001": "a",
+        "10008": [1, 3],
+    }
+    first = EditCustomPostIn(title="Titolo", custom_data={10008: [3, 1], 10001: "a"})
+    second = EditCustomPostIn(title="Titolo", custom_data={"10001": "a", "10008": [1, 3]})
+    assert content_hash(first) == content_hash(second)
+    assert content_hash(first) != content_hash(EditCustomPostIn(title="Altro"))
+    assert content_hash(EditGroupIn(name="g", occ_token=1)) == content_hash(EditGroupIn(name="g"))
+
+
+def test_skip_unchanged_post():
+    generator = TenantGenerator(seed=3, posts_per_community=5)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        post_id = generator.post_id(1, 0)
+        content = api.get_post_data_for_edit(post_id).content_data
+        detector = ChangeDetector(api)
+
+        same = EditCustomPostIn.from_text(
+            content.title,
+            content.description,
+            custom_data=dict(reversed(list((content.custom_data or {}).items()))),
+        )
+        assert not detector.edit_post(post_id, same)
+        assert server.requests_count[EDIT_POST] == 0
+
+        changed = EditCustomPostIn.from_text(content.title, "Nuova descrizione")
+        assert detector.edit_post(post_id, changed)
+        assert api.get_post_data_for_edit(post_id).content_data.description == "Nuova descrizione"
+        # la stessa modifica, ripetuta, non viene più inviata
+        assert not detector.edit_post(post_id, changed)
+        assert not detector.edit_post(post_id, EditCustomPostIn(title=content.title))
+        assert server.requests_count[EDIT_POST] == 1
+        assert detector.stats.checked == 4
+        assert detector.stats.avoided == 3
+
+
+def test_post_attachments_always_written():
+    generator = TenantGenerator(seed=3, posts_per_community=2)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        post_id = generator.post_id(1, 0)
+        title = api.get_post_data_for_edit(post_id).content_data.title
+        detector = ChangeDetector(api)
+        assert not detector.edit_post(post_id, EditCustomPostIn(title=title, add_attachments=[]))
+        assert detector.edit_post(post_id, EditCustomPostIn(title=title, remove_attachment_ids=[1]))
+        assert server.requests_count[EDIT_POST] == 1
+
+
+def test_skip_unchanged_user():
+    generator = TenantGenerator(seed=3, users=10)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        detector = ChangeDetector(api)
+        current = api.get_user_data_for_edit(4)
+
+        same = EditUserIn(firstname=current.firstname, lastname=current.lastname)
+        assert not detector.edit_user(4, same)
+        manager = EditUserIn(
+            firstname=current.firstname,
+            user_info=UserInfoIn(manager=DataUserInfoIn(id=2)),
+        )
+        assert detector.edit_user(4, manager)
+        assert api.get_user_data_for_edit(4).occ_token == current.occ_token + 1
+        assert not detector.edit_user(4, manager.model_copy())
+        assert server.requests_count[EDIT_USER] == 1
+        assert (detector.stats.written, detector.stats.skipped) == (1, 2)
+
+
+def test_skip_unchanged_group():
+    generator = TenantGenerator(seed=3, users=10)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        detector = ChangeDetector(api)
+        current = api.get_group_data_for_edit(1)
+        member_ids = [member.id for member in current.members]
+
+        same = EditGroupIn(name=current.name, member_ids=list(reversed(member_ids)))
+        assert not detector.edit_group(1, same)
+        assert detector.edit_group(1, EditGroupIn(name=current.name, member_ids=member_ids[:1]))
+        assert server.requests_count[EDIT_GROUP] == 1
+
+
+def test_skip_by_hash(tmp_path):
+    generator = TenantGenerator(seed=3, posts_per_community=5)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        post_ids = [generator.post_id(1, index) for index in range(5)]
+        edits = {
+            post_id: EditCustomPostIn.from_text(f"Titolo {post_id}", "x") for post_id in post_ids
+        }
+        state_path = tmp_path / "edits.json"
+
+        detector = ChangeDetector(api, state=EditState())
+        assert all(detector.edit_post(post_id, data) for post_id, data in edits.items())
+        detector.state.save(state_path)
+
+        server.requests_count.clear()
+        detector = ChangeDetector(api, state=EditState.load(state_path))
+        assert not any(detector.edit_post(post_id, data) for post_id, data in edits.items())
+        # nessuna lettura e nessuna scrittura
+        assert server.requests_count[POST_FOR_EDIT] == 0
+        assert server.requests_count[EDIT_POST] == 0
+        assert detector.stats.skipped_by_hash == 5
@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# budget (secondi) per l'import dell'entry point della cli, esclusa la startup dell'interprete
+CLI_IMPORT_TIME_BUDGET = 0.3
+
+HEAVY_MODULES = [
+    "devtools",
+    "jwt",
+    "cryptography",
+    "pydantic_settings_toml",
+    "pynteracta.api",
+    "pynteracta.schemas.models",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from pynteracta.cli.commands import app
+elapsed = time.perf_counter() - start
+if len(sys.argv) > 1:
+    from typer.testing import CliRunner
+    CliRunner().invoke(app, sys.argv[1:])
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_probe(*args: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": "./src"},
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("args", [(), ("--help",), ("users", "--help")])
+def test_cli_startup_does_not_import_heavy_modules(args):
+    probe = run_probe(*args)
+    loaded = [module for module in HEAVY_MODULES if module in probe["modules"]]
+    assert loaded == []
+
+
+def test_cli_import_time_budget():
+    elapsed = min(run_probe()["elapsed"] for _ in range(3))
+    assert elapsed < CLI_IMPORT_TIME_BUDGET
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.coalescing import AsyncSingleFlight, SingleFlight
+from pynteracta.deadlines import deadline
+from pynteracta.exceptions import DeadlineExceeded
+from pynteracta.instrumentation import MetricsAggregator
+from pynteracta.testing import FakeInteractaServer, build_dataset
+
+WORKERS = 8
+
+
+def test_single_flight_shares_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(WORKERS) as executor:
+        futures = [executor.submit(flight.do, "key", fetch) for _ in range(WORKERS)]
+        while flight.calls < WORKERS:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(executions) == 1
+    assert len({id(result) for result, _ in results}) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * (WORKERS - 1)
+    assert flight.as_dict() == {"calls": WORKERS, "saved": WORKERS - 1}
+    assert flight.in_flight == 0
+    # terminata l'esecuzione la chiave non è più condivisa
+    assert flight.do("key", lambda: 1) == (1, False)
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as executor:
+        futures = [executor.submit(flight.do, "key", fail) for _ in range(2)]
+        while flight.calls < 2:
+            threading.Event().wait(0.01)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+    assert flight.saved == 1
+
+
+def test_single_flight_waiter_respects_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        return "ok"
+
+    def wait_with_deadline():
+        with deadline(0.05):
+            return flight.do("key", fetch)
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, "key", fetch)
+        while flight.in_flight == 0:
+            threading.Event().wait(0.01)
+        waiter = executor.submit(wait_with_deadline)
+        with pytest.raises(DeadlineExceeded):
+            waiter.result(timeout=1)
+        release.set()
+        assert leader.result() == ("ok", False)
+
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    executions = []
+
+    async def fetch(value):
+        executions.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fetch, 1) for _ in range(WORKERS)))
+
+    results = asyncio.run(main())
+    assert executions == [1]
+    assert [result for result, _ in results] == [1] * WORKERS
+    assert flight.saved == WORKERS - 1
+    assert flight.in_flight == 0
+
+
+@pytest.mark.parametrize("coalesce", [True, False])
+def test_api_coalesces_concurrent_gets(coalesce):
+    with FakeInteractaServer(build_dataset(posts_per_community=5), latency=0.2) as server:
+        api = InteractaApi(server.settings(coalesce_requests=coalesce))
+        metrics = api.add_hook(MetricsAggregator())
+        api.login()
+        server.requests_count.clear()
+        with ThreadPoolExecutor(WORKERS) as executor:
+            definitions = list(
+                executor.map(lambda _: api.get_post_definition_detail(1), range(WORKERS))
+            )
+        sent = sum(server.requests_count.values())
+    assert len({definition.community_id for definition in definitions}) == 1
+    summary = metrics.summary()[
+        "GET /communication/settings/communities/{community_id}/post-definition"
+    ]
+    assert summary["calls"] == WORKERS
+    if coalesce:
+        assert sent < WORKERS
+        assert summary["coalesced"] == api.single_flight.saved == WORKERS - sent
+    else:
+        assert sent == WORKERS
+        assert summary["coalesced"] == 0
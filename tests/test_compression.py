@@ -0,0 +1,65 @@
+import gzip
+import json
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.compression import ACCEPT_ENCODING_HEADER
+from pynteracta.schemas.requests import CreateCustomPostIn
+
+
+@pytest.fixture
+def api(settings):
+    api = InteractaApi(settings=settings)
+    api.access_token = "token"
+    return api
+
+
+def test_call_api_negotiates_compression_and_counts_bytes(api, mocked_responses):
+    payload = {"items": [{"id": i, "title": "post " * 20} for i in range(50)]}
+    body = json.dumps(payload).encode()
+    compressed = gzip.compress(body)
+    mocked_responses.post(
+        f"{api.settings.api_url}/communication/posts/data/community-list/1",
+        body=compressed,
+        headers={"content-encoding": "gzip", "content-length": str(len(compressed))},
+    )
+
+    result = api.list_posts(community_id=1)
+
+    assert len(result.items) == 50
+    request = mocked_responses.calls[0].request
+    assert request.headers["accept-encoding"] == ACCEPT_ENCODING_HEADER
+    assert "authorization" in request.headers
+
+    transfer = api.transfer_stats.endpoints[
+        ("POST", "/communication/posts/data/community-list/{community_id}")
+    ]
+    assert transfer.calls == 1
+    assert transfer.response_bytes == len(body)
+    assert transfer.response_wire_bytes == len(compressed)
+    assert transfer.compressed_responses == 1
+    assert transfer.response_ratio < 1
+    assert api.transfer_stats.totals.response_bytes == len(body)
+
+
+def test_call_api_compresses_large_request_bodies(api, mocked_responses):
+    api.settings.request_compression_min_size = 300
+    url = f"{api.settings.api_url}/communication/posts/manage/create-post/1"
+    mocked_responses.post(url, json={"postId": 1})
+    mocked_responses.post(url, json={"postId": 2})
+
+    api.create_post(1, data=CreateCustomPostIn(title="x" * 500))
+    api.create_post(1, data=CreateCustomPostIn(title="x"))
+
+    large, small = (call.request for call in mocked_responses.calls)
+    assert large.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(large.body))["title"] == "x" * 500
+    assert "content-encoding" not in small.headers
+    assert json.loads(small.body)["title"] == "x"
+
+    transfer = api.transfer_stats.endpoints[
+        ("POST", "/communication/posts/manage/create-post/{community_id}")
+    ]
+    assert transfer.compressed_requests == 1
+    assert transfer.request_wire_bytes < transfer.request_bytes
@@ -0,0 +1,58 @@
+import json
+
+from pydantic import BaseModel
+
+from pynteracta.core import EMPTY_BODY, get_model_serializer, prepare_data
+from pynteracta.schemas.requests import (
+    CommunityPostFilters,
+    CreateCustomPostIn,
+    ListCommunityPostsFilteredIn,
+    ListSystemUsersIn,
+)
+
+
+class PlainModel(BaseModel):
+    some_field: int = 1
+
+
+def test_prepare_data_empty_body():
+    assert prepare_data() is EMPTY_BODY
+    assert prepare_data({}) is EMPTY_BODY
+
+
+def test_prepare_data_dict_returns_bytes():
+    data = prepare_data({"title": "àèì", "ids": [1, 2]})
+    assert isinstance(data, bytes)
+    assert json.loads(data) == {"title": "àèì", "ids": [1, 2]}
+
+
+def test_prepare_data_interacta_model_by_alias():
+    data = json.loads(prepare_data(CreateCustomPostIn(title="titolo", custom_data={"1": 2})))
+    assert data["title"] == "titolo"
+    assert data["customData"] == {"1": 2}
+    # i modelli di creazione/modifica mantengono i campi a None
+    assert "description" in data
+    assert data["description"] is None
+
+
+def test_prepare_data_plain_model_without_alias():
+    assert json.loads(prepare_data(PlainModel())) == {"some_field": 1}
+
+
+def test_prepare_data_filters_exclude_none():
+    data = json.loads(prepare_data(ListSystemUsersIn(full_text_filter="mario")))
+    assert data == {"pageSize": 15, "calculateTotalItemsCount": True, "fullTextFilter": "mario"}
+
+    data = json.loads(prepare_data(ListSystemUsersIn(login_provider_filter=[])))
+    assert data["loginProviderFilter"] == []
+
+    search = ListCommunityPostsFilteredIn(
+        community_post_filters=CommunityPostFilters(title="test", hashtag_ids=[3])
+    )
+    data = json.loads(prepare_data(search))
+    assert data["communityPostFilters"] == {"title": "test", "hashtagIds": [3]}
+    assert "pageToken" not in data
+
+
+def test_get_model_serializer_is_cached():
+    assert get_model_serializer(ListSystemUsersIn) is get_model_serializer(ListSystemUsersIn)
@@ -0,0 +1,125 @@
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.custom_data import CustomDataCodec
+from pynteracta.enums import FieldTypeEnum
+from pynteracta.schemas.models import CatalogEntry, EnumValue, Link
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+
+@pytest.fixture
+def api():
+    generator = TenantGenerator(seed=5, posts_per_community=30)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        yield api
+
+
+def test_decode_posts_page(api):
+    codec = api.get_custom_data_codec(1)
+    assert len(codec) == 15
+    posts = api.list_posts(1).items
+    decoded = codec.decode_posts(posts)
+    assert set(decoded) == {post.id for post in posts}
+    post = posts[0]
+    values = decoded[post.id]
+    raw = post.custom_data
+    assert values[10001] == raw["10001"]
+    assert values[10003] == Decimal(str(raw["10003"]))
+    assert isinstance(values[10004], date)
+    assert isinstance(values[10007], EnumValue)
+    assert values[10007].label in {"Bassa", "Media", "Alta"}
+    assert all(isinstance(value, EnumValue) for value in values[10008])
+    assert isinstance(values[10010], bool)
+    # tutti i campi sono valorizzati, compresi l'enum gerarchico e il catalogo
+    assert set(raw) == set(codec.fields)
+    assert isinstance(values[10012], EnumValue)
+    assert all(isinstance(value, CatalogEntry) for value in values[10014])
+    assert codec.encode(values) == raw
+
+    by_label = codec.decode(raw, by_label=True)
+    assert by_label["Priorita"] == values[10007]
+
+
+def test_encode_values(api):
+    codec = api.get_custom_data_codec(1)
+    catalog_entry = codec.field("Fornitore").choices
+    entry = next(iter(catalog_entry.values()))
+    assert isinstance(entry, CatalogEntry)
+    encoded = codec.encode(
+        {
+            "Priorita": "Alta",
+            10008: ["Verde", 10020],
+            "10003": Decimal("12.50"),
+            "Scadenza": date(2024, 3, 1),
+            "Appuntamento": datetime(2024, 3, 1, 10, 30, tzinfo=UTC),
+            "Collegamento": Link(label="Sito", url="https://example.com"),
+            "Fornitore": [entry],
+            "Area": None,
+            99999: "invariato",
+        }
+    )
+    assert encoded == {
+        "10007": 10012,
+        "10008": [10021, 10020],
+        "10003": 12.5,
+        "10004": 1709251200000,
+        "10005": 1709289000000,
+        "10013": {"label": "Sito", "url": "https://example.com"},
+        "10014": [entry.id],
+        "10012": None,
+        "99999": "invariato",
+    }
+    assert codec.decode(encoded)[10014] == [entry]
+    with pytest.raises(ValueError):
+        codec.encode({"Priorita": "Urgentissima"})
+
+
+def test_hierarchical_path(api):
+    definition = api.get_post_definition_detail(1)
+    codec = CustomDataCodec.from_post_definition(definition)
+    assert [value.label for value in codec.field("Area").path(10043)] == ["Nord", "Nord-Ovest"]
+    # senza cataloghi le entry restano id
+    assert codec.decode({"10014": [5]}) == {10014: [5]}
+
+
+def test_screen_data_codec(api):
+    codec = api.get_screen_data_codec(1)
+    assert codec.encode({"Esito": "Concluso"}) == {"13001": "Concluso"}
+    assert codec.decode_many([{"13001": "Concluso"}, None]) == [{13001: "Concluso"}, {}]
+
+
+def test_screen_data_codec_catalogs():
+    generator = TenantGenerator(seed=5, posts_per_community=5, catalog_entries=1_200)
+    dataset = generator.dataset()
+    # campo di una schermata con un catalogo non usato dai campi del post
+    dataset.catalogs[7] = {
+        "id": 7,
+        "name": "esiti",
+        "paged": False,
+        "entries": [{"id": 71, "catalogId": 7, "label": "Risolto"}],
+    }
+    workflow = dataset.post_definitions[1]["workflowDefinition"]
+    field = {
+        "id": 13002,
+        "label": "Esito catalogo",
+        "type": int(FieldTypeEnum.GENERIC_ENTITY_LIST),
+        "metadata": {"catalogId": 7},
+    }
+    next(item for item in workflow["transitions"] if "screen" in item)["screen"][
+        "fieldMetadatas"
+    ].append(field)
+    with FakeInteractaServer(dataset) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        codec = api.get_screen_data_codec(1)
+        assert codec.encode({"Esito catalogo": ["Risolto"]}) == {"13002": [71]}
+
+        # le entry del catalogo paginato sono lette tutte, non solo la prima pagina
+        codec = api.get_custom_data_codec(1)
+        entry = generator.catalog_entry(generator.catalog_id(1), 1_199)
+        assert codec.decode({"10014": [entry["id"]]})[10014][0].label == entry["label"]
@@ -0,0 +1,77 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from pynteracta.api import InteractaApi
+from pynteracta.deadlines import bounded_timeout, current_deadline, deadline, endpoint_class
+from pynteracta.exceptions import DeadlineExceeded
+from pynteracta.instrumentation import InstrumentationHook
+from pynteracta.schemas.requests import ListCommunityPostsIn
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+from pynteracta.urls import LOGIN_CREDENTIAL
+
+
+class RequestCounter(InstrumentationHook):
+    def __init__(self):
+        self.calls = 0
+
+    def before_request(self, call):
+        self.calls += 1
+
+
+def test_endpoint_class_and_bounded_timeout():
+    assert endpoint_class(LOGIN_CREDENTIAL) == "auth"
+    assert endpoint_class("/admin/data/users") == "admin"
+    assert endpoint_class("/communication/posts/data/community-list/1") == "communication"
+    assert bounded_timeout((5.0, 60.0), 2.0) == (2.0, 2.0)
+    assert bounded_timeout((5.0, 60.0), 10.0) == (5.0, 10.0)
+    assert bounded_timeout(None, 3.0) == 3.0
+    assert bounded_timeout(7.0, None) == 7.0
+
+
+def test_nested_deadlines_keep_the_nearest():
+    with deadline(0.5) as outer:
+        with deadline(10) as inner:
+            assert inner is outer
+        with deadline(0.1) as inner:
+            assert current_deadline.get() is inner
+        assert current_deadline.get() is outer
+    assert current_deadline.get() is None
+
+
+def test_endpoint_timeouts():
+    generator = TenantGenerator(seed=8, posts_per_community=5)
+    with FakeInteractaServer(generator.dataset(), latency=0.3) as server:
+        settings = server.settings()
+        settings.timeouts = {**settings.timeouts, "communication": (1.0, 0.05)}
+        api = InteractaApi(settings)
+        api.login()
+        started = time.perf_counter()
+        with pytest.raises(requests.Timeout):
+            api.list_posts(1)
+        assert time.perf_counter() - started < 0.3
+
+
+def test_deadline_bounds_pagination():
+    generator = TenantGenerator(seed=8, posts_per_community=50)
+    with FakeInteractaServer(generator.dataset(), latency=0.05) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        recorder = api.add_hook(RequestCounter())
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded), deadline(0.22):
+            api.list_all_posts(1, data=ListCommunityPostsIn(page_size=5))
+        assert time.perf_counter() - started < 0.35
+        # la richiesta in corso alla scadenza viene interrotta, le successive non partono
+        assert recorder.calls < 10
+
+        # la deadline si propaga ai thread avviati con una copia del contesto
+        with deadline(0.01), ThreadPoolExecutor(1) as executor:
+            time.sleep(0.02)
+            future = executor.submit(contextvars.copy_context().run, api.list_posts, 1)
+            with pytest.raises(DeadlineExceeded):
+                future.result()
+        assert len(api.list_all_posts(1)) == 50
@@ -0,0 +1,97 @@
+import json
+
+from pynteracta import delta
+from pynteracta.api import InteractaApi
+from pynteracta.schemas.requests import (
+    CreateCustomPostIn,
+    CreatePostCommentIn,
+    EditCustomPostIn,
+)
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+DOCUMENT = [
+    {"insert": "Titolo"},
+    {"insert": "\n", "attributes": {"header": 2}},
+    {"insert": "Testo "},
+    {"insert": "grassetto", "attributes": {"bold": True}},
+    {"insert": " e "},
+    {"insert": "link", "attributes": {"link": "https://example.com?a=1&b=2"}},
+    {"insert": "\n\n"},
+    {"insert": "uno"},
+    {"insert": "\n", "attributes": {"list": "bullet"}},
+    {"insert": "due < tre"},
+    {"insert": "\n", "attributes": {"list": "bullet"}},
+    {"insert": {"image": "https://example.com/image.png"}},
+    {"insert": "fine\n"},
+]
+
+
+def test_delta_to_text_and_html():
+    assert delta.delta_to_text(DOCUMENT) == "Titolo\nTesto grassetto e link\n\nuno\ndue < tre\nfine"
+    assert delta.delta_to_html(json.dumps(DOCUMENT)) == (
+        "<h2>Titolo</h2><p>Testo <strong>grassetto</strong> e "
+        '<a href="https://example.com?a=1&amp;b=2">link</a></p><p><br></p>'
+        "<ul><li>uno</li><li>due &lt; tre</li></ul><p>fine</p>"
+    )
+    assert delta.delta_to_text({"ops": [{"insert": "Ciao\n"}]}) == "Ciao"
+    assert delta.delta_to_text(None) == ""
+
+
+def test_html_roundtrip():
+    document = [op for op in DOCUMENT if isinstance(op["insert"], str)]
+    html = delta.delta_to_html(document)
+    assert delta.parse_delta(delta.html_to_delta(html)) == tuple(delta.normalize_ops(document))
+    assert json.loads(delta.html_to_delta("<ol><li><em>a</em></li></ol>testo")) == [
+        {"insert": "a", "attributes": {"italic": True}},
+        {"insert": "\n", "attributes": {"list": "ordered"}},
+        {"insert": "testo\n"},
+    ]
+
+
+def test_text_to_delta_and_concat():
+    assert json.loads(delta.text_to_delta("Ciao")) == [{"insert": "Ciao\n"}]
+    assert json.loads(delta.text_to_delta("")) == [{"insert": "\n"}]
+    header = delta.html_to_delta("<h1>Segnalazione</h1>")
+    body = delta.text_to_delta("Lampione guasto")
+    assert json.loads(delta.concat_deltas(header, body)) == [
+        {"insert": "Segnalazione"},
+        {"insert": "\n", "attributes": {"header": 1}},
+        {"insert": "Lampione guasto\n"},
+    ]
+
+
+def test_from_text_without_text():
+    post = EditCustomPostIn.from_text("Titolo", None)
+    assert "description" not in post.model_fields_set
+    assert post.description is None
+    assert EditCustomPostIn.from_html("Titolo", None).description is None
+    assert json.loads(CreateCustomPostIn.from_text("Titolo", "").description) == [{"insert": "\n"}]
+    assert CreatePostCommentIn.from_text(None).comment is None
+    assert CreatePostCommentIn.from_html(None).comment is None
+
+
+def test_conversions_are_memoized():
+    delta.clear_caches()
+    for _ in range(100):
+        delta.text_to_delta("Descrizione standard")
+        delta.delta_to_html('[{"insert":"Descrizione standard\\n"}]')
+    assert delta._text_to_delta.cache_info().misses == 1
+    assert delta._text_to_delta.cache_info().hits == 99
+    assert delta._delta_to_html.cache_info().misses == 1
+
+
+def test_models_integration():
+    generator = TenantGenerator(seed=3, posts_per_community=5)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        created = api.create_post(
+            1, CreateCustomPostIn.from_html("Nuovo", "<p>Una <strong>descrizione</strong></p>")
+        )
+        post = api.get_post_detail(created.post_id)
+        assert post.description_plain_text == "Una descrizione"
+        assert post.description_html == "<p>Una <strong>descrizione</strong></p>"
+
+        response = api.create_comment_post(post.id, CreatePostCommentIn.from_text("Ok, grazie"))
+        assert response.comment.comment_plain_text == "Ok, grazie"
+        assert response.comment.comment_html == "<p>Ok, grazie</p>"
@@ -0,0 +1,65 @@
+import json
+import time
+
+from pynteracta.api import InteractaApi
+from pynteracta.exporters import CommentsExporter, ExportState
+from pynteracta.schemas.requests import CreatePostCommentIn
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+COMMENTS_ENDPOINT = "POST /communication/posts/data/comments-list/{post_id}"
+
+
+def test_export_comments(tmp_path):
+    generator = TenantGenerator(seed=2, posts_per_community=40, comments_per_post=5)
+    with FakeInteractaServer(generator.dataset(), latency=0.02) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        state_path = tmp_path / "state.json"
+
+        exporter = CommentsExporter(api, max_workers=8, page_size=2, state=ExportState())
+        started = time.perf_counter()
+        exported = list(exporter.export_community(1))
+        elapsed = time.perf_counter() - started
+        exporter.state.save(state_path)
+        assert len(exported) == 40 * 5
+        assert exporter.stats.posts == 40
+        post_id = generator.post_id(1, 7)
+        assert [item.comment.id for item in exported if item.post_id == post_id] == [
+            comment["id"] for comment in generator.comments(post_id)
+        ]
+        # 3 pagine per post: in sequenza servirebbero almeno 40 * 3 * 0.02 secondi
+        assert server.requests_count[COMMENTS_ENDPOINT] == 40 * 3
+        assert elapsed < 40 * 3 * 0.02
+
+        server.requests_count.clear()
+        delta = json.dumps([{"insert": "Nuovo commento\n"}])
+        api.create_comment_post(post_id, CreatePostCommentIn(comment=delta))
+        exporter = CommentsExporter(api, state=ExportState.load(state_path))
+        exported = list(exporter.export_community(1))
+        assert {item.post_id for item in exported} == {post_id}
+        assert len(exported) == 6
+        assert exporter.stats.skipped == 39
+        assert server.requests_count[COMMENTS_ENDPOINT] == 1
+        exporter.state.save(state_path)
+
+        # commenti tutti eliminati: lo stato del post viene aggiornato senza chiamate
+        for item in exported:
+            api.delete_comment_post(item.comment.id)
+        server.requests_count.clear()
+        exporter = CommentsExporter(api, state=ExportState.load(state_path))
+        assert list(exporter.export_community(1)) == []
+        assert exporter.state.posts[post_id][0] == 0
+        assert exporter.stats.posts == 1
+        assert server.requests_count[COMMENTS_ENDPOINT] == 0
+
+
+def test_export_post_ids():
+    generator = TenantGenerator(seed=2, posts_per_community=10)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        post_ids = [generator.post_id(1, index) for index in range(10)]
+        exporter = CommentsExporter(api, max_workers=3)
+        exported = list(exporter.export(iter(post_ids)))
+        assert sorted({item.post_id for item in exported}) == post_ids
+        assert exporter.stats.comments == len(exported) == 10 * generator.comments_per_post
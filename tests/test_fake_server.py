@@ -0,0 +1,178 @@
+import json
+
+import pytest
+import requests
+
+from pynteracta.api import InteractaApi
+from pynteracta.enums import FieldFilterTypeEnum
+from pynteracta.exceptions import InteractaLoginError, InteractaResponseError, PostDoesNotFound
+from pynteracta.schemas.models import CustomFieldFilter
+from pynteracta.schemas.requests import (
+    CommunityPostFilters,
+    CreateCustomPostIn,
+    CreatePostCommentIn,
+    EditCustomPostIn,
+    ExecutePostWorkflowOperationIn,
+    ListCommunityPostsFilteredIn,
+    ListCommunityPostsIn,
+    ListSystemUsersIn,
+)
+from pynteracta.testing import FakeInteractaServer, build_dataset
+from pynteracta.testing.server import decode_page_token, encode_page_token
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeInteractaServer(build_dataset(communities=2, posts_per_community=45)) as server:
+        yield server
+
+
+@pytest.fixture
+def api(server):
+    api = InteractaApi(server.settings())
+    api.login()
+    return api
+
+
+def test_build_dataset_is_deterministic():
+    first, second = build_dataset(seed=3), build_dataset(seed=3)
+    assert first.posts == second.posts
+    assert first.users == second.users
+    assert build_dataset(seed=4).posts != first.posts
+
+
+def test_page_token_roundtrip():
+    assert decode_page_token(encode_page_token(30)) == 30
+    assert decode_page_token(None) == 0
+
+
+def test_login_wrong_credentials(server):
+    settings = server.settings()
+    settings.auth_username = "wrong"
+    with pytest.raises(InteractaLoginError):
+        InteractaApi(settings).login()
+
+
+def test_unauthorized_without_token(server):
+    response = requests.post(
+        f"{server.settings().api_url}/communication/posts/data/community-list/1", json={}
+    )
+    assert response.status_code == 401
+
+
+def test_list_all_posts_paginates(server, api):
+    server.requests_count.clear()
+    posts = api.list_all_posts(1, data=ListCommunityPostsIn(page_size=20))
+    assert len(posts) == 45
+    assert len({post.id for post in posts}) == 45
+    assert (
+        server.requests_count["POST /communication/posts/data/community-list/{community_id}"] == 3
+    )
+
+
+def test_list_posts_filtered(server, api):
+    dataset = server.dataset
+    post = dataset.posts[1][10]
+    result = api.list_posts_filtered(
+        1,
+        data=ListCommunityPostsFilteredIn(
+            community_post_filters=CommunityPostFilters(title=post["title"].upper())
+        ),
+    )
+    assert post["id"] in [item.id for item in result.items]
+
+    priority = dataset.post_definitions[1]["fieldDefinitions"][6]
+    high = priority["enumValues"][2]["id"]
+    result = api.list_posts_filtered(
+        1,
+        data=ListCommunityPostsFilteredIn(
+            page_size=100,
+            community_post_filters=CommunityPostFilters(
+                post_field_filters=[
+                    CustomFieldFilter(
+                        column_id=priority["id"],
+                        type_id=FieldFilterTypeEnum.IN,
+                        parameters=[high],
+                    )
+                ]
+            ),
+        ),
+    )
+    assert result.total_items_count == 15
+    assert all(item.custom_data[str(priority["id"])] == high for item in result.items)
+
+
+def test_post_lifecycle(api):
+    created = api.create_post(2, CreateCustomPostIn(title="Nuova segnalazione"))
+    post_id = created.post_id
+    assert api.get_post_detail(post_id).title == "Nuova segnalazione"
+
+    occ_token = api.get_post_data_for_edit(post_id).occ_token
+    api.edit_post(post_id, occ_token, EditCustomPostIn(title="Segnalazione modificata"))
+    assert api.get_post_detail(post_id).title == "Segnalazione modificata"
+    with pytest.raises(InteractaResponseError) as excinfo:
+        api.edit_post(post_id, occ_token, EditCustomPostIn(title="Conflitto"))
+    assert excinfo.value.response.status_code == 409
+
+    api.delete_post(post_id)
+    with pytest.raises(PostDoesNotFound):
+        api.get_post_detail(post_id)
+
+
+def test_comments(server, api):
+    post_id = server.dataset.posts[1][0]["id"]
+    delta = json.dumps([{"insert": "Commento di prova\n"}])
+    comment = api.create_comment_post(post_id, CreatePostCommentIn(comment=delta)).comment
+    assert comment.comment_plain_text == "Commento di prova"
+    comments = api.list_comment_post(post_id).items
+    assert comments[0].id == comment.id
+
+
+def test_users(api):
+    result = api.list_users(data=ListSystemUsersIn(page_size=10))
+    assert result.total_items_count == 50
+    assert len(result.items) == 10
+    assert len(api.all_users()) == 50
+
+
+def test_workflow_operation(server, api):
+    definition = server.dataset.post_definitions[1]["workflowDefinition"]
+    post = next(
+        post
+        for post in server.dataset.posts[1]
+        if post["currentWorkflowState"]["id"] == definition["states"][0]["id"]
+    )
+    screen = api.get_post_workflow_screen_data_for_edit(post["id"])
+    result = api.execute_post_workflow_operation(
+        post["id"],
+        definition["transitions"][0]["id"],
+        ExecutePostWorkflowOperationIn(screen_occ_token=screen.screen_occ_token),
+    )
+    assert result.new_current_state.id == definition["states"][1]["id"]
+    assert api.get_post_detail(post["id"]).current_workflow_state.id == result.new_current_state.id
+
+
+def test_injected_errors(server, api):
+    server.inject_errors(status=503, count=1, path="/admin/data/users")
+    with pytest.raises(InteractaResponseError) as excinfo:
+        api.list_users()
+    assert excinfo.value.response.status_code == 503
+    assert api.list_users().items
+
+
+def test_rate_limit():
+    with FakeInteractaServer(build_dataset(posts_per_community=5), rate_limit=2) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        api.list_posts(1)
+        with pytest.raises(InteractaResponseError) as excinfo:
+            api.list_posts(1)
+        assert excinfo.value.response.status_code == 429
+        assert excinfo.value.response.headers["retry-after"] == "1"
+
+
+def test_large_responses_are_compressed(api):
+    api.list_posts(1, data=ListCommunityPostsIn(page_size=45))
+    totals = api.transfer_stats.totals
+    assert totals.compressed_responses >= 1
+    assert totals.response_wire_bytes < totals.response_bytes
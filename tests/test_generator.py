@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.schemas.models import BaseListPostsElement, ListSystemUsersElement, PostComment
+from pynteracta.schemas.requests import ListCommunityPostsIn
+from pynteracta.schemas.responses import GetPostDefinitionOut
+from pynteracta.testing import FakeInteractaServer, GeneratedSequence, TenantGenerator
+
+
+@pytest.fixture
+def generator():
+    return TenantGenerator(
+        seed=7, communities=2, posts_per_community=250, users=120, workflow_states=6
+    )
+
+
+def test_records_are_deterministic(generator):
+    other = TenantGenerator(seed=7, communities=2, posts_per_community=250, users=120)
+    assert generator.post(1, 42) == other.post(1, 42)
+    assert generator.user(10) == other.user(10)
+    assert TenantGenerator(seed=8).post(1, 42) != generator.post(1, 42)
+
+
+def test_records_match_dtos(generator):
+    BaseListPostsElement.model_validate(generator.post(2, 249))
+    ListSystemUsersElement.model_validate(generator.user(119))
+    for comment in generator.comments(generator.post_id(1, 3)):
+        PostComment.model_validate(comment)
+    definition = GetPostDefinitionOut.model_validate(generator.post_definition(1))
+    workflow = definition.workflow_definition
+    assert len(workflow.states) == 6
+    assert len(workflow.transitions) == 6
+    assert workflow.transitions[-1].to_state.init_state
+
+
+def test_generated_sequence():
+    sequence = GeneratedSequence(5, lambda index: {"id": index + 1}, index_of=lambda id: id - 1)
+    assert len(sequence) == 5
+    assert sequence[-1] == {"id": 5}
+    assert sequence[1:3] == [{"id": 2}, {"id": 3}]
+
+    sequence.insert(0, {"id": 100})
+    sequence.append({"id": 200})
+    item = sequence.get_by_id(3)
+    item["edited"] = True
+    sequence.remove(sequence.get_by_id(2))
+    assert [item["id"] for item in sequence] == [100, 1, 3, 4, 5, 200]
+    assert sequence[2] == {"id": 3, "edited": True}
+    assert sequence.get_by_id(2) is None
+    assert sequence.get_by_id(200) == {"id": 200}
+    with pytest.raises(IndexError):
+        sequence[6]
+
+
+def test_write_pages(generator, tmp_path):
+    files = generator.write(tmp_path, page_size=100)
+    pages = [json.loads(line) for line in files["posts-1"].read_text().splitlines()]
+    assert [len(page["items"]) for page in pages] == [100, 100, 50]
+    assert pages[0]["totalItemsCount"] == 250
+    assert pages[-1]["nextPageToken"] is None
+    assert pages[0]["items"][0] == json.loads(json.dumps(generator.post(1, 0)))
+    assert json.loads(files["post-definition-2"].read_text())["communityId"] == 2
+
+
+def test_server_with_generated_dataset():
+    generator = TenantGenerator(posts_per_community=100_000, users=20_000)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        page = api.list_posts(1, data=ListCommunityPostsIn(page_size=10))
+        assert page.total_items_count == 100_000
+        assert [post.id for post in page.items] == [generator.post_id(1, i) for i in range(10)]
+        post_id = generator.post_id(1, 99_999)
+        assert api.get_post_detail(post_id).title == generator.post(1, 99_999)["title"]
+        assert len(api.list_comment_post(post_id).items) == 2
+        api.delete_post(post_id)
+        assert api.list_posts(1).total_items_count == 99_999
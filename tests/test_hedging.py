@@ -0,0 +1,152 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.deadlines import current_deadline, deadline
+from pynteracta.hedging import MAX_HEDGE_TOKENS, Hedger, LatencyWindow
+from pynteracta.instrumentation import MetricsAggregator
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+from pynteracta.transport import RequestsTransport
+
+
+class SlowEveryTransport(RequestsTransport):
+    """Una richiesta ogni ``every`` (in ordine di invio) risponde con ``delay`` secondi di
+    ritardo."""
+
+    def __init__(self, every: int, delay: float) -> None:
+        self.every = every
+        self.delay = delay
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def send(self, method, url, **kwargs):
+        with self.lock:
+            number = next(self.counter)
+        if number % self.every == 0:
+            time.sleep(self.delay)
+        return super().send(method, url, **kwargs)
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(100)
+    for value in range(1, 101):
+        window.record(value / 100)
+    assert window.percentile(95) == 0.95
+    assert window.percentile(50) == 0.5
+    window.record(5.0)
+    assert window.percentile(100) == 5.0
+
+
+def test_hedge_wins_on_slow_primary():
+    hedger = Hedger(min_samples=5, budget=1.0)
+    calls = itertools.count()
+
+    def fetch():
+        time.sleep(0.3 if next(calls) == 5 else 0.01)
+        return "ok"
+
+    for _ in range(5):
+        assert hedger.do("GET /x", fetch) == ("ok", False, False)
+    started = time.perf_counter()
+    assert hedger.do("GET /x", fetch) == ("ok", True, True)
+    assert time.perf_counter() - started < 0.2
+    assert hedger.as_dict() == {"requests": 6, "hedged": 1, "won": 1}
+    hedger.close()
+
+
+def test_hedged_requests_see_deadline():
+    hedger = Hedger(min_samples=1, budget=1.0, min_delay=0.001)
+    seen = []
+
+    def fetch():
+        seen.append(current_deadline.get())
+        time.sleep(0.2 if len(seen) == 2 else 0.01)
+        return "ok"
+
+    hedger.do("GET /x", fetch)
+    with deadline(5) as current:
+        assert hedger.do("GET /x", fetch) == ("ok", True, True)
+    # la richiesta originale e il duplicato vedono la deadline del chiamante
+    assert seen[1:] == [current, current]
+    hedger.close()
+
+
+def test_hedging_budget_and_errors():
+    hedger = Hedger(min_samples=3, budget=0.25, min_delay=0.001)
+    for _ in range(3):
+        hedger.do("k", time.sleep, 0.001)
+    for _ in range(20):
+        hedger.do("k", time.sleep, 0.02)
+    # le richieste duplicate non superano la frazione consentita
+    assert 1 <= hedger.hedged <= 23 * 0.25
+
+    def fail():
+        time.sleep(0.02)
+        raise ValueError("boom")
+
+    hedger._tokens = 5
+    with pytest.raises(ValueError):
+        hedger.do("k", fail)
+    hedger.close()
+
+
+def test_requests_without_hedge_run_inline():
+    hedger = Hedger(min_samples=1, budget=0.1, max_workers=2)
+    threads = []
+
+    def fetch():
+        threads.append(threading.current_thread())
+        time.sleep(0.01)
+        return "ok"
+
+    # senza credito per un duplicato la richiesta resta nel thread chiamante
+    for _ in range(5):
+        assert hedger.do("GET /x", fetch) == ("ok", False, False)
+    assert set(threads) == {threading.current_thread()}
+    assert hedger._executor is None
+
+    # con tutti i thread del pool occupati le richieste non attendono in coda
+    hedger._tokens = MAX_HEDGE_TOKENS
+    release = threading.Event()
+    busy = [hedger._submit("GET /y", release.wait) for _ in range(2)]
+    threads.clear()
+    assert hedger.do("GET /x", fetch) == ("ok", False, False)
+    assert threads == [threading.current_thread()]
+    release.set()
+    for future in busy:
+        future.result()
+    hedger.close()
+
+
+def test_api_hedging_reduces_tail_latency():
+    generator = TenantGenerator(seed=9, posts_per_community=30)
+    with FakeInteractaServer(generator.dataset()) as server:
+        settings = server.settings()
+        settings.hedge_requests = True
+        settings.hedge_budget = 0.2
+        transport = SlowEveryTransport(every=30, delay=0.4)
+        with InteractaApi(settings, transport=transport) as api:
+            api.login()
+            metrics = api.add_hook(MetricsAggregator())
+            post_id = generator.post_id(1, 0)
+            for _ in range(150):
+                api.get_post_detail(post_id)
+        path = "GET /communication/posts/data/post-detail-by-id/{post_id}"
+        endpoint = metrics.summary()[path]
+        assert endpoint["hedged"] >= 3
+        assert endpoint["hedge_won"] >= 3
+        assert endpoint["hedged"] <= 150 * 0.2
+        # dopo le prime min_samples richieste quelle lente sono coperte dai duplicati
+        assert endpoint["total_time"]["max"] < 0.4
+        assert api.hedger._executor is None
+
+
+def test_hedging_disabled_starts_no_threads():
+    generator = TenantGenerator(seed=9, posts_per_community=5)
+    with FakeInteractaServer(generator.dataset()) as server, InteractaApi(server.settings()) as api:
+        api.login()
+        api.get_post_detail(generator.post_id(1, 0))
+        assert api.hedger._executor is None
@@ -0,0 +1,115 @@
+import time
+
+from pynteracta.api import InteractaApi
+from pynteracta.importers import ImportJournal, ImportRecord, ImportStatus, PostImporter
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+CREATE_POST = "POST /communication/posts/manage/create-post/{community_id}"
+
+
+def records(count: int) -> list[dict]:
+    return [
+        {
+            "custom_id": f"IMP-{index}",
+            "title": f"Segnalazione importata {index}",
+            "description": f"Descrizione {index}",
+            "custom_data": {"Priorita": "Alta", "Categorie": ["Verde", "Scuole"], "Numero": index},
+        }
+        for index in range(count)
+    ]
+
+
+def test_import_posts(tmp_path):
+    generator = TenantGenerator(seed=5, posts_per_community=10)
+    with FakeInteractaServer(generator.dataset(), latency=0.02) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        journal_path = tmp_path / "journal.jsonl"
+
+        with ImportJournal(journal_path) as journal:
+            importer = PostImporter(api, 1, max_workers=8, journal=journal)
+            started = time.perf_counter()
+            results = list(importer.run(records(40)))
+            elapsed = time.perf_counter() - started
+        assert {result.status for result in results} == {ImportStatus.CREATED}
+        assert importer.stats.created == 40
+        # in sequenza servirebbero almeno 40 * 0.02 secondi
+        assert elapsed < 40 * 0.02
+        assert len(journal_path.read_text().splitlines()) == 40
+
+        created = {result.record.custom_id: result.post_id for result in results}
+        post = api.get_post_detail(created["IMP-3"])
+        assert post.custom_id == "IMP-3"
+        assert post.description_plain_text == "Descrizione 3"
+        base_id = 10_000
+        assert post.custom_data[str(base_id + 7)] == base_id + 12
+        assert post.custom_data[str(base_id + 8)] == [base_id + 21, base_id + 23]
+        assert post.custom_data[str(base_id + 1)] == 3
+
+
+def test_import_resume(tmp_path):
+    generator = TenantGenerator(seed=5, posts_per_community=10)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        journal_path = tmp_path / "journal.jsonl"
+
+        server.inject_errors(503, count=3, path="/communication/posts/manage/create-post")
+        with ImportJournal(journal_path) as journal:
+            importer = PostImporter(api, 1, max_workers=4, journal=journal)
+            results = list(importer.run(records(20)))
+        failed = [result for result in results if result.status == ImportStatus.FAILED]
+        assert len(failed) == 3
+        assert importer.stats.created == 17
+
+        # la ripresa crea solo i post mancanti
+        server.requests_count.clear()
+        with ImportJournal(journal_path) as journal:
+            assert len(journal.posts) == 17
+            importer = PostImporter(api, 1, journal=journal)
+            results = list(importer.run(ImportRecord.from_dict(row) for row in records(20)))
+        assert importer.stats.created == 3
+        assert importer.stats.skipped == 17
+        assert server.requests_count[CREATE_POST] == 3
+        assert len(ImportJournal(journal_path).posts) == 20
+
+        # senza giornale i post già creati sono riconosciuti dall'indice dei custom_id
+        importer = PostImporter(api, 1)
+        results = list(importer.run(records(20)))
+        assert {result.status for result in results} == {ImportStatus.SKIPPED}
+        assert server.requests_count[CREATE_POST] == 3
+
+
+def test_journal_skips_invalid_lines(tmp_path):
+    journal_path = tmp_path / "journal.jsonl"
+    lines = [
+        '{"custom_id": "A", "post_id": 1}',
+        '{"custom_id": "B"}',
+        "[1, 2]",
+        "null",
+        '{"custom_id": "C", "post_id": 3}',
+        '{"custom_id": "D", "po',
+    ]
+    journal_path.write_text("\n".join(lines))
+    assert ImportJournal(journal_path).posts == {"A": 1, "C": 3}
+
+
+def test_import_invalid_and_duplicate_records():
+    generator = TenantGenerator(seed=5, posts_per_community=2)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        rows = [
+            {"custom_id": "A", "title": "Primo"},
+            {"custom_id": "A", "title": "Primo, ripetuto"},
+            {"custom_id": "B", "title": "Secondo", "custom_data": {"Priorita": "Urgentissima"}},
+            {"custom_id": "C1-1", "title": "Esistente"},
+        ]
+        importer = PostImporter(api, 1)
+        results = {result.record.title: result for result in importer.run(rows)}
+        assert results["Primo"].status == ImportStatus.CREATED
+        assert results["Primo, ripetuto"].status == ImportStatus.SKIPPED
+        assert results["Secondo"].status == ImportStatus.FAILED
+        assert isinstance(results["Secondo"].error, ValueError)
+        assert results["Esistente"].post_id == generator.post_id(1, 0)
+        assert server.requests_count[CREATE_POST] == 1
@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.exceptions import MultipleObjectsReturned, PostDoesNotFound
+from pynteracta.indexes import PostTitleIndex
+from pynteracta.schemas.models import BaseListPostsElement
+from pynteracta.schemas.requests import CreateCustomPostIn, EditCustomPostIn
+from pynteracta.testing import FakeInteractaServer, build_dataset
+
+TITLES = ["Guasto caldaia", "Guasto ascensore", "Manutenzione Caldaia", "guasto caldaia "]
+
+
+@pytest.fixture
+def index():
+    index = PostTitleIndex(1)
+    index.update(
+        BaseListPostsElement(id=post_id, community_id=1, title=title)
+        for post_id, title in enumerate(TITLES, start=1)
+    )
+    return index
+
+
+def ids(posts):
+    return [post.id for post in posts]
+
+
+def test_lookups(index):
+    assert ids(index.find_exact("GUASTO CALDAIA")) == [1, 4]
+    assert ids(index.find_exact("Guasto caldaia", case_sensitive=True)) == [1]
+    assert ids(index.find_prefix("guasto")) == [1, 2, 4]
+    assert ids(index.find_substring("caldaia")) == [1, 3, 4]
+    assert ids(index.find_substring("sc")) == [2]
+    assert index.find_substring("inesistente") == []
+    assert index.get_by_title("ascensore").id == 2
+    with pytest.raises(MultipleObjectsReturned):
+        index.get_by_exact_title("guasto caldaia")
+    with pytest.raises(PostDoesNotFound):
+        index.get_by_title("inesistente")
+
+
+def test_incremental_updates(index):
+    index.set_title(4, "Guasto impianto elettrico")
+    assert index.get_by_exact_title("guasto caldaia").id == 1
+    assert index.get_by_title("elettrico").id == 4
+    index.remove(1)
+    assert index.find_prefix("guasto c") == []
+    assert ids(index.find_substring("guasto")) == [2, 4]
+    assert len(index) == 3
+
+
+def test_concurrent_updates():
+    index = PostTitleIndex(1)
+
+    def add(post_id: int) -> None:
+        title = f"Titolo {post_id % 50}"
+        index.add(BaseListPostsElement(id=post_id, community_id=1, title=title))
+        index.find_prefix("titolo")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add, range(2000)))
+    assert len(index) == 2000
+    assert index._sorted_keys == sorted({f"titolo {number}" for number in range(50)})
+    assert len(index.find_exact("Titolo 7")) == 40
+
+
+def test_api_title_lookups():
+    with FakeInteractaServer(build_dataset(posts_per_community=150)) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        title = server.dataset.posts[1][120]["title"]
+        remote = api.get_post_by_exact_title(1, title)
+
+        index = api.build_post_title_index(1)
+        assert len(index) == 150
+        server.requests_count.clear()
+        assert api.get_post_by_exact_title(1, title.upper()).id == remote.id
+
+        created = api.create_post(1, CreateCustomPostIn(title="Segnalazione indicizzata"))
+        assert api.get_post_by_title(1, "indicizzata").id == created.post_id
+        occ_token = api.get_post_data_for_edit(created.post_id).occ_token
+        api.edit_post(created.post_id, occ_token, EditCustomPostIn(title="Titolo aggiornato"))
+        assert api.get_post_by_exact_title(1, "titolo aggiornato").id == created.post_id
+        api.delete_post(created.post_id)
+        with pytest.raises(PostDoesNotFound):
+            api.get_post_by_title(1, "aggiornato")
+        assert not any("list" in endpoint for endpoint in server.requests_count)
+
+        # le modifiche fatte da altri client sono recuperate con refresh
+        other = InteractaApi(server.settings())
+        other.login()
+        post_id = remote.id
+        occ_token = other.get_post_data_for_edit(post_id).occ_token
+        other.edit_post(post_id, occ_token, EditCustomPostIn(title="Modificato da altri"))
+        assert index.refresh(api) >= 1
+        assert api.get_post_by_exact_title(1, "modificato da altri").id == post_id
+
+
+def test_exact_title_same_on_both_paths():
+    with FakeInteractaServer(build_dataset(posts_per_community=20)) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        post = server.dataset.posts[1][7]
+        queries = [f"  {post['title'].upper()} ", post["title"], "titolo inesistente"]
+
+        def lookup(query):
+            try:
+                return api.get_post_by_exact_title(1, query).id
+            except PostDoesNotFound:
+                return None
+
+        remote = [lookup(query) for query in queries]
+        api.build_post_title_index(1)
+        assert [lookup(query) for query in queries] == remote == [post["id"], post["id"], None]
@@ -0,0 +1,203 @@
+import logging
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.exceptions import InteractaResponseError, PostDoesNotFound
+from pynteracta.instrumentation import (
+    CallInfo,
+    Histogram,
+    InstrumentationHook,
+    MetricsAggregator,
+    OpenTelemetryHook,
+    template_path,
+)
+
+
+class RecordingHook(InstrumentationHook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, call):
+        self.events.append(("before", call.endpoint))
+
+    def after_request(self, call):
+        self.events.append(("after", call))
+
+
+class FakeSpan:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.exceptions = []
+        self.ended = False
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc):
+        self.exceptions.append(exc)
+
+    def end(self):
+        self.ended = True
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None):
+        span = FakeSpan(name, attributes or {})
+        self.spans.append(span)
+        return span
+
+
+@pytest.fixture
+def api(settings):
+    api = InteractaApi(settings=settings)
+    api.access_token = "secret-token"
+    return api
+
+
+@pytest.mark.parametrize(
+    "path,arguments,expected",
+    [
+        ("/admin/data/users", {}, "/admin/data/users"),
+        (
+            "/communication/posts/data/post-detail-by-id/12",
+            {"self": None, "post_id": 12},
+            "/communication/posts/data/post-detail-by-id/{post_id}",
+        ),
+        (
+            "/communication/posts/manage/edit-post/5/3",
+            {"post_id": "5", "occ_token": 3},
+            "/communication/posts/manage/edit-post/{post_id}/{occ_token}",
+        ),
+        ("/admin/manage/users/42/edit", {}, "/admin/manage/users/{id}/edit"),
+    ],
+)
+def test_template_path(path, arguments, expected):
+    assert template_path(path, arguments) == expected
+
+
+def test_hooks_receive_call_info(api, mocked_responses):
+    url = f"{api.settings.api_url}/communication/posts/data/post-detail-by-id/7"
+    mocked_responses.get(url, json={"id": 7, "title": "titolo"})
+    hook = api.add_hook(RecordingHook())
+
+    post = api.get_post_detail(7)
+
+    assert post.id == 7
+    assert [event for event, _ in hook.events] == ["before", "after"]
+    assert hook.events[0][1] == "GET /communication/posts/data/post-detail-by-id/{post_id}"
+    call = hook.events[1][1]
+    assert isinstance(call, CallInfo)
+    assert call.operation == "get_post_detail"
+    assert call.arguments["post_id"] == 7
+    assert call.status_code == 200
+    assert call.response_bytes > 0
+    assert call.error is None
+    for timing in ("server_time", "download_time", "validation_time", "total_time"):
+        assert getattr(call, timing) >= 0
+
+
+def test_hooks_receive_errors(api, mocked_responses):
+    url = f"{api.settings.api_url}/communication/posts/data/post-detail-by-id/7"
+    mocked_responses.get(url, status=404)
+    hook = api.add_hook(RecordingHook())
+
+    with pytest.raises(PostDoesNotFound):
+        api.get_post_detail(7)
+
+    call = hook.events[-1][1]
+    assert call.status_code == 404
+    assert isinstance(call.error, PostDoesNotFound)
+    assert call.validation_time is None
+
+
+def test_hooks_on_direct_call_api(api, mocked_responses):
+    mocked_responses.post(f"{api.settings.api_url}/core/auth/x", status=500)
+    hook = api.add_hook(RecordingHook())
+
+    with pytest.raises(InteractaResponseError):
+        api.call_api("post", "/core/auth/x", data="{}")
+
+    call = hook.events[-1][1]
+    assert call.operation is None
+    assert call.endpoint == "POST /core/auth/x"
+    assert call.status_code == 500
+
+
+def test_failing_hook_does_not_break_calls(api, mocked_responses, caplog):
+    class BrokenHook(InstrumentationHook):
+        def after_request(self, call):
+            raise RuntimeError("boom")
+
+    mocked_responses.post(f"{api.settings.api_url}/admin/data/users", json={"items": []})
+    api.add_hook(BrokenHook())
+
+    assert api.list_users().items == []
+    assert "boom" in caplog.text
+
+
+def test_metrics_aggregator(api, mocked_responses):
+    mocked_responses.post(f"{api.settings.api_url}/admin/data/users", json={"items": []})
+    mocked_responses.get(f"{api.settings.api_url}/admin/manage/users/3/edit", json={"occToken": 1})
+    metrics = api.add_hook(MetricsAggregator())
+
+    api.list_users()
+    api.list_users()
+    api.get_user_data_for_edit(3)
+
+    summary = metrics.summary()
+    users = summary["POST /admin/data/users"]
+    assert users["calls"] == 2
+    assert users["errors"] == 0
+    assert users["status_codes"] == {200: 2}
+    assert users["total_time"]["count"] == 2
+    assert summary["GET /admin/manage/users/{user_id}/edit"]["calls"] == 1
+    assert next(iter(summary)) in (
+        "POST /admin/data/users",
+        "GET /admin/manage/users/{user_id}/edit",
+    )
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in [0.001] * 90 + [0.3] * 10:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 0.005
+    assert histogram.percentile(99) == 0.3
+    assert histogram.max == 0.3
+
+
+def test_opentelemetry_hook(api, mocked_responses):
+    mocked_responses.post(f"{api.settings.api_url}/admin/data/users", json={"items": []})
+    mocked_responses.post(f"{api.settings.api_url}/admin/data/groups", status=503)
+    tracer = FakeTracer()
+    api.add_hook(OpenTelemetryHook(tracer))
+
+    api.list_users()
+    with pytest.raises(InteractaResponseError):
+        api.list_groups()
+
+    ok, failed = tracer.spans
+    assert ok.name == "POST /admin/data/users"
+    assert ok.ended
+    assert ok.attributes["http.response.status_code"] == 200
+    assert ok.attributes["pynteracta.operation"] == "list_users"
+    assert "pynteracta.validation_time" in ok.attributes
+    assert failed.attributes["http.response.status_code"] == 503
+    assert len(failed.exceptions) == 1
+
+
+def test_log_calls_redacts_authorization(api, mocked_responses, caplog):
+    mocked_responses.post(f"{api.settings.api_url}/admin/data/users", json={"items": []})
+    api._log_calls = True
+
+    with caplog.at_level(logging.INFO, logger="pynteracta.core"):
+        api.list_users()
+
+    assert "API CALL" in caplog.text
+    assert "secret-token" not in caplog.text
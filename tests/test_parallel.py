@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.parallel import Columns, ParallelValidator, next_page_token
+from pynteracta.schemas.requests import ListCommunityPostsIn, ListSystemUsersIn
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        (b'{"items": [], "nextPageToken": "abc"}', "abc"),
+        (b'{"nextPageToken":"a\\"b","items":[]}', 'a"b'),
+        (b'{"items": [], "nextPageToken": null}', None),
+        (b'{"items": []}', None),
+        (b'{"items": [{"nextPageToken": "x"}], "nextPageToken": "abc"}', "abc"),
+        (b'{"nextPageToken": null, "items": [{"a": {"nextPageToken": "x"}}]}', None),
+        (b'{"items": [{"title": "{[\\"", "nextPageToken": "x"}]}', None),
+        (b'{"items": [{"title": "]}"}], "nextPageToken": "abc"}', "abc"),
+    ],
+)
+def test_next_page_token(content, expected):
+    assert next_page_token(content) == expected
+
+
+@pytest.fixture
+def api():
+    generator = TenantGenerator(seed=6, posts_per_community=120, users=250)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        yield api
+
+
+def test_process_pool_pages_in_order(api):
+    expected = [post.model_dump() for post in api.iter_posts(1)]
+    with ParallelValidator(max_workers=2, prefetch=3) as validator:
+        data = ListCommunityPostsIn(page_size=25)
+        posts = list(validator.iter_items(api.list_posts, data, community_id=1))
+        assert [post.model_dump() for post in posts] == expected
+
+        pages = list(
+            validator.iter_pages(
+                api.list_users,
+                ListSystemUsersIn(page_size=40),
+                transform=Columns(("id", "contact_email")),
+            )
+        )
+    assert len(pages) == 7
+    user_ids = [user_id for page in pages for user_id in page["id"]]
+    assert user_ids == [user.id for user in api.all_users()]
+
+
+def test_validate_false_returns_response(api):
+    response = api.list_posts(1, validate=False)
+    assert response.status_code == 200
+    assert api.list_posts.schema_out.model_validate_json(response.content).items
+
+
+def test_custom_executor(api):
+    with ThreadPoolExecutor(2) as executor:
+        validator = ParallelValidator(executor=executor, prefetch=1)
+        data = ListCommunityPostsIn(page_size=50)
+        pages = list(validator.iter_pages(api.list_posts, data, community_id=1))
+        validator.close()
+        assert [len(page.items) for page in pages] == [50, 50, 20]
+        assert not executor._shutdown
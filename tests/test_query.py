@@ -0,0 +1,127 @@
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.enums import FieldFilterTypeEnum
+from pynteracta.exceptions import QueryError
+from pynteracta.query import (
+    Created,
+    CustomField,
+    Hashtags,
+    PostQuery,
+    Status,
+    Title,
+    Where,
+)
+from pynteracta.schemas.models import BaseListPostsElement
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+
+PRIORITY, AMOUNT, NUMBER = 10007, 10003, 10001
+
+
+def test_plan_pushdown():
+    query = PostQuery(1).where(
+        Title.equals("Guasto caldaia"),
+        CustomField(PRIORITY).equals(10010) | CustomField(PRIORITY).equals(10011),
+        Created.between(1_000, 5_000),
+        Created.between(2_000),
+        Status.isin(11000, 11001),
+        Status.isin(11001, 11002),
+        Hashtags.any(5),
+    )
+    plan = query.plan()
+    filters = plan.filters
+    assert filters.title == "Guasto caldaia"
+    assert (filters.creation_timestamp_from, filters.creation_timestamp_to) == (2_000, 5_000)
+    assert filters.current_workflow_status_ids == [11001]
+    assert filters.hashtag_ids == [5]
+    [field_filter] = filters.post_field_filters
+    assert field_filter.type_id == FieldFilterTypeEnum.IN
+    assert field_filter.parameters == [10010, 10011]
+    # il server filtra il titolo per sottostringa: il confronto esatto resta locale
+    assert [repr(predicate) for predicate in plan.residual] == ["title == 'Guasto caldaia'"]
+
+
+def test_residual_predicates():
+    plan = PostQuery(
+        1,
+        Title.contains("caldaia")
+        & Title.contains("guasto")
+        & (CustomField(PRIORITY).equals(1) | CustomField(AMOUNT).between(0, 10))
+        & ~CustomField(NUMBER).is_empty(),
+    ).plan()
+    assert plan.filters.title == "caldaia"
+    # un'alternativa tra campi diversi e le negazioni non sono esprimibili lato server
+    assert len(plan.residual) == 3
+    assert plan.filters.post_field_filters is None
+    post = BaseListPostsElement(
+        id=1, title="Guasto caldaia", custom_data={str(AMOUNT): 5, str(NUMBER): 3}
+    )
+    assert plan.matches(post)
+    assert not plan.matches(post.model_copy(update={"title": "Caldaia"}))
+
+    with pytest.raises(QueryError):
+        PostQuery(1, Status.isin(11000) | Where(lambda post: True)).plan()
+
+
+def test_hashtags_pushdown():
+    def hashtags(*predicates):
+        filters = PostQuery(1).where(*predicates).plan().filters
+        return filters.hashtag_ids, filters.hashtags_logical_and
+
+    assert hashtags(Hashtags.all(1, 2), Hashtags.all(3)) == ([1, 2, 3], True)
+    assert hashtags(Hashtags.any(1, 2, 3), Hashtags.any(2, 3)) == ([2, 3], False)
+    assert hashtags(Hashtags.any(1, 2), Hashtags.all(2, 4)) == ([2, 4], True)
+    assert hashtags(Hashtags.all(2, 4), Hashtags.any(1, 2)) == ([2, 4], True)
+    with pytest.raises(QueryError):
+        PostQuery(1, Hashtags.any(1, 2) & Hashtags.any(3, 4)).plan()
+
+
+def test_contradictory_query():
+    generator = TenantGenerator(seed=3, posts_per_community=20)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        server.requests_count.clear()
+        for query in (
+            PostQuery(1, Status.isin(11000) & Status.isin(11001)),
+            PostQuery(1, Hashtags.any() & Where(lambda post: True)),
+            PostQuery(1, Created.between(5_000) & Created.between(high=1_000)),
+        ):
+            plan = query.plan()
+            assert plan.empty
+            assert "no request" in plan.explain()
+            assert query.all(api) == []
+            assert query.first(api) is None
+        assert not server.requests_count
+
+
+def test_query_against_server():
+    generator = TenantGenerator(seed=3, posts_per_community=600)
+    with FakeInteractaServer(generator.dataset(), compress_responses=False) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        query = PostQuery(1).where(
+            CustomField(PRIORITY).isin(10010, 10011),
+            CustomField(AMOUNT).between(1_000, 6_000),
+            Status.isin(11000, 11001),
+            Where(lambda post: post.custom_data[str(NUMBER)] % 2 == 0, "numero pari"),
+        )
+        api.transfer_stats.reset()
+        posts = query.all(api)
+        query_bytes = api.transfer_stats.totals.response_bytes
+
+        expected = [
+            post["id"]
+            for post in generator.iter_posts(1)
+            if post["customData"][str(PRIORITY)] in (10010, 10011)
+            and 1_000 <= post["customData"][str(AMOUNT)] <= 6_000
+            and post["currentWorkflowState"]["id"] in (11000, 11001)
+            and post["customData"][str(NUMBER)] % 2 == 0
+        ]
+        assert expected
+        assert [post.id for post in posts] == expected
+        assert query.first(api).id == expected[0]
+
+        api.transfer_stats.reset()
+        api.list_all_posts(1)
+        assert query_bytes < api.transfer_stats.totals.response_bytes / 2
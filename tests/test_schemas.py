@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+from pynteracta.schemas.core import prewarm
+from pynteracta.schemas.models import EnumValue, FieldDefinition
+from pynteracta.schemas.responses import GetPostDefinitionOut
+
+
+def test_schemas_are_not_built_on_import():
+    probe = (
+        "import pynteracta.api;"
+        "from pynteracta.schemas.responses import PostsOut;"
+        "from pynteracta.schemas.models import BaseListPostsElement;"
+        "assert not PostsOut.__pydantic_complete__;"
+        "assert not BaseListPostsElement.__pydantic_complete__"
+    )
+    subprocess.run([sys.executable, "-c", probe], check=True, env={"PYTHONPATH": "./src"})
+
+
+def test_deferred_models_validate_nested_data():
+    result = GetPostDefinitionOut.model_validate(
+        {
+            "communityId": 1,
+            "fieldDefinitions": [
+                {"id": 10, "label": "Stato", "type": 7, "enumValues": [{"id": 1, "label": "A"}]}
+            ],
+        }
+    )
+    assert isinstance(result.field_definitions[0], FieldDefinition)
+    assert isinstance(result.field_definitions[0].enum_values[0], EnumValue)
+    assert result.get_enum_id(10, "A") == 1
+
+
+def test_prewarm_builds_selected_models():
+    prewarm(EnumValue)
+    assert EnumValue.__pydantic_complete__
+
+    prewarm()
+    assert GetPostDefinitionOut.__pydantic_complete__
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.schemas.models import BaseListPostsElement, PostComment
+from pynteracta.schemas.requests import CreatePostCommentIn, EditCustomPostIn
+from pynteracta.search import SearchIndex, parse_query, tokenize
+from pynteracta.testing import FakeInteractaServer, build_dataset
+
+
+def make_post(post_id: int, title: str, description: str = "", **kwargs) -> BaseListPostsElement:
+    return BaseListPostsElement(
+        id=post_id, community_id=1, title=title, description_plain_text=description, **kwargs
+    )
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex([1], custom_field_ids=[10])
+    index.index_post(make_post(1, "Guasto caldaia", "La caldaia non si accende"))
+    index.index_post(make_post(2, "Perdita d'acqua", "Tubo rotto vicino alla caldaia"))
+    index.index_post(
+        make_post(3, "Ascensore fermo", custom_data={"10": "manutenzione urgente", "11": "caldaia"})
+    )
+    index.index_comments(
+        make_post(3, "Ascensore fermo"),
+        [
+            PostComment(
+                id=30,
+                comment_plain_text="Il tecnico è già intervenuto",
+                deleted=False,
+                liked_by_me=False,
+                show_like_section=True,
+            )
+        ],
+    )
+    return index
+
+
+def ids(hits):
+    return [(hit.kind, hit.id) for hit in hits]
+
+
+def test_tokenize_and_parse():
+    assert tokenize("Perché L'UNITÀ è ferma?") == ["perche", "l", "unita", "e", "ferma"]
+    clauses = parse_query("caldaia -tubo OR manut*")
+    assert [term.text for term in clauses[0].required] == ["caldaia"]
+    assert [term.text for term in clauses[0].excluded] == ["tubo"]
+    assert clauses[1].required[0].prefix
+
+
+def test_queries(index):
+    # il titolo pesa più della descrizione
+    assert ids(index.search("caldaia")) == [("post", 1), ("post", 2)]
+    assert ids(index.search("caldaia -tubo")) == [("post", 1)]
+    assert ids(index.search("caldaia accende OR urgente")) == [("post", 1), ("post", 3)]
+    assert ids(index.search("manut*")) == [("post", 3)]
+    assert ids(index.search("gia intervenuto")) == [("comment", 30)]
+    assert index.search("intervenuto")[0].post_id == 3
+    assert ids(index.search("caldaia", kinds=["comment"])) == []
+    assert index.search("inesistente") == []
+
+
+def test_updates(index):
+    index.index_post(make_post(1, "Caldaia riparata"))
+    assert ids(index.search("guasto")) == []
+    assert ids(index.search("riparata")) == [("post", 1)]
+    index.remove_post(3)
+    assert index.search("intervenuto") == []
+    assert len(index) == 2
+
+
+def test_build_and_refresh():
+    with FakeInteractaServer(build_dataset(posts_per_community=30)) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        index = SearchIndex([1])
+        index.build(api)
+        post = server.dataset.posts[1][5]
+        assert index.search(post["title"])[0].id == post["id"]
+        comment = server.dataset.comments[post["id"]][0]
+        assert ("comment", comment["id"]) in ids(
+            index.search(comment["commentPlainText"], limit=None)
+        )
+
+        delta = json.dumps([{"insert": "Sostituita la valvola termostatica\n"}])
+        created = api.create_comment_post(post["id"], CreatePostCommentIn(comment=delta)).comment
+        other = server.dataset.posts[1][20]
+        occ_token = api.get_post_data_for_edit(other["id"]).occ_token
+        api.edit_post(other["id"], occ_token, EditCustomPostIn(title="Serranda bloccata"))
+
+        server.requests_count.clear()
+        assert index.refresh(api) >= 2
+        assert ids(index.search("valvola termo*")) == [("comment", created.id)]
+        assert ids(index.search("serranda")) == [("post", other["id"])]
+        # sono stati riletti solo i post aggiornati e i loro commenti
+        assert sum(server.requests_count.values()) == 3
+
+
+def test_refresh_with_pinned_post():
+    with FakeInteractaServer(build_dataset(posts_per_community=30)) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        posts = server.dataset.posts[1]
+        # un post vecchio e non modificato, pinnato
+        oldest = min(posts, key=lambda post: post["lastModifyTimestamp"])
+        oldest["pinned"] = True
+        index = SearchIndex([1])
+        index.build(api)
+
+        other = posts[20]
+        occ_token = api.get_post_data_for_edit(other["id"]).occ_token
+        api.edit_post(other["id"], occ_token, EditCustomPostIn(title="Serranda bloccata"))
+        # un commento eliminato e uno aggiunto: il numero di commenti non cambia
+        commented = posts[10]
+        [removed, *_] = api.iter_comments(commented["id"])
+        api.delete_comment_post(removed.id)
+        delta = json.dumps([{"insert": "Sostituita la valvola termostatica\n"}])
+        created = api.create_comment_post(commented["id"], CreatePostCommentIn(comment=delta))
+
+        assert index.refresh(api) >= 2
+        assert ids(index.search("serranda")) == [("post", other["id"])]
+        assert ids(index.search("valvola")) == [("comment", created.comment.id)]
+        assert ("comment", removed.id) not in ids(
+            index.search(removed.comment_plain_text, limit=None)
+        )
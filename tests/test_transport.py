@@ -0,0 +1,106 @@
+import gzip
+import time
+
+import pytest
+
+from pynteracta.api import InteractaApi
+from pynteracta.exceptions import CassetteError
+from pynteracta.schemas.requests import ListCommunityPostsIn
+from pynteracta.settings import InteractaSettings
+from pynteracta.testing import FakeInteractaServer, build_dataset
+from pynteracta.transport import RecordingTransport, ReplayTransport, read_cassette
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeInteractaServer(build_dataset(posts_per_community=25)) as server:
+        yield server
+
+
+def record(server, path):
+    with RecordingTransport(path) as transport:
+        api = InteractaApi(server.settings(), transport=transport)
+        api.login()
+        posts = api.list_all_posts(1, data=ListCommunityPostsIn(page_size=10))
+        detail = api.get_post_detail(posts[0].id)
+    return posts, detail
+
+
+def replay_api(transport):
+    # le cassette non dipendono dall'host né dalle credenziali usate in registrazione
+    settings = InteractaSettings(
+        base_url="https://replay.example.org", auth_username="user", auth_password="other"
+    )
+    return InteractaApi(settings, transport=transport)
+
+
+def test_record_and_replay(server, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    posts, detail = record(server, path)
+    content = path.read_text()
+    assert '\\"accessToken\\":\\"***\\"' in content
+    assert all(token not in content for token in server.tokens)
+    assert len(read_cassette(path)) == 5
+
+    transport = ReplayTransport(path, speed=None)
+    api = replay_api(transport)
+    api.login()
+    replayed = api.list_all_posts(1, data=ListCommunityPostsIn(page_size=10))
+    assert [post.model_dump() for post in replayed] == [post.model_dump() for post in posts]
+    assert api.get_post_detail(posts[0].id).model_dump() == detail.model_dump()
+    assert transport.replayed == 5
+    assert transport.remaining == 0
+
+
+def test_replay_unknown_request(server, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record(server, path)
+    api = replay_api(ReplayTransport(path, speed=None))
+    api.login()
+    with pytest.raises(CassetteError):
+        api.list_posts(1, data=ListCommunityPostsIn(page_size=20))
+
+
+def test_replay_speed(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    with FakeInteractaServer(build_dataset(posts_per_community=5), latency=0.05) as server:
+        record(server, path)
+    with gzip.open(path, "rt") as file:
+        assert file.readline().startswith("{")
+    recorded = [interaction.elapsed for interaction in read_cassette(path)]
+    assert min(recorded) >= 0.05
+
+    api = replay_api(ReplayTransport(path, speed=10))
+    started = time.perf_counter()
+    api.login()
+    api.list_all_posts(1, data=ListCommunityPostsIn(page_size=10))
+    assert time.perf_counter() - started < sum(recorded[:2]) / 2
+    assert api.transport.replayed == 2
+
+
+def test_replay_request_spacing(server, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    with RecordingTransport(path) as transport:
+        api = InteractaApi(server.settings(), transport=transport)
+        api.login()
+        time.sleep(0.3)
+        post_id = api.list_posts(1).items[0].id
+        time.sleep(0.3)
+        api.get_post_detail(post_id)
+    offsets = [interaction.offset for interaction in read_cassette(path)]
+    assert offsets[2] - offsets[0] >= 0.6
+
+    api = replay_api(ReplayTransport(path, speed=2))
+    started = time.perf_counter()
+    api.login()
+    api.list_posts(1)
+    api.get_post_detail(post_id)
+    # le pause tra le richieste sono riprodotte, scalate
+    assert 0.3 <= time.perf_counter() - started < 0.6
+
+    api = replay_api(ReplayTransport(path, speed=None))
+    started = time.perf_counter()
+    api.login()
+    api.list_posts(1)
+    api.get_post_detail(post_id)
+    assert time.perf_counter() - started < 0.1
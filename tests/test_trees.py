@@ -0,0 +1,76 @@
+import random
+
+from pynteracta.api import InteractaApi
+from pynteracta.enums import FieldFilterTypeEnum
+from pynteracta.query import CustomField, PostQuery
+from pynteracta.schemas.models import EnumValue
+from pynteracta.testing import FakeInteractaServer, TenantGenerator
+from pynteracta.trees import ChoiceTree
+
+
+def value(value_id: int, *parent_ids: int) -> EnumValue:
+    return EnumValue(id=value_id, label=f"v{value_id}", parent_ids=list(parent_ids) or None)
+
+
+def brute_descendants(values: list[EnumValue], root: int) -> set[int]:
+    found, frontier = {root}, [root]
+    while frontier:
+        node = frontier.pop()
+        for child in values:
+            if node in (child.parent_ids or []) and child.id not in found:
+                found.add(child.id)
+                frontier.append(child.id)
+    return found
+
+
+def test_forest():
+    tree = ChoiceTree([value(1), value(2, 1), value(3, 1), value(4, 2), value(5), value(6, 99)])
+    assert tree.is_forest
+    assert sorted(tree.roots) == [1, 5, 6]
+    assert set(tree.descendants(1)) == {1, 2, 3, 4}
+    assert tree.descendants(1, include_self=False)[0] != 1
+    assert tree.is_ancestor(1, 4) and not tree.is_ancestor(4, 1)
+    assert not tree.is_ancestor(2, 3) and not tree.is_ancestor(1, 1)
+    assert tree.is_ancestor(1, 1, include_self=True)
+    assert tree.depth[4] == 2
+    assert [choice.id for choice in tree.path(4)] == [1, 2, 4]
+    assert tree.expand([2, 4, 5, 42]) == [2, 4, 5, 42]
+    field_filter = tree.filter(10012, [1])
+    assert field_filter.type_id == FieldFilterTypeEnum.IN
+    assert sorted(field_filter.parameters) == [1, 2, 3, 4]
+
+
+def test_random_trees_match_scan():
+    rng = random.Random(7)
+    for multiple_parents in (False, True):
+        values = []
+        for value_id in range(1, 300):
+            parents = rng.sample(range(1, value_id), min(value_id - 1, rng.randint(0, 2)))
+            if not multiple_parents:
+                parents = parents[:1]
+            values.append(value(value_id, *parents))
+        tree = ChoiceTree(values)
+        assert tree.is_forest is not multiple_parents
+        for root in rng.sample(range(1, 300), 30):
+            expected = brute_descendants(values, root)
+            assert set(tree.descendants(root)) == expected
+            other = rng.randrange(1, 300)
+            assert tree.is_ancestor(root, other) == (other in expected and other != root)
+
+
+def test_cycles_do_not_loop():
+    tree = ChoiceTree([value(1, 3), value(2, 1), value(3, 2), value(4, 1, 2)])
+    assert set(tree.descendants(1)) == {1, 2, 3, 4}
+    assert tree.is_ancestor(3, 4)
+
+
+def test_query_under():
+    generator = TenantGenerator(seed=4, posts_per_community=20)
+    with FakeInteractaServer(generator.dataset()) as server:
+        api = InteractaApi(server.settings())
+        api.login()
+        definition = api.get_post_definition_detail(1)
+        tree = ChoiceTree.from_field(definition.get_field_by_label("Area"))
+        query = PostQuery(1).where(CustomField(10012).under(tree, 10040))
+        field_filter = query.plan().filters.post_field_filters[0]
+        assert sorted(field_filter.parameters) == [10040, 10042, 10043]